@@ -3,6 +3,16 @@
 # ... (Önceki versiyon notları) ...
 # v47: display_z_report fonksiyonu eklendi.
 # v51: display_order_suggestion_report fonksiyonu eklendi.
+# v52: Ürün, müşteri ve tedarikçi listeleri üreteç (generator) de kabul ediyor; tablolar parça parça yazdırılıyor.
+# v53: browse_pages ile sayfalı listelerde sonraki/önceki sayfaya geçiş, get_active_filter_input ile durum filtresi.
+# v54: P1 ekranında hızlı buton yenileme istatistikleri (display_quick_button_stats).
+# v55: Menüye B1 (Ürün Ek Barkodları) eklendi; katalog istatistiklerinde ek barkod sayısı.
+# v56: Ondalıklı miktarlar (terazi barkodları) için format_quantity ve get_line_total; sepet, fiş ve
+#      askıdaki satış tutarları satır bazında kuruşa yuvarlanıyor. P1'de terazi barkodu istatistikleri.
+# v57: Menüye A1 (Stok Analizi) eklendi; display_stock_analysis (stok özeti, kategori bazında stok değeri, fiyat bantları).
+# v58: P1'de marka/kategori/tedarikçi indeksi istatistikleri (display_reference_cache_stats).
+# v59: İade onayında satır tutarı (tahsil edilen tutar) gösteriliyor.
+# v60: Katalog istatistiklerinde arka plan yoklamasının hataları gösteriliyor.
 
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from rich import print as rprint
@@ -11,10 +21,77 @@ from rich.table import Table
 from rich.panel import Panel  # Z Raporu için eklendi
 from rich.text import Text  # Z Raporu için eklendi
 import datetime
+from itertools import islice
+import ayarlar
 
 # === Konsol Nesnesi ===
 console = Console()
 
+
+def _print_table_stream(rows, new_table, add_row, title, empty_message):
+    """
+    Satırları (liste veya db_config.iter_rows üreteci) [performance] stream_chunk_size satırlık
+    parçalar halinde tablo olarak yazdırır. Büyük listelerde ilk satırlar hemen görünür ve
+    bellekte en fazla bir parça tutulur.
+    Args:
+        new_table (callable): new_table(first) -> Table; first sadece ilk parça için True.
+        add_row (callable): add_row(table, sıra_no, satır)
+    Returns:
+        int: Yazdırılan satır sayısı.
+    """
+    batch_size = ayarlar.get_settings().performance.stream_chunk_size
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        if count == 0:
+            console.print(f"\n--- {title} ---", style="bold blue")
+        table = new_table(count == 0)
+        for row in batch:
+            count += 1
+            add_row(table, count, row)
+        console.print(table)
+    if count == 0:
+        console.print(empty_message, style="yellow")
+    return count
+
+
+def browse_pages(fetch_page, display_page, title):
+    """
+    Sayfalı bir listeyi gösterir; kullanıcı (S)onraki / (Ö)nceki ile sayfalar arasında gezinir.
+    Args:
+        fetch_page (callable): fetch_page(after=None, before=None) -> db_config.fetch_keyset_page sonucu.
+        display_page (callable): display_page(satırlar, başlık); ör. display_product_list.
+    """
+    page = fetch_page()
+    page_no = 1
+    display_page(page['rows'], f"{title} (Sayfa {page_no})")
+    while True:
+        options = []
+        if page['has_next']:
+            options.append("[bold](S)[/]onraki")
+        if page['has_previous']:
+            options.append("[bold](Ö)[/]nceki")
+        if not options:
+            return
+        options.append("[bold](Ç)[/]ıkış")
+        console.print(" / ".join(options) + " (Enter: Sonraki): ", end="")
+        choice = input().strip().upper()
+        if choice in ('S', '') and page['has_next']:
+            page = fetch_page(after=page['last_key'])
+            page_no += 1
+        elif choice in ('Ö', 'O') and page['has_previous']:
+            page = fetch_page(before=page['first_key'])
+            page_no -= 1
+        elif choice in ('Ç', 'C', ''):
+            return
+        else:
+            console.print(">>> Geçersiz seçim.", style="bold red")
+            continue
+        display_page(page['rows'], f"{title} (Sayfa {page_no})")
+
 # === Girdi Alma Fonksiyonları ===
 # ... (Tüm get_* fonksiyonları - değişiklik yok) ...
 
@@ -88,6 +165,27 @@ def get_yes_no_input(prompt):
                 ">>> Geçersiz giriş. Lütfen sadece 'E' veya 'H' girin.", style="bold red")
 
 
+def get_active_filter_input(prompt="Durum"):
+    """
+    Listeleme için durum filtresi sorar.
+    Returns:
+        True: sadece aktifler (varsayılan, boş giriş), False: sadece pasifler, None: tümü.
+    """
+    while True:
+        console.print(
+            prompt + " [bold green](A)[/]ktif / [bold red](P)[/]asif / [bold](T)[/]üm (Enter: Aktif): ", end="")
+        user_input = input().strip().upper()
+        if user_input in ('', 'A'):
+            return True
+        elif user_input == 'P':
+            return False
+        elif user_input == 'T':
+            return None
+        else:
+            console.print(
+                ">>> Geçersiz giriş. Lütfen 'A', 'P' veya 'T' girin.", style="bold red")
+
+
 def get_positive_decimal_input(prompt, allow_zero=False):
     """Kullanıcıdan pozitif bir ondalık sayı (Decimal) alır."""
     while True:
@@ -286,6 +384,28 @@ def collect_payments(sale_subtotal: Decimal, payment_methods: tuple, selected_cu
 
     return payments_list_for_db, total_paid_input
 
+# === Miktar ve Tutar ===
+
+def format_quantity(quantity):
+    """Miktarı gereksiz ondalık sıfırlar olmadan yazar (Decimal('2.000') -> '2', Decimal('1.250') -> '1.25')."""
+    if isinstance(quantity, Decimal):
+        if quantity == quantity.to_integral_value():
+            return str(quantity.quantize(Decimal('1')))
+        return str(quantity.normalize())
+    return str(quantity) if quantity is not None else "-"
+
+
+def get_line_total(item):
+    """
+    Sepet satırının tutarı (kuruşa yuvarlanmış). Fiyatı barkoda gömülü terazi ürünlerinde
+    satırdaki line_total (barkoddaki tutar) kullanılır.
+    """
+    line_total = item.get('line_total')
+    if line_total is not None:
+        return line_total
+    return (item['price_at_sale'] * item['quantity']).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
 # === Gösterim Fonksiyonları ===
 # ... (display_cart, display_customer_list, display_customer_list_detailed, display_customer_balance, display_customer_details, display_customer_ledger, display_product_list, display_daily_sales_summary, display_top_products_report, display_purchase_summary, display_supplier_list, display_sale_details_for_confirmation, display_user_list, display_profit_loss_report, display_stock_report, display_category_list, display_customer_coupons, print_receipt, display_suspended_sales_list, display_expiry_report, display_z_report, display_simplified_menu fonksiyonları - değişiklik yok) ...
 
@@ -308,9 +428,9 @@ def display_cart(cart):
         table.add_column("Birim Fiyat (TL)", justify="right", style="yellow")
         table.add_column("Toplam (TL)", justify="right", style="bold yellow")
         for i, item in enumerate(cart, start=1):
-            item_total = item['price_at_sale'] * item['quantity']
+            item_total = get_line_total(item)
             table.add_row(
-                str(i), item['name'], str(item['quantity']),
+                str(i), item['name'], format_quantity(item['quantity']),
                 f"{item['price_at_sale']:.2f}", f"{item_total:.2f}"
             )
             subtotal += item_total
@@ -347,26 +467,22 @@ def display_customer_list(customer_list, title="Müşteri Listesi"):
 
 
 def display_customer_list_detailed(customers, title="Müşteri Listesi"):
-    """Verilen müşteri listesini (detaylı, puan dahil) tablo olarak gösterir."""
-    if not customers:
-        console.print(
-            f">>> {title} için gösterilecek müşteri yok.", style="yellow")
-        return
-
-    console.print(f"\n--- {title} ---", style="bold blue")
-    table = Table(title=title, show_header=True,
-                  header_style="magenta", border_style="blue")
-    headers = ["ID", "Ad Soyad", "Telefon",
-               "E-posta", "Bakiye (TL)", "Puan", "Durum"]
-    table.add_column(headers[0], style="dim", justify="right")
-    table.add_column(headers[1], style="cyan", min_width=20)
-    table.add_column(headers[2], style="green")
-    table.add_column(headers[3], style="yellow")
-    table.add_column(headers[4], justify="right")
-    table.add_column(headers[5], justify="right", style="bold blue")
-    table.add_column(headers[6], justify="center")
-
-    for cust in customers:
+    """Verilen müşteri listesini (detaylı, puan dahil; liste veya üreteç) tablo olarak gösterir."""
+    def new_table(first):
+        table = Table(title=title if first else None, show_header=True,
+                      header_style="magenta", border_style="blue")
+        headers = ["ID", "Ad Soyad", "Telefon",
+                   "E-posta", "Bakiye (TL)", "Puan", "Durum"]
+        table.add_column(headers[0], style="dim", justify="right")
+        table.add_column(headers[1], style="cyan", min_width=20)
+        table.add_column(headers[2], style="green")
+        table.add_column(headers[3], style="yellow")
+        table.add_column(headers[4], justify="right")
+        table.add_column(headers[5], justify="right", style="bold blue")
+        table.add_column(headers[6], justify="center")
+        return table
+
+    def add_row(table, i, cust):
         balance = cust.get('balance', Decimal('0.00'))
         loyalty_points = cust.get('loyalty_points', 0)
         balance_style = "red" if balance > Decimal(
@@ -382,8 +498,10 @@ def display_customer_list_detailed(customers, title="Müşteri Listesi"):
             points_str,
             status
         )
-    console.print(table)
-    console.print(f"\nToplam {len(customers)} müşteri listelendi.")
+    count = _print_table_stream(customers, new_table, add_row, title,
+                                f">>> {title} için gösterilecek müşteri yok.")
+    if count:
+        console.print(f"\nToplam {count} müşteri listelendi.")
 
 
 def display_customer_balance(customer_name, balance):
@@ -464,32 +582,28 @@ def display_customer_ledger(customer_name, ledger_entries, current_balance):
 
 
 def display_product_list(products, title="Ürün Listesi"):
-    """Verilen ürün listesini (sözlük listesi) tablo olarak gösterir."""
-    if not products:
-        console.print(
-            f">>> {title} için gösterilecek ürün yok.", style="yellow")
-        return
-
-    console.print(f"\n--- {title} ---", style="bold blue")
-    table = Table(title=title, show_header=True,
-                  header_style="magenta", border_style="blue")
-    headers = ["No", "ID", "Barkod", "Ürün Adı", "Marka", "Kategori",  # Marka eklendi
-               "KDV H.", "KDV%", "Satış F.", "Stok", "Min. Stok", "Durum"]
-    table.add_column(headers[0], style="dim", justify="right", width=4)
-    table.add_column(headers[1], style="dim", justify="right")
-    table.add_column(headers[2], style="cyan")
-    table.add_column(headers[3], style="green", min_width=20)
-    table.add_column(headers[4], style="blue", min_width=15)  # Marka sütunu
-    table.add_column(headers[5], style="magenta",
-                     min_width=15)  # Kategori sütunu
-    table.add_column(headers[6], style="blue", justify="right")  # KDV H.
-    table.add_column(headers[7], style="blue", justify="right")  # KDV%
-    table.add_column(headers[8], style="yellow", justify="right")  # Satış F.
-    table.add_column(headers[9], style="blue", justify="right")  # Stok
-    table.add_column(headers[10], style="dim", justify="right")  # Min Stok
-    table.add_column(headers[11], justify="center")  # Durum
-
-    for i, p_dict in enumerate(products, start=1):
+    """Verilen ürün listesini (sözlük listesi veya üreteç) tablo olarak gösterir."""
+    def new_table(first):
+        table = Table(title=title if first else None, show_header=True,
+                      header_style="magenta", border_style="blue")
+        headers = ["No", "ID", "Barkod", "Ürün Adı", "Marka", "Kategori",  # Marka eklendi
+                   "KDV H.", "KDV%", "Satış F.", "Stok", "Min. Stok", "Durum"]
+        table.add_column(headers[0], style="dim", justify="right", width=4)
+        table.add_column(headers[1], style="dim", justify="right")
+        table.add_column(headers[2], style="cyan")
+        table.add_column(headers[3], style="green", min_width=20)
+        table.add_column(headers[4], style="blue", min_width=15)  # Marka sütunu
+        table.add_column(headers[5], style="magenta",
+                         min_width=15)  # Kategori sütunu
+        table.add_column(headers[6], style="blue", justify="right")  # KDV H.
+        table.add_column(headers[7], style="blue", justify="right")  # KDV%
+        table.add_column(headers[8], style="yellow", justify="right")  # Satış F.
+        table.add_column(headers[9], style="blue", justify="right")  # Stok
+        table.add_column(headers[10], style="dim", justify="right")  # Min Stok
+        table.add_column(headers[11], justify="center")  # Durum
+        return table
+
+    def add_row(table, i, p_dict):
         status = "[green]Aktif[/]" if p_dict.get(
             'is_active') else "[red]Pasif[/]"
         price_b_kdv = p_dict.get('price_before_kdv')
@@ -503,7 +617,7 @@ def display_product_list(products, title="Ürün Listesi"):
         price_before_kdv_str = f"{price_b_kdv:.2f}" if price_b_kdv is not None else "-"
         kdv_rate_str = f"{kdv_rate:.2f}" if kdv_rate is not None else "-"
         selling_price_str = f"{selling_price:.2f}" if selling_price is not None else "-"
-        stock_str = str(stock) if stock is not None else "-"
+        stock_str = format_quantity(stock)
         min_stock_str = str(min_stock) if min_stock is not None else "-"
 
         stock_style = "blue"
@@ -530,8 +644,10 @@ def display_product_list(products, title="Ürün Listesi"):
             stock_display,
             min_stock_str, status
         )
-    console.print(table)
-    console.print(f"\nToplam {len(products)} ürün listelendi.")
+    count = _print_table_stream(products, new_table, add_row, title,
+                                f">>> {title} için gösterilecek ürün yok.")
+    if count:
+        console.print(f"\nToplam {count} ürün listelendi.")
 
 
 def display_daily_sales_summary(summary_data, start_date=None, end_date=None):
@@ -669,26 +785,22 @@ def display_purchase_summary(items_list):
 
 
 def display_supplier_list(suppliers, title="Tedarikçi Listesi"):
-    """Verilen tedarikçi listesini tablo olarak gösterir."""
-    if not suppliers:
-        console.print(
-            f">>> {title} için gösterilecek tedarikçi yok.", style="yellow")
-        return
-
-    console.print(f"\n--- {title} ---", style="bold blue")
-    table = Table(title=title, show_header=True,
-                  header_style="magenta", border_style="blue")
-    headers = ["No", "ID", "Tedarikçi Adı",
-               "İlgili Kişi", "Telefon", "E-posta", "Durum"]
-    table.add_column(headers[0], style="dim", justify="right", width=4)
-    table.add_column(headers[1], style="dim", justify="right")
-    table.add_column(headers[2], style="cyan", min_width=20)
-    table.add_column(headers[3], style="white")
-    table.add_column(headers[4], style="green")
-    table.add_column(headers[5], style="yellow")
-    table.add_column(headers[6], justify="center")
-
-    for i, s in enumerate(suppliers, start=1):
+    """Verilen tedarikçi listesini (liste veya üreteç) tablo olarak gösterir."""
+    def new_table(first):
+        table = Table(title=title if first else None, show_header=True,
+                      header_style="magenta", border_style="blue")
+        headers = ["No", "ID", "Tedarikçi Adı",
+                   "İlgili Kişi", "Telefon", "E-posta", "Durum"]
+        table.add_column(headers[0], style="dim", justify="right", width=4)
+        table.add_column(headers[1], style="dim", justify="right")
+        table.add_column(headers[2], style="cyan", min_width=20)
+        table.add_column(headers[3], style="white")
+        table.add_column(headers[4], style="green")
+        table.add_column(headers[5], style="yellow")
+        table.add_column(headers[6], justify="center")
+        return table
+
+    def add_row(table, i, s):
         if isinstance(s, dict):
             supplier_id = s.get('supplier_id', '-')
             name = s.get('name', '-')
@@ -704,14 +816,16 @@ def display_supplier_list(suppliers, title="Tedarikçi Listesi"):
             email = s[4] or "-"
             is_active = s[5]
         else:
-            continue
+            return
 
         status = "[green]Aktif[/]" if is_active else "[red]Pasif[/]"
         table.add_row(f"{i}.", str(supplier_id), name,
                       contact, phone, email, status)
 
-    console.print(table)
-    console.print(f"\nToplam {len(suppliers)} tedarikçi listelendi.")
+    count = _print_table_stream(suppliers, new_table, add_row, title,
+                                f">>> {title} için gösterilecek tedarikçi yok.")
+    if count:
+        console.print(f"\nToplam {count} tedarikçi listelendi.")
 
 
 def display_sale_details_for_confirmation(sale_details):
@@ -752,9 +866,10 @@ def display_sale_details_for_confirmation(sale_details):
         table.add_column("Ürün Adı", style="cyan")
         table.add_column("Miktar", justify="right")
         table.add_column("Birim Fiyat (TL)", justify="right")
+        table.add_column("Tutar (TL)", justify="right")
         for item in items:
-            pid, name, qty, price = item
-            table.add_row(str(pid), name, str(qty), f"{price:.2f}")
+            pid, name, qty, price, line_total = item
+            table.add_row(str(pid), name, format_quantity(qty), f"{price:.2f}", f"{line_total:.2f}")
         console.print(table)
     else:
         console.print(">>> Bu satışa ait ürün bulunamadı.", style="yellow")
@@ -891,7 +1006,7 @@ def display_stock_report(stock_data, threshold=None, include_inactive=False, onl
         min_stock = row.get('min_stock_level', 2)
         is_active = row.get('is_active')
 
-        stock_str = str(stock) if stock is not None else "-"
+        stock_str = format_quantity(stock)
         min_stock_str = str(min_stock) if min_stock is not None else "-"
         status_str = "[green]Aktif[/]" if is_active else "[red]Pasif[/]"
 
@@ -904,7 +1019,7 @@ def display_stock_report(stock_data, threshold=None, include_inactive=False, onl
             elif stock == 0:
                 stock_style = "bold red"
                 row_style = "red"
-            elif stock <= min_stock:
+            elif min_stock is not None and stock <= min_stock:
                 stock_style = "bold yellow"
                 row_style = "yellow"
             elif not only_critical and threshold is not None and stock <= threshold:
@@ -1029,8 +1144,8 @@ def print_receipt(cart, sale_subtotal, payments_list, total_paid, change_due, st
         table.add_column("Mx Fyt", justify="right", style="dim", ratio=3)
         table.add_column("Tutar", justify="right", style="bold", ratio=2)
         for item in cart:
-            item_total = item['price_at_sale'] * item['quantity']
-            mx_fyt = f"{item['quantity']}x{item['price_at_sale']:.2f}"
+            item_total = get_line_total(item)
+            mx_fyt = f"{format_quantity(item['quantity'])}x{item['price_at_sale']:.2f}"
             table.add_row(item['name'], mx_fyt, f"{item_total:.2f}")
         console.print(table)
         console.print("-" * receipt_width, style="dim")
@@ -1089,8 +1204,7 @@ def display_suspended_sales_list(suspended_sales):
     for sale_id, cart_items in suspended_sales.items():
         item_count = len(cart_items)
         first_item_name = cart_items[0]['name'] if item_count > 0 else "-"
-        total_amount = sum(item['price_at_sale'] * item['quantity']
-                           for item in cart_items)
+        total_amount = sum(get_line_total(item) for item in cart_items)
         table.add_row(str(sale_id), str(item_count),
                       first_item_name, f"{total_amount:.2f} TL")
     console.print(table)
@@ -1336,6 +1450,8 @@ def display_simplified_menu(logged_in_user=None, quick_buttons_info=None):
         "│ [yellow]21[/]: Stok Sayım/Düzeltme (Manuel)   │", style="cyan")
     console.print(
         "│ [yellow]22[/]: Ürün Aktif/Pasif Yap           │", style="cyan")
+    console.print(
+        "│ [yellow]B1[/]: Ürün Ek Barkodları             │", style="cyan")
     console.print("├───────────── Marka İşlemleri ──────────┤",
                   style="bold cyan")
     console.print(
@@ -1386,10 +1502,14 @@ def display_simplified_menu(logged_in_user=None, quick_buttons_info=None):
         "│ [yellow]41[/]: Kâr/Zarar Raporu (Tahmini)    │", style="cyan")
     console.print(
         "│ [yellow]42[/]: SKT Raporu                     │", style="cyan")
+    console.print(
+        "│ [yellow]A1[/]: Stok Analizi                   │", style="cyan")
     console.print("├───────────── Hesap İşlemleri ──────────┤",
                   style="bold cyan")
     console.print(
         "│ [yellow]43[/]: Şifre Değiştir                 │", style="cyan")
+    console.print(
+        "│ [yellow]K1[/]: Ürün Kataloğunu Yenile         │", style="cyan")
     if is_admin:
         console.print(
             "├───────────── Yönetim ──────────────────┤", style="bold cyan")
@@ -1401,6 +1521,8 @@ def display_simplified_menu(logged_in_user=None, quick_buttons_info=None):
             "│ [yellow]46[/]: Kullanıcı Güncelle             │", style="cyan")
         console.print(
             "│ [yellow]47[/]: Kullanıcı Aktif/Pasif Yap      │", style="cyan")
+        console.print(
+            "│ [yellow]P1[/]: Performans İstatistikleri      │", style="cyan")
     console.print("├─────────────────────────────────────────┤",
                   style="bold cyan")
     console.print(
@@ -1457,4 +1579,255 @@ def display_order_suggestion_report(report_data):
         f"\nToplam {len(report_data)} ürün için sipariş önerisi listelendi.")
 # ***** YENİ FONKSİYON SONU *****
 
+
+def display_stock_analysis(summary, category_rows, band_rows, loaded_at=None):
+    """
+    Stok analizini (urun_analiz) gösterir: genel özet, kategori bazında stok değeri ve fiyat bandı dağılımı.
+    Alış değeri son alış fiyatıyla hesaplanır; negatif stoklar değere katılmaz.
+    """
+    title = "Stok Analizi"
+    if loaded_at:
+        title += f" ({loaded_at.strftime('%d.%m.%Y %H:%M:%S')})"
+    console.print(f"\n--- {title} ---", style="bold blue")
+
+    table = Table(show_header=False, box=None)
+    table.add_column("Alan", style="cyan")
+    table.add_column("Değer", style="yellow", justify="right")
+    table.add_row("Ürün (Aktif / Toplam)", f"{summary['active']} / {summary['products']}")
+    table.add_row("Kritik Stok (Min. Stok Altı)", str(summary['critical']))
+    table.add_row("Eksi Stok", str(summary['negative_stock']))
+    table.add_row("Stok Değeri (Alış)", f"{summary['cost_value']:.2f} TL")
+    table.add_row("Stok Değeri (Satış)", f"{summary['retail_value']:.2f} TL")
+    table.add_row("Alış Fiyatı Bilinmeyen (Stoklu)", str(summary['unknown_cost']))
+    console.print(table)
+
+    if category_rows:
+        table = Table(title="Kategori Bazında Stok Değeri", show_header=True,
+                      header_style="magenta", border_style="blue")
+        table.add_column("Kategori", style="green", min_width=20)
+        table.add_column("Ürün", justify="right")
+        table.add_column("Kritik", style="yellow", justify="right")
+        table.add_column("Stok", style="blue", justify="right")
+        table.add_column("Alış Değeri (TL)", justify="right")
+        table.add_column("Satış Değeri (TL)", style="bold", justify="right")
+        table.add_column("Alışı Bilinmeyen", style="dim", justify="right")
+        for row in category_rows:
+            table.add_row(
+                row['category_name'] or "[dim](Kategorisiz)[/]",
+                str(row['products']),
+                str(row['critical']) if row['critical'] else "-",
+                format_quantity(row['stock']),
+                f"{row['cost_value']:.2f}",
+                f"{row['retail_value']:.2f}",
+                str(row['unknown_cost']) if row['unknown_cost'] else "-"
+            )
+        console.print(table)
+
+    if band_rows:
+        table = Table(title="Fiyat Bantları (Satış Fiyatı)", show_header=True,
+                      header_style="magenta", border_style="blue")
+        table.add_column("Fiyat Aralığı (TL)", style="cyan")
+        table.add_column("Ürün", justify="right")
+        table.add_column("Stok", style="blue", justify="right")
+        table.add_column("Satış Değeri (TL)", style="bold", justify="right")
+        for row in band_rows:
+            band = f"{row['low']} - {row['high']}" if row['high'] is not None else f"{row['low']} ve üzeri"
+            table.add_row(band, str(row['products']), format_quantity(row['stock']), f"{row['retail_value']:.2f}")
+        console.print(table)
+
 # === Diğer UI fonksiyonları ... ===
+
+
+# ***** YENİ FONKSİYON: Performans İstatistikleri Gösterimi *****
+
+
+def display_catalog_stats(stats):
+    """Ürün kataloğu (urun_katalogu) önbellek istatistiklerini gösterir."""
+    title = "Ürün Kataloğu Önbelleği"
+    console.print(f"\n--- {title} ---", style="bold blue")
+    last_refresh = stats.get('last_refresh')
+    last_refresh_str = last_refresh.strftime('%H:%M:%S') if last_refresh else "-"
+    high_water = stats.get('high_water')
+    high_water_str = high_water.strftime('%d.%m.%Y %H:%M:%S') if high_water else "-"
+    table = Table(show_header=False, box=None)
+    table.add_column("Alan", style="cyan")
+    table.add_column("Değer", style="yellow", justify="right")
+    table.add_row("Ürün Sayısı", str(stats['products']))
+    table.add_row("Ek Barkod Sayısı", str(stats['aliases']))
+    table.add_row("İsabet (bellekten)", str(stats['hits']))
+    table.add_row("Iska (veritabanından)", str(stats['misses']))
+    table.add_row("İsabet Oranı", f"%{stats['hit_rate'] * 100:.1f}")
+    table.add_row("Tam Yükleme", f"{stats['loads']} (son: {stats['load_seconds']:.2f} sn)")
+    table.add_row("Artımlı Yenileme", f"{stats['refreshes']} ({stats['refreshed_rows']} ürün)")
+    table.add_row("Son Yenileme", last_refresh_str)
+    table.add_row("En Son Değişiklik", high_water_str)
+    table.add_row("İsim Araması", f"{stats['searches']} (ort. {stats['search_avg_ms']:.2f} ms)")
+    table.add_row("Bulanık Arama (tam eşleşme yok)", str(stats['fuzzy_searches']))
+    table.add_row("Yoklama Hatası (arka plan)", str(stats['refresh_errors']))
+    console.print(table)
+    if stats.get('last_error'):
+        console.print(f"[dim]Son hata: {stats['last_error']}[/]")
+
+
+def display_barcode_stats(stats):
+    """Barkod doğrulama ve bulunamayan barkod önbelleği (barkod) istatistiklerini gösterir."""
+    title = "Barkod Doğrulama"
+    console.print(f"\n--- {title} ---", style="bold blue")
+    table = Table(show_header=False, box=None)
+    table.add_column("Alan", style="cyan")
+    table.add_column("Değer", style="yellow", justify="right")
+    table.add_row("Reddedilen (kontrol hanesi)", str(stats['rejected']))
+    table.add_row("Önbellekteki Bulunamayan Barkod", str(stats['size']))
+    table.add_row("Önlenen Sorgu", str(stats['hits']))
+    table.add_row("Eklenen / Atılan", f"{stats['added']} / {stats['evicted']}")
+    table.add_row("Ürün Eklenince Silinen", str(stats['cleared']))
+    console.print(table)
+
+
+def display_quick_button_stats(stats):
+    """Hızlı buton ürünlerinin arka plan yenileme (hizli_butonlar) istatistiklerini gösterir."""
+    title = "Hızlı Buton Yenileme"
+    console.print(f"\n--- {title} ---", style="bold blue")
+    last_refresh = stats.get('last_refresh')
+    table = Table(show_header=False, box=None)
+    table.add_column("Alan", style="cyan")
+    table.add_column("Değer", style="yellow", justify="right")
+    table.add_row("Buton / Bulunan Ürün", f"{stats['buttons']} / {stats['products']}")
+    table.add_row("Arka Plan Yenileme", str(stats['refreshes']))
+    table.add_row("Değişen Ürün (last_updated)", str(stats['changed']))
+    table.add_row("Son Yenileme", last_refresh.strftime('%H:%M:%S') if last_refresh else "-")
+    table.add_row("Hata", str(stats['errors']))
+    console.print(table)
+    if stats.get('last_error'):
+        console.print(f"[dim]Son hata: {stats['last_error']}[/]")
+
+
+def display_scale_barcode_stats(stats):
+    """Terazi barkodu çözme (terazi_barkodu) istatistiklerini gösterir."""
+    title = "Terazi Barkodları"
+    console.print(f"\n--- {title} ---", style="bold blue")
+    table = Table(show_header=False, box=None)
+    table.add_column("Alan", style="cyan")
+    table.add_column("Değer", style="yellow", justify="right")
+    table.add_row("Tanımlı Kural", str(stats['rules']))
+    table.add_row("Kurala Uyan Barkod", str(stats['decoded']))
+    table.add_row("Sepete Eklenen", str(stats['resolved']))
+    table.add_row("PLU Bulunamayan", str(stats['unknown_plu']))
+    console.print(table)
+
+
+def display_reference_cache_stats(stats):
+    """Marka, kategori ve tedarikçi indeksi (referans_onbellek) istatistiklerini gösterir."""
+    title = "Marka / Kategori / Tedarikçi İndeksi"
+    console.print(f"\n--- {title} ---", style="bold blue")
+    table = Table(show_header=True, header_style="magenta", border_style="blue")
+    table.add_column("Liste", style="cyan")
+    table.add_column("Kayıt", justify="right")
+    table.add_column("Yükleme", justify="right")
+    table.add_column("Bellekten", style="yellow", justify="right")
+    table.add_column("Geçersiz Kılma", justify="right")
+    table.add_column("Yaş (sn)", style="dim", justify="right")
+    for row in stats:
+        age = row.get('age')
+        table.add_row(row['title'], str(row['rows']), str(row['loads']), str(row['hits']),
+                      str(row['invalidations']), f"{age:.0f}" if age is not None else "-")
+    console.print(table)
+
+
+def display_performance_stats(prepared_stats, latency_stats=None, tx_stats=None, report_stats=None,
+                              catalog_stats=None, barcode_stats=None, quick_button_stats=None,
+                              scale_barcode_stats=None, reference_stats=None):
+    """
+    Sorgu süre ölçümlerini, işlem tekrar sayılarını, salt okunur rapor istatistiklerini,
+    ürün kataloğu ve barkod önbelleklerini, hızlı buton yenilemesini, terazi barkodlarını, marka/kategori/tedarikçi
+    indeksini ve hazır ifade (prepared statement) istatistiklerini tablo olarak gösterir.
+    """
+    if catalog_stats is not None:
+        display_catalog_stats(catalog_stats)
+    if barcode_stats is not None:
+        display_barcode_stats(barcode_stats)
+    if quick_button_stats is not None and quick_button_stats['buttons']:
+        display_quick_button_stats(quick_button_stats)
+    if scale_barcode_stats is not None and scale_barcode_stats['rules']:
+        display_scale_barcode_stats(scale_barcode_stats)
+    if reference_stats is not None:
+        display_reference_cache_stats(reference_stats)
+
+    if latency_stats is not None:
+        title = "Sorgu Süreleri"
+        console.print(f"\n--- {title} ---", style="bold blue")
+        if not latency_stats:
+            console.print(">>> Henüz ölçülen sorgu yok.", style="yellow")
+        else:
+            table = Table(title=title, show_header=True,
+                          header_style="magenta", border_style="blue")
+            table.add_column("Sorgu", style="cyan", min_width=30)
+            table.add_column("Adet", style="yellow", justify="right")
+            table.add_column("Toplam (ms)", style="green", justify="right")
+            table.add_column("p50", justify="right")
+            table.add_column("p95", justify="right")
+            table.add_column("p99", style="bold red", justify="right")
+            for q in latency_stats:
+                table.add_row(q['query'], str(q['count']), f"{q['total_ms']:.1f}",
+                              f"{q['p50_ms']:.2f}", f"{q['p95_ms']:.2f}", f"{q['p99_ms']:.2f}")
+            console.print(table)
+            console.print("[dim](Süreler milisaniye; toplam süreye göre sıralıdır. Sonuç okuma süresi dahildir.)[/]")
+
+    if tx_stats:
+        title = "İşlem Tekrarları (Deadlock / Kilit Bekleme)"
+        console.print(f"\n--- {title} ---", style="bold blue")
+        table = Table(title=title, show_header=True,
+                      header_style="magenta", border_style="blue")
+        table.add_column("İşlem", style="cyan", min_width=30)
+        table.add_column("Çalışma", style="yellow", justify="right")
+        table.add_column("Tekrar", style="green", justify="right")
+        table.add_column("Vazgeçilen", style="bold red", justify="right")
+        table.add_column("Hata Kodları", style="dim")
+        for name, t in sorted(tx_stats.items()):
+            errnos = ", ".join(f"{errno}: {count}" for errno, count in sorted(t['by_errno'].items()))
+            table.add_row(name, str(t['runs']), str(t['retries']), str(t['gave_up']), errnos or "-")
+        console.print(table)
+
+    if report_stats and report_stats.get('reports'):
+        title = "Raporlar (Salt Okunur İşlem)"
+        console.print(f"\n--- {title} ---", style="bold blue")
+        table = Table(title=title, show_header=True,
+                      header_style="magenta", border_style="blue")
+        table.add_column("Rapor", style="cyan", min_width=30)
+        table.add_column("Adet", style="yellow", justify="right")
+        table.add_column("Kopyada", justify="right")
+        table.add_column("Ort. (ms)", style="green", justify="right")
+        table.add_column("En Yüksek", justify="right")
+        table.add_column("Kilit Bekleme", style="bold red", justify="right")
+        table.add_column("Çakışan Satış", justify="right")
+        table.add_column("Satış Ort. (ms)", justify="right")
+        for name, r in sorted(report_stats['reports'].items()):
+            table.add_row(name, str(r['runs']), str(r['replica_runs']), f"{r['avg_ms']:.1f}", f"{r['max_ms']:.1f}",
+                          f"{r['lock_waits']} / {r['lock_wait_ms']} ms", str(r['tx_count']),
+                          f"{r['tx_avg_ms']:.1f}" if r['tx_count'] else "-")
+        console.print(table)
+        console.print(f"[dim](Kilit Bekleme: rapor sürerken ana sunucudaki tüm satır kilidi beklemeleri. "
+                      f"Çakışan Satış: rapor sürerken bu kasada biten satış/iade/alış işlemleri; "
+                      f"genel ortalama {report_stats['tx_avg_ms']:.1f} ms.)[/]")
+
+    title = "Hazır İfade İstatistikleri"
+    console.print(f"\n--- {title} ---", style="bold blue")
+    if not prepared_stats or not prepared_stats.get('queries'):
+        console.print(">>> Henüz hazır ifade ile çalıştırılan sorgu yok.", style="yellow")
+        return
+
+    table = Table(title=title, show_header=True,
+                  header_style="magenta", border_style="blue")
+    table.add_column("Sorgu", style="cyan", min_width=25)
+    table.add_column("Ayrıştırma", style="yellow", justify="right")
+    table.add_column("Çalıştırma", style="green", justify="right")
+    table.add_column("Kazanç", style="bold green", justify="right")
+    for name, q in sorted(prepared_stats['queries'].items()):
+        table.add_row(name, str(q['prepares']), str(q['executes']), str(q['saved']))
+    table.add_section()
+    table.add_row("[bold]TOPLAM[/]", str(prepared_stats['prepares']),
+                  str(prepared_stats['executes']), str(prepared_stats['saved']))
+    console.print(table)
+    console.print("[dim](Kazanç: Yeniden ayrıştırılmadan sadece bind + execute ile çalıştırılan sorgu sayısı)[/]")
+
+# ***** YENİ FONKSİYON SONU *****
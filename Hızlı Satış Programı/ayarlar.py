@@ -0,0 +1,384 @@
+# ayarlar.py
+# config.ini dosyasını tek bir yerde okuyup türü belli, değiştirilemez (frozen) bir ayar nesnesine çevirir.
+# Dosyanın değiştirilme zamanı (mtime) izlenir; dosya değişince ayarlar programı yeniden
+# başlatmadan tekrar okunur. Diğer modüller configparser yerine get_settings() kullanmalıdır.
+# Not: [database], [mysql] ve [mysql_replica] ayarları bağlantı havuzu kurulurken kullanılır;
+#      bu bölümlerdeki değişiklikler ancak program yeniden başlatılınca etkili olur.
+
+import configparser
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from decimal import Decimal, InvalidOperation
+from rich import print as rprint
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
+
+# Dosya değişikliği en fazla bu aralıkla (saniye) kontrol edilir
+RELOAD_CHECK_INTERVAL = 1.0
+
+# Rapor işlemleri için geçerli MySQL yalıtım (isolation) seviyeleri
+ISOLATION_LEVELS = ('READ UNCOMMITTED', 'READ COMMITTED', 'REPEATABLE READ', 'SERIALIZABLE')
+# İsimle arama yöntemleri: catalog (bellekteki ad indeksi, ürünler için), fulltext (MySQL FULLTEXT ngram), like
+NAME_SEARCH_MODES = ('catalog', 'fulltext', 'like')
+# Terazi barkodu türleri: weight (barkodda miktar/ağırlık), price (barkodda tutar)
+SCALE_BARCODE_KINDS = ('weight', 'price')
+# Terazi barkodlarının toplam uzunluğu (kontrol hanesi dahil): EAN-8, UPC-A, EAN-13
+SCALE_BARCODE_LENGTHS = (8, 12, 13)
+
+
+# === Ayar Sınıfları ===
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """[database] ve [sqlite] bölümleri."""
+    backend: str = 'mysql'
+    sqlite_path: str = 'hsp_yerel.db'
+
+
+@dataclass(frozen=True)
+class MySQLSettings:
+    """[mysql] bölümü (bağlantı, havuz ve yeniden bağlanma ayarları)."""
+    host: str = 'localhost'
+    user: str = 'root'
+    password: str = ''
+    database: str = 'market_pos_db'
+    pool_name: str = 'hsp_pool'
+    pool_size: int = 5
+    reconnect_attempts: int = 5
+    reconnect_base_delay: float = 0.5
+    keepalive_interval: float = 60.0
+    transaction_retries: int = 3  # Deadlock / kilit bekleme hatasında en fazla tekrar sayısı
+    transaction_retry_base_delay: float = 0.05  # saniye; her denemede iki katına çıkar
+    report_isolation_level: str = 'READ COMMITTED'  # Salt okunur rapor işlemlerinin yalıtım seviyesi
+
+    def connection_args(self):
+        """mysql.connector.connect / havuz için bağlantı parametreleri."""
+        return {'host': self.host, 'user': self.user,
+                'password': self.password, 'database': self.database}
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    """[mysql_replica] bölümü. enabled False ise okuma kopyası kullanılmaz."""
+    enabled: bool = False
+    host: str = 'localhost'
+    user: str = 'root'
+    password: str = ''
+    database: str = 'market_pos_db'
+    port: int | None = None
+    pool_size: int = 2
+    max_staleness: float = 30.0
+    check_interval: float = 10.0
+
+    def connection_args(self):
+        args = {'host': self.host, 'user': self.user,
+                'password': self.password, 'database': self.database}
+        if self.port is not None:
+            args['port'] = self.port
+        return args
+
+
+@dataclass(frozen=True)
+class GeneralSettings:
+    """[general] bölümü."""
+    store_name: str = 'Varsayılan Market'
+    payment_methods: tuple = ('Nakit', 'Kredi Kartı', 'Veresiye')
+    default_min_stock: int = 2
+    default_report_limit: int = 10
+    default_kdv_rate: Decimal = Decimal('10.0')
+
+    @property
+    def customer_payment_methods(self):
+        """Müşteri borç ödemesinde kullanılabilecek yöntemler (Veresiye hariç)."""
+        return tuple(m for m in self.payment_methods if m != 'Veresiye')
+
+
+@dataclass(frozen=True)
+class LoyaltySettings:
+    """[loyalty] bölümü."""
+    points_per_tl: Decimal = Decimal('0.1')
+    active_rule_name: str = ''
+
+
+@dataclass(frozen=True)
+class PerformanceSettings:
+    """[performance] bölümü (yavaş sorgu kaydı, akışlı okuma, ürün kataloğu, barkod doğrulama)."""
+    slow_query_ms: float = 500.0  # 0: yavaş sorgu kaydı kapalı
+    slow_query_log: str = 'yavas_sorgular.log'
+    slow_query_log_max_kb: int = 1024
+    slow_query_log_backups: int = 5
+    explain: bool = True  # Yavaş sorgunun çalışma planı (EXPLAIN) da kaydedilsin mi
+    stream_chunk_size: int = 500  # Akışlı (iter_rows) okumada sunucudan bir seferde alınan satır sayısı
+    catalog_cache: bool = True  # Barkod okutmaları bellekteki ürün kataloğundan (urun_katalogu) cevaplansın mı
+    catalog_refresh_interval: float = 30.0  # saniye; katalog arka planda bu aralıkla değişen ürünler için yoklanır (0: kapalı)
+    barcode_check_digit: bool = True  # EAN-8/UPC-A/EAN-13 kontrol hanesi hatalı okutmalar reddedilsin mi
+    missing_barcode_ttl: float = 300.0  # saniye; bulunamayan barkod bu süre boyunca tekrar sorgulanmaz (0: kapalı)
+    missing_barcode_max: int = 1000  # Negatif önbellekte tutulacak en fazla barkod sayısı
+    search_result_limit: int = 50  # İsimle aramada gösterilecek en fazla sonuç (en iyi eşleşmeler)
+    name_search: str = 'catalog'  # Ürün/müşteri/tedarikçi isim araması yöntemi (NAME_SEARCH_MODES)
+    fuzzy_search: bool = True  # İsimle ürün araması sonuç vermezse yazım hatasına toleranslı arama yapılsın mı
+    fuzzy_result_limit: int = 10  # Bulanık aramada gösterilecek en fazla sonuç
+    fuzzy_search_budget_ms: float = 20.0  # Bulanık aramanın en fazla süresi (aşılırsa bulunanlar gösterilir)
+    autocomplete: bool = True  # Sepete ürün eklemede yazdıkça öneri gösterilsin mi (katalog açıkken)
+    autocomplete_limit: int = 8  # Gösterilecek öneri sayısı
+    page_size: int = 20  # Ürün/müşteri/tedarikçi listelerinde bir sayfadaki kayıt sayısı
+    quick_button_refresh_interval: float = 15.0  # saniye; hızlı buton ürünleri arka planda bu aralıkla yenilenir (0: kapalı)
+    reference_cache_ttl: float = 60.0  # saniye; marka/kategori/tedarikçi listeleri (referans_onbellek) en fazla bu aralıkla yeniden okunur
+
+
+@dataclass(frozen=True)
+class ScaleBarcodeRule:
+    """
+    [scale_barcodes] bölümündeki bir kural. Barkod: önek + PLU + değer + kontrol hanesi.
+    Değer, decimals kadar ondalık haneyle okunur (ör. weight, 5 hane, 3 ondalık: 01250 -> 1.250).
+    """
+    prefix: str
+    kind: str  # SCALE_BARCODE_KINDS
+    plu_digits: int = 5
+    value_digits: int = 5
+    decimals: int = 3
+
+    @property
+    def length(self):
+        """Kuralın eşleştiği barkod uzunluğu (kontrol hanesi dahil)."""
+        return len(self.prefix) + self.plu_digits + self.value_digits + 1
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Tüm uygulama ayarları. get_settings() ile alınır, değiştirilemez."""
+    database: DatabaseSettings = field(default_factory=DatabaseSettings)
+    mysql: MySQLSettings = field(default_factory=MySQLSettings)
+    replica: ReplicaSettings = field(default_factory=ReplicaSettings)
+    general: GeneralSettings = field(default_factory=GeneralSettings)
+    loyalty: LoyaltySettings = field(default_factory=LoyaltySettings)
+    performance: PerformanceSettings = field(default_factory=PerformanceSettings)
+    # Hızlı butonlar: (kısayol, barkod) çiftleri, config.ini'deki sırayla
+    quick_buttons: tuple = ()
+    # Terazi (tartılı / fiyatlı) barkod kuralları: ScaleBarcodeRule demeti, config.ini'deki sırayla
+    scale_barcodes: tuple = ()
+    mtime: float = 0.0  # Okunan config.ini dosyasının değiştirilme zamanı
+
+    def quick_button_map(self):
+        """Hızlı butonları {kısayol: barkod} sözlüğü olarak döndürür."""
+        return dict(self.quick_buttons)
+
+
+# === Okuma ===
+
+def _get(config, section, key, fallback, convert, warnings):
+    """Tek bir ayarı okur, geçersizse uyarı ekleyip varsayılanı döndürür."""
+    if not config.has_option(section, key):
+        return fallback
+    raw = config.get(section, key).strip()
+    if raw == '':
+        return fallback
+    try:
+        return convert(raw)
+    except (ValueError, InvalidOperation):
+        warnings.append(f"[{section}] {key} = '{raw}' geçersiz, varsayılan ({fallback}) kullanılıyor.")
+        return fallback
+
+
+def _to_bool(raw):
+    value = raw.lower()
+    if value in ('1', 'true', 'yes', 'on', 'evet'):
+        return True
+    if value in ('0', 'false', 'no', 'off', 'hayir', 'hayır'):
+        return False
+    raise ValueError(raw)
+
+
+def _to_name_search(raw):
+    value = raw.strip().lower()
+    if value not in NAME_SEARCH_MODES:
+        raise ValueError(raw)
+    return value
+
+
+def _to_isolation_level(raw):
+    value = ' '.join(raw.replace('_', ' ').replace('-', ' ').upper().split())
+    if value not in ISOLATION_LEVELS:
+        raise ValueError(raw)
+    return value
+
+
+def _to_scale_barcode_rule(prefix, raw):
+    """'27 = weight, 5, 5, 3' satırını ScaleBarcodeRule'a çevirir (tür dışındaki alanlar isteğe bağlı)."""
+    parts = [part.strip().lower() for part in raw.split(',')]
+    kind = parts[0]
+    if not prefix.isdigit() or kind not in SCALE_BARCODE_KINDS or len(parts) > 4:
+        raise ValueError(raw)
+    defaults = (5, 5, 3 if kind == 'weight' else 2)
+    plu_digits, value_digits, decimals = (int(parts[i + 1]) if i + 1 < len(parts) else defaults[i]
+                                          for i in range(3))
+    rule = ScaleBarcodeRule(prefix=prefix, kind=kind, plu_digits=plu_digits,
+                            value_digits=value_digits, decimals=decimals)
+    if plu_digits < 1 or value_digits < 1 or not 0 <= decimals <= value_digits \
+            or rule.length not in SCALE_BARCODE_LENGTHS:
+        raise ValueError(raw)
+    return rule
+
+
+def _parse(config, mtime):
+    """configparser nesnesinden Settings oluşturur. Returns: (Settings, uyarı listesi)"""
+    warnings = []
+    d_db, d_my, d_rep, d_gen, d_loy, d_perf = (DatabaseSettings(), MySQLSettings(), ReplicaSettings(),
+                                               GeneralSettings(), LoyaltySettings(), PerformanceSettings())
+
+    database = DatabaseSettings(
+        backend=_get(config, 'database', 'backend', d_db.backend, str.lower, warnings),
+        sqlite_path=_get(config, 'sqlite', 'path', d_db.sqlite_path, str, warnings))
+
+    mysql = MySQLSettings(
+        host=_get(config, 'mysql', 'host', d_my.host, str, warnings),
+        user=_get(config, 'mysql', 'user', d_my.user, str, warnings),
+        password=config.get('mysql', 'password', fallback=d_my.password),
+        database=_get(config, 'mysql', 'database', d_my.database, str, warnings),
+        pool_name=_get(config, 'mysql', 'pool_name', d_my.pool_name, str, warnings),
+        pool_size=_get(config, 'mysql', 'pool_size', d_my.pool_size, int, warnings),
+        reconnect_attempts=max(1, _get(config, 'mysql', 'reconnect_attempts', d_my.reconnect_attempts, int, warnings)),
+        reconnect_base_delay=max(0.0, _get(config, 'mysql', 'reconnect_base_delay', d_my.reconnect_base_delay, float, warnings)),
+        keepalive_interval=max(0.0, _get(config, 'mysql', 'keepalive_interval', d_my.keepalive_interval, float, warnings)),
+        transaction_retries=max(0, _get(config, 'mysql', 'transaction_retries', d_my.transaction_retries, int, warnings)),
+        transaction_retry_base_delay=max(0.0, _get(config, 'mysql', 'transaction_retry_base_delay',
+                                                   d_my.transaction_retry_base_delay, float, warnings)),
+        report_isolation_level=_get(config, 'mysql', 'report_isolation_level', d_my.report_isolation_level,
+                                    _to_isolation_level, warnings))
+
+    # Okuma kopyasında boş bırakılan bağlantı ayarları [mysql] bölümünden alınır
+    replica = ReplicaSettings(
+        enabled=config.has_section('mysql_replica') and _get(config, 'mysql_replica', 'enabled', True, _to_bool, warnings),
+        host=_get(config, 'mysql_replica', 'host', mysql.host, str, warnings),
+        user=_get(config, 'mysql_replica', 'user', mysql.user, str, warnings),
+        password=config.get('mysql_replica', 'password', fallback=mysql.password),
+        database=_get(config, 'mysql_replica', 'database', mysql.database, str, warnings),
+        port=_get(config, 'mysql_replica', 'port', d_rep.port, int, warnings),
+        pool_size=_get(config, 'mysql_replica', 'pool_size', d_rep.pool_size, int, warnings),
+        max_staleness=_get(config, 'mysql_replica', 'max_staleness', d_rep.max_staleness, float, warnings),
+        check_interval=_get(config, 'mysql_replica', 'check_interval', d_rep.check_interval, float, warnings))
+
+    payment_methods = d_gen.payment_methods
+    if config.has_option('general', 'payment_methods'):
+        parsed = tuple(m.strip() for m in config.get('general', 'payment_methods').split(',') if m.strip())
+        if parsed:
+            payment_methods = parsed
+        else:
+            warnings.append("[general] payment_methods boş, varsayılan ödeme yöntemleri kullanılıyor.")
+    general = GeneralSettings(
+        store_name=_get(config, 'general', 'store_name', d_gen.store_name, str, warnings),
+        payment_methods=payment_methods,
+        default_min_stock=_get(config, 'general', 'default_min_stock', d_gen.default_min_stock, int, warnings),
+        default_report_limit=_get(config, 'general', 'default_report_limit', d_gen.default_report_limit, int, warnings),
+        default_kdv_rate=_get(config, 'general', 'default_kdv_rate', d_gen.default_kdv_rate, Decimal, warnings))
+
+    loyalty = LoyaltySettings(
+        points_per_tl=_get(config, 'loyalty', 'points_per_tl', d_loy.points_per_tl, Decimal, warnings),
+        active_rule_name=_get(config, 'loyalty', 'active_rule_name', d_loy.active_rule_name, str, warnings))
+
+    performance = PerformanceSettings(
+        slow_query_ms=max(0.0, _get(config, 'performance', 'slow_query_ms', d_perf.slow_query_ms, float, warnings)),
+        slow_query_log=_get(config, 'performance', 'slow_query_log', d_perf.slow_query_log, str, warnings),
+        slow_query_log_max_kb=max(1, _get(config, 'performance', 'slow_query_log_max_kb', d_perf.slow_query_log_max_kb, int, warnings)),
+        slow_query_log_backups=max(0, _get(config, 'performance', 'slow_query_log_backups', d_perf.slow_query_log_backups, int, warnings)),
+        explain=_get(config, 'performance', 'explain', d_perf.explain, _to_bool, warnings),
+        stream_chunk_size=max(1, _get(config, 'performance', 'stream_chunk_size', d_perf.stream_chunk_size, int, warnings)),
+        catalog_cache=_get(config, 'performance', 'catalog_cache', d_perf.catalog_cache, _to_bool, warnings),
+        catalog_refresh_interval=max(0.0, _get(config, 'performance', 'catalog_refresh_interval',
+                                               d_perf.catalog_refresh_interval, float, warnings)),
+        barcode_check_digit=_get(config, 'performance', 'barcode_check_digit', d_perf.barcode_check_digit, _to_bool, warnings),
+        missing_barcode_ttl=max(0.0, _get(config, 'performance', 'missing_barcode_ttl', d_perf.missing_barcode_ttl, float, warnings)),
+        missing_barcode_max=max(1, _get(config, 'performance', 'missing_barcode_max', d_perf.missing_barcode_max, int, warnings)),
+        search_result_limit=max(1, _get(config, 'performance', 'search_result_limit', d_perf.search_result_limit, int, warnings)),
+        name_search=_get(config, 'performance', 'name_search', d_perf.name_search, _to_name_search, warnings),
+        fuzzy_search=_get(config, 'performance', 'fuzzy_search', d_perf.fuzzy_search, _to_bool, warnings),
+        fuzzy_result_limit=max(1, _get(config, 'performance', 'fuzzy_result_limit', d_perf.fuzzy_result_limit, int, warnings)),
+        fuzzy_search_budget_ms=max(1.0, _get(config, 'performance', 'fuzzy_search_budget_ms',
+                                             d_perf.fuzzy_search_budget_ms, float, warnings)),
+        autocomplete=_get(config, 'performance', 'autocomplete', d_perf.autocomplete, _to_bool, warnings),
+        autocomplete_limit=max(1, _get(config, 'performance', 'autocomplete_limit', d_perf.autocomplete_limit, int, warnings)),
+        page_size=max(1, _get(config, 'performance', 'page_size', d_perf.page_size, int, warnings)),
+        quick_button_refresh_interval=max(0.0, _get(config, 'performance', 'quick_button_refresh_interval',
+                                                    d_perf.quick_button_refresh_interval, float, warnings)),
+        reference_cache_ttl=max(0.0, _get(config, 'performance', 'reference_cache_ttl',
+                                          d_perf.reference_cache_ttl, float, warnings)))
+
+    quick_buttons = ()
+    if config.has_section('quick_buttons'):
+        quick_buttons = tuple((key.strip().lower(), value.strip())
+                              for key, value in config.items('quick_buttons') if value.strip())
+
+    scale_barcodes = []
+    if config.has_section('scale_barcodes'):
+        for prefix, raw in config.items('scale_barcodes'):
+            try:
+                scale_barcodes.append(_to_scale_barcode_rule(prefix.strip(), raw))
+            except ValueError:
+                warnings.append(f"[scale_barcodes] {prefix} = '{raw}' geçersiz, kural kullanılmıyor.")
+
+    settings = Settings(database=database, mysql=mysql, replica=replica, general=general,
+                        loyalty=loyalty, performance=performance, quick_buttons=quick_buttons,
+                        scale_barcodes=tuple(scale_barcodes), mtime=mtime)
+    return settings, warnings
+
+
+def load_settings(path=CONFIG_PATH):
+    """
+    config.ini dosyasını okuyup yeni bir Settings nesnesi döndürür (önbelleği kullanmaz).
+    Dosya yoksa tüm ayarlar varsayılan değerlerle döner.
+    """
+    config = configparser.ConfigParser(interpolation=None)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        rprint(f"[yellow]Uyarı: Yapılandırma dosyası okunamadı: {path}. Varsayılan değerler kullanılıyor.[/]")
+        return Settings()
+    config.read(path, encoding='utf-8')
+    settings, warnings = _parse(config, mtime)
+    for warning in warnings:
+        rprint(f"[yellow]Uyarı (config.ini): {warning}[/]")
+    return settings
+
+
+# === Önbellek ve Sıcak Yeniden Yükleme ===
+
+_lock = threading.Lock()
+_settings = None
+_last_check = 0.0
+
+
+def get_settings():
+    """
+    Güncel ayarları döndürür. İlk çağrıda dosya okunur; sonraki çağrılarda en fazla
+    RELOAD_CHECK_INTERVAL saniyede bir dosyanın mtime değeri kontrol edilir ve
+    dosya değiştiyse ayarlar yeniden okunur. Okuma hatasında önceki ayarlar korunur.
+    """
+    global _settings, _last_check
+    now = time.monotonic()
+    if _settings is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _settings
+    with _lock:
+        if _settings is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+            return _settings
+        _last_check = now
+        try:
+            mtime = os.path.getmtime(CONFIG_PATH)
+        except OSError:
+            mtime = None
+        if _settings is None or (mtime is not None and mtime != _settings.mtime):
+            try:
+                reloaded = load_settings()
+            except configparser.Error as e:
+                rprint(f"[bold red]HATA: config.ini okunamadı ({e}). Önceki ayarlar kullanılıyor.[/]")
+                if _settings is None:
+                    _settings = Settings(mtime=mtime or 0.0)
+                else:
+                    # Bozuk dosya her kontrolde tekrar okunmasın; düzeltilince mtime yine değişir
+                    _settings = replace(_settings, mtime=mtime)
+            else:
+                if _settings is not None:
+                    rprint("[dim]config.ini değişti, ayarlar yeniden yüklendi.[/dim]")
+                _settings = reloaded
+    return _settings
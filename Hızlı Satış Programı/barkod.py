@@ -0,0 +1,140 @@
+# barkod.py
+# Barkod kontrol hanesi doğrulaması ve bulunamayan barkodlar için negatif önbellek.
+# Satış ekranında menü numarası olmayan her sayısal girdi barkod olarak aranır. Hatalı okutmalar
+# (eksik/yanlış okunan hane) kontrol hanesiyle veritabanına gitmeden reddedilir. Tanımsız
+# (ör. tedarikçinin kendi) barkodları ise bir süre "yok" olarak hatırlanır; aynı barkod tekrar
+# okutulduğunda sorgu yapılmaz. Barkod add_product ile (CSV içe aktarma dahil) eklenince kayıt silinir.
+
+import threading
+import time
+from collections import OrderedDict
+import ayarlar
+
+# Kontrol hanesi doğrulanan uzunluklar. Diğer uzunluklar (mağaza içi kısa kodlar vb.) kontrol edilmez.
+GTIN_TYPES = {8: 'EAN-8', 12: 'UPC-A', 13: 'EAN-13'}
+
+
+def compute_check_digit(body):
+    """
+    Kontrol hanesi hariç rakamlar için GS1 kontrol hanesini hesaplar.
+    Sağdan başlayarak rakamlar sırayla 3 ve 1 ile çarpılıp toplanır; kontrol hanesi toplamı
+    10'un katına tamamlayan rakamdır (EAN-8, UPC-A ve EAN-13 için aynı kural).
+    """
+    total = 0
+    for i, digit in enumerate(reversed(body)):
+        total += int(digit) * (3 if i % 2 == 0 else 1)
+    return (10 - total % 10) % 10
+
+
+def is_valid_check_digit(barcode):
+    """EAN-8 / UPC-A / EAN-13 barkodunun son hanesi doğruysa True."""
+    return compute_check_digit(barcode[:-1]) == int(barcode[-1])
+
+
+def validation_error(barcode):
+    """
+    Okutulan barkodu kontrol eder (veritabanına gitmeden).
+    Returns:
+        str: Barkod geçersizse kullanıcıya gösterilecek mesaj, geçerliyse veya kontrol
+             edilmeyen bir uzunluktaysa None.
+    """
+    if not ayarlar.get_settings().performance.barcode_check_digit:
+        return None
+    if not barcode.isdigit() or len(barcode) not in GTIN_TYPES:
+        return None
+    if is_valid_check_digit(barcode):
+        return None
+    _count('rejected')
+    return (f"Barkod ({barcode}) geçersiz: {GTIN_TYPES[len(barcode)]} kontrol hanesi hatalı "
+            f"(beklenen: {compute_check_digit(barcode[:-1])}). Lütfen tekrar okutun.")
+
+
+class MissingBarcodeCache:
+    """
+    Veritabanında bulunamayan barkodların süreli (TTL) ve sınırlı boyutlu listesi.
+    Sınır aşılınca en eski kayıt atılır. Süre ve sınır config.ini [performance]
+    missing_barcode_ttl / missing_barcode_max ile ayarlanır (TTL 0: önbellek kapalı).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expires = OrderedDict()  # {barkod: son geçerlilik zamanı (time.monotonic)}
+        self._stats = {'hits': 0, 'added': 0, 'evicted': 0, 'cleared': 0, 'rejected': 0}
+
+    def __contains__(self, barcode):
+        with self._lock:
+            expires = self._expires.get(barcode)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._expires[barcode]
+                return False
+            self._stats['hits'] += 1
+            return True
+
+    def add(self, barcode):
+        settings = ayarlar.get_settings().performance
+        if settings.missing_barcode_ttl <= 0:
+            return
+        with self._lock:
+            self._expires[barcode] = time.monotonic() + settings.missing_barcode_ttl
+            self._expires.move_to_end(barcode)
+            self._stats['added'] += 1
+            while len(self._expires) > settings.missing_barcode_max:
+                self._expires.popitem(last=False)
+                self._stats['evicted'] += 1
+
+    def discard(self, barcode):
+        with self._lock:
+            if self._expires.pop(barcode, None) is not None:
+                self._stats['cleared'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._expires.clear()
+
+    def count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'size', 'hits', 'added', 'evicted', 'cleared', 'rejected'}
+                  rejected: Kontrol hanesi hatalı olduğu için reddedilen okutmalar.
+        """
+        with self._lock:
+            return dict(self._stats, size=len(self._expires))
+
+
+# Uygulama boyunca tek önbellek
+_missing = MissingBarcodeCache()
+
+
+def _count(key):
+    _missing.count(key)
+
+
+def is_known_missing(barcode):
+    """Barkod yakın zamanda veritabanında bulunamadıysa True."""
+    return barcode in _missing
+
+
+def remember_missing(barcode):
+    """Veritabanında bulunamayan barkodu negatif önbelleğe ekler."""
+    _missing.add(barcode)
+
+
+def forget_missing(barcode):
+    """Barkod artık kayıtlı (ürün eklendi); negatif önbellekten silinir."""
+    _missing.discard(barcode)
+
+
+def clear_missing():
+    """Negatif önbelleği tamamen boşaltır (ör. katalog yeniden yüklenince)."""
+    _missing.clear()
+
+
+def get_stats():
+    """Barkod doğrulama ve negatif önbellek istatistiklerini döndürür."""
+    return _missing.get_stats()
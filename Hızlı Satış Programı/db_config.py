@@ -1,89 +1,900 @@
 # db_config.py
 # Bu dosya, config.ini dosyasındaki bilgileri okuyarak
 # MySQL veritabanına bağlantı kurmayı sağlar.
+# v2: Tek bağlantı yerine bağlantı havuzu (pool) kullanılıyor.
+#     db_session() ve transaction() ile kapsamlı (with bloğu) bağlantı kullanımı eklendi.
+# v3: Bağlantılar ReconnectingConnection ile sarılıyor (koptuğunda artan beklemeyle yeniden bağlanma,
+#     keepalive ping). retry_on_disconnect ile okuma sorguları yeniden bağlanma sonrası tekrar çalıştırılıyor.
+# v4: [database] backend = sqlite ile MySQL sunucusu olmadan gömülü SQLite (yerel_veritabani) kullanılabiliyor.
+# v5: [mysql_replica] tanımlıysa report_query ile işaretli rapor sorguları okuma kopyasına yönlendiriliyor.
+# v6: config.ini doğrudan okunmuyor, ayarlar.get_settings() kullanılıyor.
+# v7: Tüm imleçler ve commit çağrıları sorgu_olcum ile ölçülüyor (okuma kopyası bağlantıları dahil).
+# v8: Eşiği aşan sorgular yavas_sorgu ile çalışma planlarıyla birlikte dosyaya yazılıyor.
+# v9: run_transaction ile yazma işlemleri deadlock / kilit bekleme hatasında yeniden deneniyor.
+# v10: Raporlar salt okunur (READ ONLY) işlemde, ayarlanabilir yalıtım seviyesiyle çalışıyor;
+#      raporların satış işlemlerini ne kadar beklettiği ölçülüyor (get_report_stats).
+# v11: iter_rows ile büyük listeler tamponsuz (unbuffered) imleçten parça parça okunabiliyor.
+# v12: fulltext_query ile isim aramaları MySQL FULLTEXT (ngram) indeksini kullanabiliyor.
+# v13: fetch_keyset_page ile listeler sayfa sayfa (keyset: ad + ID'den sonraki/önceki kayıtlar) okunabiliyor.
 
-import mysql.connector
 from mysql.connector import Error, errorcode
-import configparser  # config.ini dosyasını okumak için
+from mysql.connector import pooling
 import os  # Dosya yolunu bulmak için
+import threading
+import time
+import functools
+import random
+from contextlib import contextmanager
 from rich import print as rprint  # Renkli mesajlar için
+from hatalar import DatabaseError
+import yerel_veritabani  # Gömülü SQLite arka ucu
+import ayarlar  # config.ini ayarları
+import sorgu_olcum  # Sorgu süre ölçümü
 
+# Havuz ayarları için varsayılanlar (config.ini'de yoksa kullanılır)
+DEFAULT_POOL_NAME = "hsp_pool"
+DEFAULT_BACKEND = "mysql"
+DEFAULT_SQLITE_PATH = "hsp_yerel.db"
+SUPPORTED_BACKENDS = ("mysql", "sqlite")
+# Yeniden bağlanma / keepalive için varsayılanlar
+DEFAULT_RECONNECT_ATTEMPTS = 5
+DEFAULT_RECONNECT_BASE_DELAY = 0.5  # saniye; her denemede iki katına çıkar
+DEFAULT_KEEPALIVE_INTERVAL = 60  # saniye; bu süreden uzun boşta kalan bağlantı ping ile kontrol edilir
 
-def connect_db():
+# Bağlantının koptuğunu gösteren MySQL hata kodları
+# 2006: MySQL server has gone away, 2013: Lost connection during query, 2055: Lost connection (SSL/IO)
+LOST_CONNECTION_ERRNOS = (2006, 2013, 2055)
+
+# Uygulama boyunca tek bir havuz nesnesi tutulur (ilk ihtiyaçta oluşturulur)
+_pool = None
+_pool_db_config = {}  # Havuzun kurulduğu bağlantı ayarları (hata mesajları için)
+_reconnect_settings = {
+    'attempts': DEFAULT_RECONNECT_ATTEMPTS,
+    'base_delay': DEFAULT_RECONNECT_BASE_DELAY,
+    'keepalive_interval': DEFAULT_KEEPALIVE_INTERVAL,
+}
+_pool_lock = threading.Lock()
+_backend_settings = None  # (arka uç adı, sqlite dosya yolu); ilk ihtiyaçta okunur
+
+
+def get_backend():
     """
-    config.ini dosyasından okunan bilgilerle MySQL veritabanına bağlanmayı dener.
-    Başarılı olursa bağlantı nesnesini, olmazsa None döndürür.
+    Kullanılacak veritabanı arka ucunu config.ini'nin [database] bölümünden okur.
+    Returns:
+        tuple: ('mysql', None) veya ('sqlite', sqlite dosyasının tam yolu / ':memory:')
     """
+    global _backend_settings
+    if _backend_settings is not None:
+        return _backend_settings
+    settings = ayarlar.get_settings().database
+    backend = settings.backend
+    if backend not in SUPPORTED_BACKENDS:
+        rprint(
+            f"[bold yellow]UYARI:[/bold yellow] Bilinmeyen veritabanı arka ucu '{backend}', '{DEFAULT_BACKEND}' kullanılıyor.")
+        backend = DEFAULT_BACKEND
+    sqlite_path = None
+    if backend == 'sqlite':
+        sqlite_path = settings.sqlite_path or DEFAULT_SQLITE_PATH
+        if sqlite_path != yerel_veritabani.MEMORY_PATH and not os.path.isabs(sqlite_path):
+            sqlite_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), sqlite_path)
+    _backend_settings = (backend, sqlite_path)
+    return _backend_settings
+
 
-    # Bu dosyanın bulunduğu dizini al
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    # config.ini dosyasının tam yolunu oluştur
-    config_path = os.path.join(base_dir, 'config.ini')
+def _read_db_settings():
+    """
+    config.ini dosyasının [mysql] bölümünü (ayarlar modülü üzerinden) okur.
+    Returns:
+        tuple: (bağlantı ayarları sözlüğü, havuz adı, havuz boyutu, yeniden bağlanma ayarları)
+    """
+    settings = ayarlar.get_settings().mysql
+    # mysql.connector havuz boyutunu 1-32 arasında kabul eder
+    pool_size = max(1, min(settings.pool_size, pooling.CNX_POOL_MAXSIZE))
+    reconnect_settings = {
+        'attempts': settings.reconnect_attempts,
+        'base_delay': settings.reconnect_base_delay,
+        'keepalive_interval': settings.keepalive_interval,
+    }
+    return settings.connection_args(), settings.pool_name, pool_size, reconnect_settings
 
-    # config.ini dosyasını okumak için bir nesne oluştur
-    config = configparser.ConfigParser()
-    db_config = {}  # Okunan ayarları saklamak için boş bir sözlük
 
-    try:
-        # config.ini dosyasını oku (UTF-8 karakterleri destekle)
-        # Eğer dosya okunamadıysa veya boşsa, FileNotFoundError hatası ver.
-        if not config.read(config_path, encoding='utf-8'):
-            raise FileNotFoundError(
-                f"Yapılandırma dosyası bulunamadı: {config_path}")
-
-        # [mysql] bölümündeki ayarları oku
-        # Eğer bir ayar bulunamazsa, varsayılan bir değer kullan (fallback)
-        db_config['host'] = config.get('mysql', 'host', fallback='localhost')
-        db_config['user'] = config.get('mysql', 'user', fallback='root')
-        db_config['password'] = config.get('mysql', 'password', fallback='')
-        db_config['database'] = config.get(
-            'mysql', 'database', fallback='market_pos_db')
-
-    except FileNotFoundError as fnf_err:
-        rprint(f"[bold red]HATA:[/bold red] {fnf_err}")
-        return None
-    except configparser.NoSectionError:
+def _print_connection_error(e, db_config):
+    """Bağlantı hatasını kullanıcıya anlaşılır şekilde yazdırır."""
+    rprint(f"[bold red]MySQL BAĞLANTI HATASI:[/bold red] {e}")
+    # Hata koduna göre daha detaylı bilgi ver (opsiyonel)
+    if e.errno == errorcode.ER_ACCESS_DENIED_ERROR:
         rprint(
-            f"[bold red]HATA:[/bold red] Yapılandırma dosyasında [mysql] bölümü bulunamadı: {config_path}")
-        return None
-    except configparser.NoOptionError as noe_err:
+            "[bold yellow]>>>[/bold yellow] Veritabanı kullanıcı adı veya şifresi hatalı olabilir (config.ini kontrol edin).")
+    elif e.errno == errorcode.ER_BAD_DB_ERROR:
         rprint(
-            f"[bold red]HATA:[/bold red] Yapılandırma dosyasında gerekli bir seçenek eksik ({noe_err.option}): {config_path}")
-        return None
-    except Exception as e:
-        rprint(
-            f"[bold red]HATA:[/bold red] Yapılandırma dosyası okunurken beklenmedik hata: {e}")
+            f"[bold yellow]>>>[/bold yellow] Veritabanı '{db_config.get('database')}' bulunamadı.")
+
+
+def _is_lost_connection_error(error):
+    """
+    Hatanın (veya zincirdeki sebebinin) bağlantı kopması olup olmadığını kontrol eder.
+    DB fonksiyonları mysql hatalarını DatabaseError(...) from e şeklinde sardığı için
+    __cause__ zinciri de taranır.
+    """
+    while error is not None:
+        if isinstance(error, Error) and getattr(error, 'errno', None) in LOST_CONNECTION_ERRNOS:
+            return True
+        error = error.__cause__
+    return False
+
+
+class ReconnectingConnection:
+    """
+    Havuzdan alınan bağlantıyı saran ve koptuğunda otomatik yeniden bağlanan nesne.
+
+    - is_connected(): Bağlantı keepalive_interval süresinden kısa süredir kullanılıyorsa
+      sunucuya gitmeden True döner; daha uzun süre boşta kaldıysa ping atar.
+      Bağlantı kopmuşsa artan bekleme süreleriyle (base_delay, 2*base_delay, ...) yeniden bağlanır.
+    - cursor() ve commit() sorgu_olcum ile süre ölçümü yapar.
+    - Diğer tüm metot ve özellikler (rollback, close...) asıl bağlantıya iletilir.
+    - generation: Her yeniden bağlanmada artar; sunucu tarafı durum (prepared statement vb.)
+      tutan modüller bunu kontrol ederek önbelleklerini geçersiz sayabilir.
+    """
+
+    def __init__(self, connection, attempts=DEFAULT_RECONNECT_ATTEMPTS,
+                 base_delay=DEFAULT_RECONNECT_BASE_DELAY, keepalive_interval=DEFAULT_KEEPALIVE_INTERVAL):
+        self._connection = connection
+        self._attempts = attempts
+        self._base_delay = base_delay
+        self._keepalive_interval = keepalive_interval
+        self._last_used = time.monotonic()
+        self.generation = 0
+        self.reconnect_count = 0
+        self._close_callbacks = []
+
+    def _touch(self):
+        self._last_used = time.monotonic()
+
+    def _ping(self):
+        """Sunucuya ping atar, bağlantı canlıysa True döner."""
+        try:
+            self._connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def reconnect(self):
+        """
+        Bağlantıyı artan bekleme süreleriyle yeniden kurmayı dener.
+        Returns:
+            bool: Yeniden bağlanma başarılıysa True.
+        """
+        delay = self._base_delay
+        for attempt in range(1, self._attempts + 1):
+            try:
+                self._connection.reconnect(attempts=1, delay=0)
+                if self._connection.is_connected():
+                    self.generation += 1
+                    self.reconnect_count += 1
+                    self._touch()
+                    if attempt > 1:
+                        rprint(f"[dim]Veritabanı bağlantısı yeniden kuruldu ({attempt}. deneme).[/dim]")
+                    return True
+            except Error as e:
+                if attempt == self._attempts:
+                    rprint(f"[bold red]HATA:[/bold red] Veritabanına yeniden bağlanılamadı ({attempt} deneme): {e}")
+                    return False
+            time.sleep(delay)
+            delay *= 2
+        return False
+
+    def is_connected(self):
+        """Bağlantı aktifse (gerekirse yeniden bağlandıktan sonra) True döndürür."""
+        if time.monotonic() - self._last_used < self._keepalive_interval:
+            return True
+        if self._ping():
+            self._touch()
+            return True
+        return self.reconnect()
+
+    def cursor(self, *args, **kwargs):
+        self._touch()
+        return sorgu_olcum.instrument(self._connection.cursor(*args, **kwargs))
+
+    def commit(self):
+        self._touch()
+        return sorgu_olcum.timed_commit(self._connection.commit)
+
+    def rollback(self):
+        self._touch()
+        return self._connection.rollback()
+
+    def add_close_callback(self, callback):
+        """Bağlantı kapatılırken (havuza iade edilirken) çağrılacak fonksiyonu kaydeder."""
+        self._close_callbacks.append(callback)
+
+    def close(self):
+        for callback in self._close_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                rprint(f"[bold yellow]UYARI:[/bold yellow] Bağlantı kapatılırken temizlik hatası: {e}")
+        self._close_callbacks.clear()
+        return self._connection.close()
+
+    def __getattr__(self, name):
+        # Tanımlanmayan her şey asıl bağlantıya iletilir
+        return getattr(self._connection, name)
+
+
+def retry_on_disconnect(func):
+    """
+    Bağlantı koptuğu için başarısız olan OKUMA fonksiyonunu yeniden bağlandıktan sonra
+    bir kez daha çalıştıran dekoratör. Fonksiyonun ilk parametresi bağlantı olmalıdır.
+    Yan etkisi olan (INSERT/UPDATE) fonksiyonlarda kullanılmamalıdır.
+    """
+    @functools.wraps(func)
+    def wrapper(connection, *args, **kwargs):
+        try:
+            return func(connection, *args, **kwargs)
+        except (DatabaseError, Error) as e:
+            if not isinstance(connection, ReconnectingConnection) or not _is_lost_connection_error(e):
+                raise
+            if not connection.reconnect():
+                raise
+            return func(connection, *args, **kwargs)
+    return wrapper
+
+
+def get_pool():
+    """
+    Uygulamanın bağlantı havuzunu döndürür, yoksa config.ini ayarlarıyla oluşturur.
+    Havuz oluşturulamazsa None döndürür.
+    """
+    global _pool, _pool_db_config
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is not None:  # Başka bir thread bu arada oluşturmuş olabilir
+            return _pool
+        db_config, pool_name, pool_size, reconnect_settings = _read_db_settings()
+        _pool_db_config = db_config
+        _reconnect_settings.update(reconnect_settings)
+        try:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=pool_name, pool_size=pool_size,
+                pool_reset_session=True, **db_config)
+        except Error as e:
+            _print_connection_error(e, db_config)
+            return None
+    return _pool
+
+
+def connect_db():
+    """
+    Bağlantı havuzundan bir bağlantı ödünç alır.
+    Başarılı olursa ReconnectingConnection ile sarılmış bağlantıyı, olmazsa None döndürür.
+    Dönen bağlantının close() metodu bağlantıyı kapatmaz, havuza geri verir.
+    Arka uç 'sqlite' ise havuz kullanılmaz, yerel veritabanına yeni bir bağlantı açılır.
+    """
+    backend, sqlite_path = get_backend()
+    if backend == 'sqlite':
+        try:
+            return yerel_veritabani.connect(sqlite_path)
+        except Error as e:
+            rprint(f"[bold red]SQLite BAĞLANTI HATASI:[/bold red] {e} ({sqlite_path})")
+            return None
+
+    pool = get_pool()
+    if pool is None:
         return None
 
-    # Veritabanına bağlanmayı dene
+    # Havuzdan bağlantı almayı dene
     try:
-        # Okunan ayarları kullanarak bağlantıyı kur
-        # Sözlüğü direkt parametre olarak ver
-        connection = mysql.connector.connect(**db_config)
+        connection = pool.get_connection()
 
         # Bağlantı başarılıysa
         if connection.is_connected():
             # Başarı mesajını ana programda verelim, burada sessiz kalalım.
-            # rprint("MySQL veritabanına başarıyla bağlanıldı.", style="green")
-            return connection  # Bağlantı nesnesini döndür
+            return ReconnectingConnection(connection, **_reconnect_settings)
         else:
-            # Bu durum genellikle connect() hata fırlattığı için pek oluşmaz
+            # Bu durum genellikle get_connection() hata fırlattığı için pek oluşmaz
             rprint(
                 "[bold yellow]UYARI:[/bold yellow] Bağlantı nesnesi alındı ama bağlantı aktif değil?")
+            connection.close()
             return None
+    except pooling.PoolError as pe:
+        # Havuzdaki tüm bağlantılar kullanımda
+        rprint(
+            f"[bold red]HATA:[/bold red] Bağlantı havuzunda boş bağlantı yok ({pool.pool_size} bağlantı kullanımda): {pe}")
+        return None
     except Error as e:
         # Bağlantı sırasında bir hata olursa
-        rprint(f"[bold red]MySQL BAĞLANTI HATASI:[/bold red] {e}")
-        # Hata koduna göre daha detaylı bilgi ver (opsiyonel)
-        if e.errno == errorcode.ER_ACCESS_DENIED_ERROR:
-            rprint(
-                "[bold yellow]>>>[/bold yellow] Veritabanı kullanıcı adı veya şifresi hatalı olabilir (config.ini kontrol edin).")
-        elif e.errno == errorcode.ER_BAD_DB_ERROR:
-            rprint(
-                f"[bold yellow]>>>[/bold yellow] Veritabanı '{db_config.get('database')}' bulunamadı.")
+        _print_connection_error(e, _pool_db_config)
         return None  # Hata durumunda None döndür
 
 
+@contextmanager
+def db_session():
+    """
+    Havuzdan bir bağlantı ödünç alıp with bloğu boyunca kullandırır,
+    blok bitince (hata olsa bile) bağlantıyı havuza geri verir.
+
+    Kullanım:
+        with db_config.db_session() as conn:
+            urunler = product_db_ops.list_all_products(conn)
+
+    Raises:
+        DatabaseError: Havuzdan bağlantı alınamazsa.
+    """
+    connection = connect_db()
+    if not connection:
+        raise DatabaseError("Bağlantı havuzundan veritabanı bağlantısı alınamadı.")
+    try:
+        yield connection
+    finally:
+        try:
+            connection.close()  # Havuza iade
+        except Error as e:
+            rprint(f"[bold yellow]UYARI:[/bold yellow] Bağlantı havuza iade edilirken hata: {e}")
+
+
+@contextmanager
+def transaction(connection):
+    """
+    Verilen bağlantı üzerinde with bloğunu tek bir işlem (transaction) olarak çalıştırır.
+    Blok hatasız biterse commit, herhangi bir hata olursa rollback yapılır ve hata yeniden fırlatılır.
+
+    Kullanım:
+        with db_config.db_session() as conn, db_config.transaction(conn):
+            ...
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("İşlem başlatmak için aktif veritabanı bağlantısı gerekli.")
+    try:
+        yield connection
+        connection.commit()
+    except Exception:
+        try:
+            connection.rollback()
+        except Error as rb_err:
+            rprint(f"[bold yellow]UYARI:[/bold yellow] Geri alma (rollback) sırasında hata: {rb_err}")
+        raise
+
+
+# === Akışlı (Streaming) Okuma ===
+
+def iter_rows(connection, sql, params=(), dictionary=True, chunk_size=None, error_message="Veri okuma hatası"):
+    """
+    Sorgu sonucunu tamponsuz (unbuffered) imleçten chunk_size satırlık parçalar halinde okuyup
+    satır satır döndüren üreteç (generator). Tüm sonuç listesi bellekte oluşturulmaz;
+    ilk satırlar, sorgunun tamamı okunmadan kullanılabilir.
+    chunk_size verilmezse config.ini [performance] stream_chunk_size kullanılır.
+
+    Dikkat: Üreteç tükenene (veya kapatılana) kadar aynı bağlantıda başka sorgu çalıştırılmamalıdır;
+    MySQL tamponsuz imleçte okunmamış sonuç varken yeni sorgu kabul etmez.
+
+    Raises:
+        DatabaseError: Sorgu çalıştırılamaz veya okunamazsa (mesaj: "{error_message}: {hata}").
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Veri okumak için aktif veritabanı bağlantısı gerekli.")
+    if chunk_size is None:
+        chunk_size = ayarlar.get_settings().performance.stream_chunk_size
+    cursor = None
+    exhausted = False
+    try:
+        cursor = connection.cursor(dictionary=dictionary, buffered=False)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                exhausted = True
+                break
+            yield from rows
+    except Error as e:
+        raise DatabaseError(f"{error_message}: {e}") from e
+    finally:
+        if cursor:
+            try:
+                if not exhausted:
+                    # Okuma yarıda bırakıldıysa kalan satırlar parça parça atılır (bağlantı tekrar kullanılabilsin)
+                    while cursor.fetchmany(chunk_size):
+                        pass
+            except Error:
+                pass
+            cursor.close()
+
+
+# === Sayfalı (Keyset) Okuma ===
+# Listeler OFFSET yerine son görülen kaydın (ad, ID) değerinden sonrası okunarak sayfalanır:
+#   WHERE (name > son_ad OR (name = son_ad AND id > son_id)) ORDER BY name, id LIMIT sayfa + 1
+# Sıralama sütunundaki indeks kullanılır; sayfa numarası ne olursa olsun sorgu sadece bir sayfa kadar
+# satır okur. Fazladan okunan tek satır, o yönde başka sayfa olup olmadığını gösterir.
+
+def fetch_keyset_page(connection, sql, where_clauses=(), params=(), order_columns=("name", "id"),
+                      key_fields=("name", "id"), after=None, before=None, page_size=None,
+                      dictionary=True, error_message="Sayfa okuma hatası"):
+    """
+    Sorgunun bir sayfasını (ad, ID) sırasıyla okur.
+    Args:
+        sql (str): WHERE / ORDER BY / LIMIT içermeyen SELECT ... FROM ... sorgusu.
+        where_clauses, params: Ek filtre koşulları (AND ile birleştirilir) ve parametreleri.
+        order_columns (tuple): (sıralama sütunu, benzersiz ID sütunu), ör. ("p.name", "p.product_id").
+        key_fields (tuple): Satırdan (ad, ID) değerlerinin alınacağı anahtarlar (demet satırlarda sıra no).
+        after (tuple): Verilirse bu (ad, ID) değerinden sonraki sayfa okunur.
+        before (tuple): Verilirse bu (ad, ID) değerinden önceki sayfa okunur.
+        page_size (int): Sayfadaki satır sayısı; verilmezse config.ini [performance] page_size.
+    Returns:
+        dict: {'rows': sayfa satırları (artan sırada), 'first_key': ilk satırın (ad, ID) değeri,
+               'last_key': son satırın (ad, ID) değeri, 'has_next': bool, 'has_previous': bool}
+    Raises:
+        DatabaseError: Sorgu çalıştırılamazsa (mesaj: "{error_message}: {hata}").
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Veri okumak için aktif veritabanı bağlantısı gerekli.")
+    if page_size is None:
+        page_size = ayarlar.get_settings().performance.page_size
+    sort_column, id_column = order_columns
+    clauses = list(where_clauses)
+    params = list(params)
+    backward = before is not None and after is None
+    start_key = before if backward else after
+    if start_key is not None:
+        op = "<" if backward else ">"
+        clauses.append(f"({sort_column} {op} %s OR ({sort_column} = %s AND {id_column} {op} %s))")
+        params += [start_key[0], start_key[0], start_key[1]]
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    direction = "DESC" if backward else "ASC"
+    sql += f" ORDER BY {sort_column} {direction}, {id_column} {direction} LIMIT %s"
+    params.append(page_size + 1)
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=dictionary, buffered=True)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    except Error as e:
+        raise DatabaseError(f"{error_message}: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backward:
+        rows.reverse()
+    name_field, id_field = key_fields
+    return {
+        'rows': rows,
+        'first_key': (rows[0][name_field], rows[0][id_field]) if rows else None,
+        'last_key': (rows[-1][name_field], rows[-1][id_field]) if rows else None,
+        # Geri gidilen sayfadan sonra her zaman sayfa vardır; ileri gidilen sayfadan önce de öyle
+        'has_next': has_more if not backward else True,
+        'has_previous': has_more if backward else start_key is not None,
+    }
+
+
+# === FULLTEXT (ngram) İsim Araması ===
+# config.ini [performance] name_search = fulltext ise ürün, müşteri ve tedarikçi isim aramaları
+# MATCH ... AGAINST ile yapılır (indeksler: sema_yonetimi sürüm 5). ngram ayrıştırıcısı adları
+# ngram_token_size (varsayılan 2) harflik parçalara böler; tırnak içindeki kelime bu parçaların
+# ardışık geçmesini ister, yani kelime parçası araması LIKE '%...%' gibi çalışır ama indeksten okunur.
+
+FULLTEXT_MIN_WORD = 2  # MySQL varsayılan ngram_token_size; daha kısa kelimeler indeksle aranamaz
+_FULLTEXT_OPERATORS = str.maketrans({char: ' ' for char in '+-<>()~*"@'})
+
+
+def fulltext_query(connection, search_term):
+    """
+    İsim araması FULLTEXT ile yapılacaksa BOOLEAN MODE arama metnini döndürür: her kelime
+    zorunlu bir öbek olarak (+"kelime") aranır.
+    Returns:
+        str: AGAINST(... IN BOOLEAN MODE) parametresi; FULLTEXT kullanılmayacaksa (ayar kapalı,
+             SQLite arka ucu veya indeksle aranamayacak kadar kısa kelime) None. Bu durumda LIKE kullanılır.
+    """
+    if ayarlar.get_settings().performance.name_search != 'fulltext':
+        return None
+    if getattr(connection, 'backend', 'mysql') != 'mysql':
+        return None
+    words = str(search_term).translate(_FULLTEXT_OPERATORS).split()
+    if not words or any(len(word) < FULLTEXT_MIN_WORD for word in words):
+        return None
+    return ' '.join(f'+"{word}"' for word in words)
+
+
+# === Çakışmada Yeniden Denenen İşlemler (Deadlock / Lock Wait) ===
+# Birden fazla kasa aynı ürünün stoğunu aynı anda düşürdüğünde InnoDB işlemlerden birini
+# kilitlenme (deadlock) ile geri alabilir veya kilit bekleme süresi dolabilir. Bu durumda
+# işlem, kasiyerin sepeti yeniden girmesine gerek kalmadan baştan tekrar çalıştırılır.
+
+# 1213: ER_LOCK_DEADLOCK, 1205: ER_LOCK_WAIT_TIMEOUT
+TRANSACTION_CONFLICT_ERRNOS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+_tx_stats_lock = threading.Lock()
+_tx_stats = {}  # {işlem adı: {'runs', 'retries', 'gave_up', 'by_errno': {errno: adet}}}
+
+
+def transaction_conflict_errno(error):
+    """
+    Hata (veya sarmaladığı asıl hata) deadlock / kilit bekleme hatasıysa errno değerini, değilse None döndürür.
+    DatabaseError(...) from e ile sarılmış hatalar da __cause__ zinciri izlenerek tanınır.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, Error) and getattr(error, 'errno', None) in TRANSACTION_CONFLICT_ERRNOS:
+            return error.errno
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def is_transaction_conflict(error):
+    """Hata, işlemin yeniden denenmesiyle çözülebilecek bir kilit çakışmasıysa True döndürür."""
+    return transaction_conflict_errno(error) is not None
+
+
+def _count_transaction(name, errno=None, gave_up=False):
+    with _tx_stats_lock:
+        entry = _tx_stats.setdefault(name, {'runs': 0, 'retries': 0, 'gave_up': 0, 'by_errno': {}})
+        if errno is None:
+            entry['runs'] += 1
+        elif gave_up:
+            entry['gave_up'] += 1
+        else:
+            entry['retries'] += 1
+            entry['by_errno'][errno] = entry['by_errno'].get(errno, 0) + 1
+
+
+def get_transaction_stats():
+    """
+    Yeniden denenen işlemlerin istatistiklerini döndürür.
+    Returns:
+        dict: {işlem adı: {'runs': çalıştırma, 'retries': yeniden deneme,
+                           'gave_up': denemeler tükendiği için başarısız, 'by_errno': {errno: adet}}}
+    """
+    with _tx_stats_lock:
+        return {name: dict(entry, by_errno=dict(entry['by_errno'])) for name, entry in _tx_stats.items()}
+
+
+def run_transaction(connection, func, *args, **kwargs):
+    """
+    func(connection, *args, **kwargs) çağrısını, commit dahil tek bir işlem olarak çalıştırır.
+    Deadlock (1213) veya kilit bekleme (1205) hatasında rollback yapılır, artan ve rastgele
+    (jitter) beklemeden sonra func baştan tekrar çağrılır. Deneme sayısı config.ini
+    [mysql] transaction_retries ile sınırlıdır.
+    func, işlemin tamamını (commit dahil) yapmalı ve tekrar çağrılabilir olmalıdır
+    (girdi listelerini değiştirmemeli). Diğer hatalar olduğu gibi yukarı iletilir; rollback çağırana aittir.
+    """
+    settings = ayarlar.get_settings().mysql
+    name = f"{func.__module__}.{func.__name__.strip('_')}"
+    _count_transaction(name)
+    with _report_lock:
+        overlapping_reports = set(_active_reports.values())
+    start = time.perf_counter()
+    attempt = 0
+    try:
+        while True:
+            try:
+                return func(connection, *args, **kwargs)
+            except Exception as e:
+                errno = transaction_conflict_errno(e)
+                if errno is None:
+                    raise
+                try:
+                    connection.rollback()
+                except Error as rb_err:
+                    rprint(f"[bold yellow]UYARI:[/bold yellow] Geri alma (rollback) sırasında hata: {rb_err}")
+                if attempt >= settings.transaction_retries:
+                    _count_transaction(name, errno, gave_up=True)
+                    raise
+                attempt += 1
+                _count_transaction(name, errno)
+                delay = settings.transaction_retry_base_delay * (2 ** (attempt - 1))
+                delay *= 0.5 + random.random()  # Kasalar aynı anda tekrar denemesin
+                rprint(f"[dim]Veritabanı kilit çakışması ({errno}), işlem tekrar deneniyor "
+                       f"({attempt}/{settings.transaction_retries})...[/dim]")
+                time.sleep(delay)
+    finally:
+        _note_transaction_time(overlapping_reports, time.perf_counter() - start)
+
+
+# === Salt Okunur Rapor İşlemleri ===
+# Rapor fonksiyonları START TRANSACTION READ ONLY ile, config.ini [mysql] report_isolation_level
+# seviyesinde çalışır. Salt okunur işlemde InnoDB işlem kimliği ayırmaz ve kilitli okuma yapılamaz;
+# READ COMMITTED'da her sorgu yeni anlık görüntü (snapshot) kullandığından uzun raporlar eski
+# satır sürümlerini tutmaz. SQLite'ta (WAL) okuyucular yazıcıyı beklemediği için işlem başlatılmaz.
+# Bir raporun satışları ne kadar beklettiğini görmek için her rapor süresince:
+#   - sunucudaki satır kilidi beklemeleri (Innodb_row_lock_waits / Innodb_row_lock_time farkı; tüm kasalar),
+#   - bu programda rapor sürerken çalışan run_transaction işlemleri (satış, iade, alış) ve süreleri
+# kaydedilir. Çakışan işlemlerin ortalama süresi genel ortalamayla karşılaştırılabilir.
+
+_report_lock = threading.Lock()
+_report_stats = {}  # {rapor adı: {'runs', 'replica_runs', 'total', 'max', 'lock_waits', 'lock_wait_ms', 'tx_count', 'tx_time'}}
+_active_reports = {}  # {belirteç: rapor adı}; şu anda çalışan raporlar
+_tx_totals = {'count': 0, 'time': 0.0}  # Tüm run_transaction işlemleri (karşılaştırma için)
+
+
+def _report_entry(name):
+    entry = _report_stats.get(name)
+    if entry is None:
+        entry = {'runs': 0, 'replica_runs': 0, 'total': 0.0, 'max': 0.0,
+                 'lock_waits': 0, 'lock_wait_ms': 0, 'tx_count': 0, 'tx_time': 0.0}
+        _report_stats[name] = entry
+    return entry
+
+
+def _note_transaction_time(overlapping_reports, elapsed):
+    """run_transaction süresini genel toplama ve işlem sürerken çalışan raporlara ekler."""
+    with _report_lock:
+        overlapping_reports = overlapping_reports | set(_active_reports.values())
+        _tx_totals['count'] += 1
+        _tx_totals['time'] += elapsed
+        for name in overlapping_reports:
+            entry = _report_entry(name)
+            entry['tx_count'] += 1
+            entry['tx_time'] += elapsed
+
+
+def _read_row_lock_counters(connection):
+    """Sunucunun satır kilidi bekleme sayaçlarını (adet, toplam ms) döndürür; alınamazsa None."""
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        sorgu_olcum.set_label(cursor, 'rapor.kilit_sayaclari')
+        cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN ('Innodb_row_lock_waits', 'Innodb_row_lock_time')")
+        values = {str(name).lower(): int(value) for name, value in cursor.fetchall()}
+        return values.get('innodb_row_lock_waits', 0), values.get('innodb_row_lock_time', 0)
+    except (Error, ValueError, TypeError):
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def _begin_read_only(connection):
+    """
+    Bağlantıda ayarlanan yalıtım seviyesiyle salt okunur bir işlem başlatır.
+    Bağlantıda açık bir işlem varsa salt okunur işlem başlatılmaz ve rapor o işlemin içinde çalışır
+    (START TRANSACTION açık işlemi örtük olarak commit ederdi; çağıranın bekleyen değişiklikleri
+    onun haberi olmadan kaydedilmemeli).
+    Returns:
+        bool: İşlem başlatıldıysa True (SQLite'ta, açık işlem varsa veya sunucu desteklemiyorsa False).
+    """
+    if not connection or getattr(connection, 'backend', 'mysql') != 'mysql':
+        return False
+    try:
+        if not connection.is_connected():
+            return False  # Rapor fonksiyonu kendi bağlantı hatasını verir
+        if connection.in_transaction:
+            return False
+        connection.start_transaction(
+            isolation_level=ayarlar.get_settings().mysql.report_isolation_level, readonly=True)
+        return True
+    except Error as e:
+        rprint(f"[dim]Salt okunur rapor işlemi başlatılamadı ({e}), rapor normal çalıştırılıyor.[/dim]")
+        return False
+
+
+def _run_read_only(connection, name, func, args, kwargs, on_replica=False):
+    """func'ı salt okunur işlemde çalıştırır ve rapor istatistiklerini kaydeder."""
+    started = _begin_read_only(connection)
+    # Okuma kopyasındaki rapor ana sunucudaki satışları bekletmez; sayaçlar sadece ana sunucuda okunur
+    counters_before = _read_row_lock_counters(connection) if started and not on_replica else None
+    token = object()
+    with _report_lock:
+        _active_reports[token] = name
+    start = time.perf_counter()
+    try:
+        return func(connection, *args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _report_lock:
+            _active_reports.pop(token, None)
+        if started:
+            try:
+                connection.rollback()  # Salt okunur işlemi bitirir (değişiklik yok)
+            except Error:
+                pass
+        counters_after = _read_row_lock_counters(connection) if counters_before is not None else None
+        with _report_lock:
+            entry = _report_entry(name)
+            entry['runs'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            if on_replica:
+                entry['replica_runs'] += 1
+            if counters_after is not None:
+                entry['lock_waits'] += max(0, counters_after[0] - counters_before[0])
+                entry['lock_wait_ms'] += max(0, counters_after[1] - counters_before[1])
+
+
+def get_report_stats():
+    """
+    Salt okunur rapor istatistiklerini döndürür.
+    Returns:
+        dict: {'tx_avg_ms': tüm run_transaction işlemlerinin ortalama süresi,
+               'reports': {rapor adı: {'runs', 'replica_runs', 'avg_ms', 'max_ms',
+                                       'lock_waits', 'lock_wait_ms', 'tx_count', 'tx_avg_ms'}}}
+              lock_waits / lock_wait_ms: Rapor sürerken ana sunucuda oluşan satır kilidi beklemeleri.
+              tx_count / tx_avg_ms: Rapor sürerken bu programda çalışan satış/iade/alış işlemleri ve ortalama süreleri.
+    """
+    with _report_lock:
+        reports = {}
+        for name, e in _report_stats.items():
+            reports[name] = {
+                'runs': e['runs'],
+                'replica_runs': e['replica_runs'],
+                'avg_ms': e['total'] * 1000 / e['runs'] if e['runs'] else 0.0,
+                'max_ms': e['max'] * 1000,
+                'lock_waits': e['lock_waits'],
+                'lock_wait_ms': e['lock_wait_ms'],
+                'tx_count': e['tx_count'],
+                'tx_avg_ms': e['tx_time'] * 1000 / e['tx_count'] if e['tx_count'] else 0.0,
+            }
+        tx_avg_ms = _tx_totals['time'] * 1000 / _tx_totals['count'] if _tx_totals['count'] else 0.0
+    return {'tx_avg_ms': tx_avg_ms, 'reports': reports}
+
+
+def read_only_report(func):
+    """
+    Rapor fonksiyonunu, verilen bağlantıda salt okunur işlem içinde çalıştıran dekoratör.
+    Güncel veri gerektiren (okuma kopyasına gönderilmemesi gereken) raporlar için kullanılır;
+    kopyaya yönlendirilebilen raporlar report_query kullanmalıdır (o da salt okunur çalışır).
+    Fonksiyonun ilk parametresi bağlantı olmalıdır.
+    """
+    name = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(connection, *args, **kwargs):
+        return _run_read_only(connection, name, func, args, kwargs)
+    return wrapper
+
+
+# === Okuma Kopyası (Replica) Yönlendirmesi ===
+# Raporlar gibi sadece okuma yapan ağır sorgular, [mysql_replica] tanımlıysa
+# ana sunucu yerine okuma kopyasına gönderilir. Kopya erişilemezse veya
+# gecikmesi max_staleness saniyesini aşarsa ana sunucu kullanılır.
+
+_replica_pool = None
+_replica_settings = None  # None: henüz okunmadı, {}: tanımlı değil
+_replica_lock = threading.Lock()
+_replica_state = {'checked_at': 0.0, 'healthy': False, 'lag': None}
+
+
+def _read_replica_settings():
+    """
+    config.ini'deki [mysql_replica] bölümünü okur. Eksik bağlantı ayarları [mysql] bölümünden alınır.
+    Returns:
+        dict: Kopya ayarları; bölüm yoksa veya enabled = false ise boş sözlük.
+    """
+    settings = ayarlar.get_settings().replica
+    if not settings.enabled:
+        return {}
+    return {
+        'db_config': settings.connection_args(),
+        'pool_size': max(1, min(settings.pool_size, pooling.CNX_POOL_MAXSIZE)),
+        'max_staleness': settings.max_staleness,
+        'check_interval': settings.check_interval,
+    }
+
+
+def _get_replica_settings():
+    global _replica_settings
+    if _replica_settings is None:
+        _replica_settings = _read_replica_settings() if get_backend()[0] == 'mysql' else {}
+    return _replica_settings
+
+
+def _get_replica_pool():
+    """Okuma kopyası havuzunu döndürür, yoksa oluşturur. Kopya tanımlı değilse veya kurulamazsa None."""
+    global _replica_pool
+    settings = _get_replica_settings()
+    if not settings:
+        return None
+    if _replica_pool is not None:
+        return _replica_pool
+    with _replica_lock:
+        if _replica_pool is None:
+            try:
+                _replica_pool = pooling.MySQLConnectionPool(
+                    pool_name=f"{DEFAULT_POOL_NAME}_replica", pool_size=settings['pool_size'],
+                    pool_reset_session=True, **settings['db_config'])
+            except Error as e:
+                rprint(f"[bold yellow]UYARI:[/bold yellow] Okuma kopyasına bağlanılamadı, raporlar ana sunucudan alınacak: {e}")
+                _mark_replica(False)
+                return None
+    return _replica_pool
+
+
+def _mark_replica(healthy, lag=None):
+    _replica_state.update({'checked_at': time.monotonic(), 'healthy': healthy, 'lag': lag})
+
+
+def get_replica_lag(connection):
+    """
+    Okuma kopyasının ana sunucudan kaç saniye geride olduğunu döndürür.
+    Çoğaltma (replication) durmuşsa veya bilgi alınamazsa None döner.
+    """
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("SHOW REPLICA STATUS")  # MySQL 8.0.22+
+        except Error:
+            cursor.execute("SHOW SLAVE STATUS")  # Eski sürümler
+        status = cursor.fetchone()
+        if not status:
+            return None
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+    except Error:
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def replica_status():
+    """Okuma kopyasının son bilinen durumunu döndürür (kopya tanımlı değilse None)."""
+    if not _get_replica_settings():
+        return None
+    return dict(_replica_state)
+
+
+def _borrow_replica_connection():
+    """
+    Sağlıklı ve yeterince güncel ise okuma kopyasından bir bağlantı döndürür, değilse None.
+    Kopya durumu check_interval süresince önbellekte tutulur.
+    """
+    settings = _get_replica_settings()
+    if not settings:
+        return None
+    now = time.monotonic()
+    recently_checked = now - _replica_state['checked_at'] < settings['check_interval']
+    if recently_checked and not _replica_state['healthy']:
+        return None
+    pool = _get_replica_pool()
+    if pool is None:
+        return None
+    try:
+        connection = pool.get_connection()
+    except Error:  # PoolError dahil
+        _mark_replica(False)
+        return None
+    if not recently_checked:
+        lag = get_replica_lag(connection)
+        healthy = lag is not None and lag <= settings['max_staleness']
+        _mark_replica(healthy, lag)
+        if not healthy:
+            connection.close()
+            return None
+    return ReconnectingConnection(connection, **_reconnect_settings)
+
+
+def report_query(func):
+    """
+    Sadece okuma yapan rapor fonksiyonlarını okuma kopyasına yönlendiren dekoratör.
+    Kopya tanımlı değilse, sağlıksızsa, gecikmesi max_staleness'ı aşıyorsa veya sorgu kopyada
+    hata verirse fonksiyon, çağıranın verdiği (ana sunucu) bağlantısıyla çalıştırılır.
+    Her iki durumda da rapor salt okunur işlemde çalışır (bkz. read_only_report).
+    Fonksiyonun ilk parametresi bağlantı olmalıdır.
+    """
+    name = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(connection, *args, **kwargs):
+        replica_connection = _borrow_replica_connection()
+        if replica_connection is None:
+            return _run_read_only(connection, name, func, args, kwargs)
+        try:
+            return _run_read_only(replica_connection, name, func, args, kwargs, on_replica=True)
+        except (DatabaseError, Error) as e:
+            rprint(f"[dim]Okuma kopyasında rapor hatası ({e}), ana sunucu kullanılıyor.[/dim]")
+            _mark_replica(False)
+        finally:
+            try:
+                replica_connection.close()
+            except Error:
+                pass
+        return _run_read_only(connection, name, func, args, kwargs)
+    return wrapper
+
+
 # Bu dosya doğrudan çalıştırıldığında test amaçlı bağlantı dener.
 # Normal kullanımda bu kısım çalışmaz.
 if __name__ == '__main__':
@@ -91,7 +902,11 @@ if __name__ == '__main__':
     conn = connect_db()
     if conn and conn.is_connected():
         rprint("[bold green]Test Bağlantısı Başarılı![/bold green]")
+        if get_backend()[0] == 'sqlite':
+            rprint(f"Arka uç: SQLite ({get_backend()[1]})")
+        else:
+            rprint(f"Havuz: {get_pool().pool_name} (boyut: {get_pool().pool_size})")
         conn.close()
-        rprint("Test bağlantısı kapatıldı.")
+        rprint("Test bağlantısı havuza iade edildi.")
     else:
         rprint("[bold red]Test Bağlantısı Başarısız![/bold red]")
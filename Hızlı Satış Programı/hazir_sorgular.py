@@ -0,0 +1,171 @@
+# hazir_sorgular.py
+# Sık çalıştırılan sorgular için sunucu tarafı hazır ifade (prepared statement) kaydı.
+# Her bağlantı için, mantıksal sorgu adıyla anahtarlanmış hazır imleçler (cursor) tutulur.
+# Sorgu ilk kullanımda bir kez ayrıştırılır (prepare), sonraki çağrılarda sadece
+# parametreler bağlanıp çalıştırılır (bind + execute).
+
+import threading
+from mysql.connector import Error
+import sorgu_olcum
+
+# === İstatistikler ===
+# prepares: Sunucuya gönderilen ayrıştırma (prepare) sayısı
+# executes: Toplam çalıştırma sayısı
+_stats_lock = threading.Lock()
+_stats = {}  # {sorgu_adı: {'prepares': int, 'executes': int}}
+
+
+def _count(name, prepared):
+    with _stats_lock:
+        entry = _stats.setdefault(name, {'prepares': 0, 'executes': 0})
+        entry['executes'] += 1
+        if prepared:
+            entry['prepares'] += 1
+
+
+def get_stats():
+    """
+    Hazır ifade istatistiklerini döndürür.
+    Returns:
+        dict: {'prepares': int, 'executes': int, 'saved': int,
+               'queries': {sorgu_adı: {'prepares', 'executes', 'saved'}}}
+              saved = ayrıştırılmadan (sadece bind + execute) çalıştırılan sorgu sayısı.
+    """
+    with _stats_lock:
+        queries = {
+            name: {'prepares': v['prepares'], 'executes': v['executes'],
+                   'saved': v['executes'] - v['prepares']}
+            for name, v in _stats.items()
+        }
+    total_prepares = sum(q['prepares'] for q in queries.values())
+    total_executes = sum(q['executes'] for q in queries.values())
+    return {'prepares': total_prepares, 'executes': total_executes,
+            'saved': total_executes - total_prepares, 'queries': queries}
+
+
+def reset_stats():
+    """İstatistikleri sıfırlar."""
+    with _stats_lock:
+        _stats.clear()
+
+
+# === Bağlantı Başına Kayıt ===
+
+class _PreparedRegistry:
+    """Tek bir bağlantıya ait hazır imleçleri tutar."""
+
+    def __init__(self, connection):
+        self.generation = getattr(connection, 'generation', 0)
+        self.cursors = {}  # {sorgu_adı: (sql, cursor)}
+        self.supported = True  # Bağlantı prepared=True desteklemiyorsa False olur
+
+    def close_all(self):
+        for _, cursor in self.cursors.values():
+            try:
+                cursor.close()
+            except Error:
+                pass  # Bağlantı zaten kopmuş olabilir
+        self.cursors.clear()
+
+
+def _get_registry(connection):
+    """
+    Bağlantının hazır ifade kaydını döndürür, yoksa oluşturur.
+    Bağlantı yeniden kurulduysa (generation değiştiyse) sunucudaki hazır ifadeler
+    silinmiş olacağından kayıt sıfırlanır.
+    """
+    registry = getattr(connection, '_prepared_registry', None)
+    if registry is None:
+        registry = _PreparedRegistry(connection)
+        connection._prepared_registry = registry
+        # Bağlantı havuza iade edilirken imleçler de kapatılsın
+        if hasattr(connection, 'add_close_callback'):
+            connection.add_close_callback(registry.close_all)
+    elif registry.generation != getattr(connection, 'generation', 0):
+        registry.cursors.clear()  # Eski imleçler geçersiz, kapatmaya çalışmaya gerek yok
+        registry.generation = getattr(connection, 'generation', 0)
+    return registry
+
+
+def _execute(connection, name, sql, params):
+    """
+    Sorguyu kayıtlı hazır imleç üzerinden çalıştırır ve imleci döndürür.
+    Hazır imleç desteklenmiyorsa normal imleç açılır (çağıran kapatmalıdır).
+    Returns:
+        tuple: (cursor, kapatılmalı_mı)
+    """
+    registry = _get_registry(connection)
+    if registry.supported:
+        cached = registry.cursors.get(name)
+        if cached is not None and cached[0] == sql:
+            cursor = cached[1]
+            sorgu_olcum.set_label(cursor, name)
+            cursor.execute(sql, params)
+            _count(name, prepared=False)
+            return cursor, False
+        try:
+            if cached is not None:  # Aynı isimle farklı SQL: eskisini kapat
+                cached[1].close()
+            cursor = connection.cursor(prepared=True)
+        except (Error, TypeError, ValueError, NotImplementedError):
+            registry.supported = False
+        else:
+            sorgu_olcum.set_label(cursor, name)
+            try:
+                cursor.execute(sql, params)
+            except Error:
+                registry.cursors.pop(name, None)
+                cursor.close()
+                raise
+            registry.cursors[name] = (sql, cursor)
+            _count(name, prepared=True)
+            return cursor, False
+    # Yedek yol: normal imleç (her çağrıda ayrıştırılır)
+    cursor = connection.cursor()
+    sorgu_olcum.set_label(cursor, name)
+    cursor.execute(sql, params)
+    _count(name, prepared=True)
+    return cursor, True
+
+
+def _rows_to_dicts(cursor, rows):
+    columns = cursor.column_names
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def fetch_one(connection, name, sql, params=()):
+    """
+    Hazır ifadeyi çalıştırıp ilk satırı sözlük olarak döndürür (yoksa None).
+    Hatalar mysql.connector.Error olarak yukarı iletilir; çağıran DatabaseError'a sarmalıdır.
+    """
+    cursor, close_after = _execute(connection, name, sql, params)
+    try:
+        rows = cursor.fetchall()  # Okunmamış sonuç kalmasın diye hepsi okunur
+        return _rows_to_dicts(cursor, rows[:1])[0] if rows else None
+    finally:
+        if close_after:
+            cursor.close()
+
+
+def fetch_all(connection, name, sql, params=()):
+    """Hazır ifadeyi çalıştırıp tüm satırları sözlük listesi olarak döndürür."""
+    cursor, close_after = _execute(connection, name, sql, params)
+    try:
+        return _rows_to_dicts(cursor, cursor.fetchall())
+    finally:
+        if close_after:
+            cursor.close()
+
+
+def execute(connection, name, sql, params=()):
+    """
+    INSERT/UPDATE/DELETE hazır ifadesini çalıştırır. Commit etmez.
+    Returns:
+        tuple: (rowcount, lastrowid)
+    """
+    cursor, close_after = _execute(connection, name, sql, params)
+    try:
+        return cursor.rowcount, cursor.lastrowid
+    finally:
+        if close_after:
+            cursor.close()
@@ -0,0 +1,182 @@
+# hizli_butonlar.py
+# Hızlı buton ürünlerinin (config.ini [quick_buttons]) bellekteki anlık görüntüsü.
+# Satış ekranı hızlı butona basıldığında sadece bellekteki sözlüğü okur, veritabanını hiç beklemez.
+# Görüntü arka plandaki bir iş parçacığında, havuzdan ödünç alınan ayrı bir bağlantıyla
+# [performance] quick_button_refresh_interval saniyede bir yenilenir; satış veya iade kaydedilince
+# request_refresh() ile beklemeden yenileme istenir. Böylece miktar sorusundaki stok ve fiyat,
+# programı yeniden başlatmadan diğer kasalardaki satışları ve fiyat değişikliklerini yansıtır.
+# Butonlar az sayıda olduğundan her yoklamada ürünler barkodla (indeksli, tek sorgu) yeniden çekilir;
+# last_updated değişen ürünler sayılır.
+
+import datetime
+import threading
+from mysql.connector import Error
+from rich import print as rprint
+from hatalar import DatabaseError
+import ayarlar
+import db_config
+import urun_veritabani as product_db_ops
+
+# quick_button_refresh_interval 0 iken (yenileme kapalı) ayarın tekrar kontrol edileceği aralık (saniye)
+IDLE_CHECK_INTERVAL = 5.0
+
+
+def _fetch(connection, quick_buttons):
+    """
+    Butonlardaki ürünleri tek sorguda çeker.
+    Returns:
+        tuple: ({kısayol: ürün sözlüğü}, {kısayol: ürün adı}, [(kısayol, barkod) bulunamayanlar])
+    Raises:
+        DatabaseError: Ürünler okunamazsa.
+    """
+    fetched_products = product_db_ops.get_products_by_barcodes(
+        connection, [barcode for _, barcode in quick_buttons])
+    products_by_barcode = {p['barcode']: p for p in fetched_products}
+    products = {}
+    menu_info = {}
+    missing = []
+    for key, barcode in quick_buttons:
+        product_data = products_by_barcode.get(barcode)
+        if product_data:
+            products[key] = product_data
+            menu_info[key] = product_data.get('name', '?')
+        else:
+            missing.append((key, barcode))
+    return products, menu_info, missing
+
+
+class QuickButtonSnapshot:
+    """
+    Hızlı buton ürünleri. Okuma (get_product, get_menu_info) kilitsizdir: yenileme yeni sözlükleri
+    hazırlayıp tek atamayla değiştirir, mevcut sözlükler hiç değiştirilmez.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Sadece yazanlar (load, arka plan yenilemesi) arasında
+        self._buttons = ()
+        self._products = {}
+        self._menu_info = {}
+        self._wake = threading.Event()
+        self._worker = None
+        self._stats = {'refreshes': 0, 'changed': 0, 'errors': 0, 'last_refresh': None, 'last_error': None}
+
+    def load(self, connection, quick_buttons):
+        """
+        Butonları verilen bağlantıyla hemen yükler (açılışta ve [quick_buttons] değişince).
+        Bulunamayan barkodlar ve veritabanı hataları ekrana yazılır.
+        """
+        quick_buttons = tuple(quick_buttons)
+        products, menu_info, missing = {}, {}, []
+        if quick_buttons:
+            try:
+                products, menu_info, missing = _fetch(connection, quick_buttons)
+            except DatabaseError as db_err:
+                rprint(f"[red]HATA: Hızlı buton ürünleri veritabanından alınırken hata: {db_err}[/]")
+        for key, barcode in missing:
+            rprint(f"[yellow]Uyarı: Hızlı buton '{key}' için tanımlanan barkod ({barcode}) bulunamadı veya ürün pasif.[/]")
+        with self._lock:
+            self._buttons = quick_buttons
+            self._products = products
+            self._menu_info = menu_info
+            self._stats['last_refresh'] = datetime.datetime.now()
+        if quick_buttons:
+            self._ensure_worker()
+
+    def refresh(self, connection):
+        """
+        Butonlardaki ürünleri yeniden çekip görüntüyü değiştirir (arka plan iş parçacığında çalışır).
+        Yenileme sırasında butonlar değiştiyse (load) sonuç atılır.
+        Raises:
+            DatabaseError: Ürünler okunamazsa (mevcut görüntü değişmeden kalır).
+        """
+        buttons = self._buttons
+        if not buttons:
+            return
+        products, menu_info, _ = _fetch(connection, buttons)
+        with self._lock:
+            if self._buttons is not buttons:
+                return
+            old_products = self._products
+            self._products = products
+            self._menu_info = menu_info
+            self._stats['refreshes'] += 1
+            self._stats['changed'] += sum(
+                1 for key, product in products.items()
+                if key not in old_products or old_products[key].get('last_updated') != product.get('last_updated'))
+            self._stats['last_refresh'] = datetime.datetime.now()
+
+    def get_product(self, key):
+        """Kısayola ait ürün sözlüğünün kopyası; kısayol tanımlı değilse veya ürün bulunamadıysa None."""
+        product = self._products.get(key)
+        return dict(product) if product is not None else None
+
+    def get_menu_info(self):
+        """{kısayol: ürün adı} (menüde gösterilir)."""
+        return self._menu_info
+
+    def request_refresh(self):
+        """Arka plandaki yenilemeyi beklemeden başlatır (çağıranı bekletmez)."""
+        self._wake.set()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, name='hizli_butonlar', daemon=True)
+                self._worker.start()
+
+    def _run_worker(self):
+        while True:
+            interval = ayarlar.get_settings().performance.quick_button_refresh_interval
+            self._wake.wait(interval if interval > 0 else IDLE_CHECK_INTERVAL)
+            self._wake.clear()
+            if ayarlar.get_settings().performance.quick_button_refresh_interval <= 0:
+                continue
+            try:
+                with db_config.db_session() as connection:
+                    self.refresh(connection)
+            except (DatabaseError, Error) as e:
+                # Arka planda ekrana yazılmaz (kasiyerin girdisini bozmasın); P1 ekranında görünür
+                with self._lock:
+                    self._stats['errors'] += 1
+                    self._stats['last_error'] = str(e)
+            except Exception as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                    self._stats['last_error'] = f"Beklenmedik hata: {e}"
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'buttons', 'products', 'refreshes', 'changed', 'errors', 'last_refresh', 'last_error'}
+                  changed: Yenilemelerde last_updated değeri değişmiş bulunan ürün sayısı.
+        """
+        with self._lock:
+            return dict(self._stats, buttons=len(self._buttons), products=len(self._products))
+
+
+# Uygulama boyunca tek görüntü
+_snapshot = QuickButtonSnapshot()
+
+
+def load(connection, quick_buttons):
+    """[quick_buttons] ürünlerini yükler ve arka plan yenilemesini başlatır."""
+    _snapshot.load(connection, quick_buttons)
+
+
+def get_product(key):
+    """Hızlı butona ait ürün (sadece bellekten); buton yoksa None."""
+    return _snapshot.get_product(key)
+
+
+def get_menu_info():
+    return _snapshot.get_menu_info()
+
+
+def request_refresh():
+    """Ürünleri değiştiren bir işlemden (satış, iade) sonra çağrılır; yenileme arka planda yapılır."""
+    _snapshot.request_refresh()
+
+
+def get_stats():
+    """Hızlı buton yenileme istatistiklerini döndürür."""
+    return _snapshot.get_stats()
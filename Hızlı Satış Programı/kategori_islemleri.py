@@ -2,9 +2,11 @@
 # Kategori ekleme, listeleme, güncelleme, durum değiştirme ve seçme
 # ile ilgili kullanıcı etkileşimlerini yönetir.
 # v2: select_category fonksiyonundaki hatalı veritabanı çağrısı düzeltildi.
+# v3: Kategori seçimi bellekteki indeksten (referans_onbellek) yapılıyor; kategori değişince indeks yenileniyor.
 
 import arayuz_yardimcilari as ui
 import kategori_veritabani as category_db_ops
+import referans_onbellek
 from hatalar import DatabaseError, DuplicateEntryError
 from rich.console import Console
 from rich.table import Table
@@ -22,6 +24,7 @@ def handle_add_category(connection):
         description = input("Açıklama (isteğe bağlı): ").strip() or None
         new_category_id = category_db_ops.add_category(
             connection, name, description)
+        referans_onbellek.invalidate(referans_onbellek.categories)
         # Başarı mesajı DB fonksiyonunda veriliyor.
         return new_category_id  # Eklenen ID'yi döndür
     except (DuplicateEntryError, ValueError) as e:
@@ -87,6 +90,8 @@ def handle_update_category(connection):
         success = category_db_ops.update_category(
             connection, category_id, new_name, new_description
         )
+        if success:
+            referans_onbellek.invalidate(referans_onbellek.categories)
         # Başarı/hata mesajı DB fonksiyonunda veriliyor.
 
     except (DuplicateEntryError, ValueError) as e:
@@ -121,6 +126,8 @@ def handle_toggle_category_status(connection):
             else:
                 success = category_db_ops.reactivate_category(
                     connection, category_id)
+            if success:
+                referans_onbellek.invalidate(referans_onbellek.categories)
             # Başarı/hata mesajları DB fonksiyonlarında veriliyor.
         else:
             console.print("İşlem iptal edildi.", style="yellow")
@@ -169,7 +176,7 @@ def select_category(connection, prompt_message="Kategori Adı: ", allow_none=Fal
 
         try:
             # Arama yap
-            categories = category_db_ops.get_categories_by_name_like(
+            categories = referans_onbellek.search_categories(
                 connection, search_term, only_active=only_active)
 
             if not categories:
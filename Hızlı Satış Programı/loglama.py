@@ -1,8 +1,10 @@
 # loglama.py
 # Kullanıcı ve sistem aktivitelerini loglama işlemlerini yönetir.
+# v2: Log kayıtları bağlantı havuzundan alınan ayrı bir oturumda yazılıyor.
 
 from mysql.connector import Error
 import datetime
+import db_config
 from hatalar import DatabaseError
 # rich.print kullanmayalım, loglama sessiz olmalı veya standart log kütüphanesi kullanılmalı.
 # Şimdilik hata durumunda standart print kullanalım.
@@ -44,21 +46,33 @@ LOG_ACTION_PASSWORD_CHANGE = "SIFRE_DEGISTIRME"
 def log_activity(connection, user_id: int, action_type: str, details: str = None):
     """
     Yapılan bir işlemi activity_logs tablosuna kaydeder.
+    Kayıt, bağlantı havuzundan ödünç alınan ayrı bir oturumda yapılır ve orada commit edilir;
+    böylece çağıranın bağlantısındaki açık işlem (transaction) yarıda commit edilmez.
     Args:
-        connection: Aktif veritabanı bağlantısı.
+        connection: Çağıranın veritabanı bağlantısı (havuz kullanılamazsa yedek olarak kullanılır).
         user_id (int): İşlemi yapan kullanıcının ID'si.
         action_type (str): Yapılan işlemin türü (yukarıdaki sabitlerden biri).
         details (str, optional): İşlemle ilgili ek detaylar. Defaults to None.
     Returns:
         bool: Log kaydı başarılıysa True, değilse False.
     """
-    if not connection or not connection.is_connected():
-        print("HATA (Loglama): Log kaydetmek için aktif veritabanı bağlantısı gerekli.")
-        return False
     if not user_id or not action_type:
         print("HATA (Loglama): Kullanıcı ID ve eylem türü boş olamaz.")
         return False
 
+    try:
+        with db_config.db_session() as log_connection:
+            return _insert_log(log_connection, user_id, action_type, details)
+    except DatabaseError:
+        # Havuzda boş bağlantı yoksa çağıranın bağlantısıyla devam et
+        if not connection or not connection.is_connected():
+            print("HATA (Loglama): Log kaydetmek için aktif veritabanı bağlantısı gerekli.")
+            return False
+        return _insert_log(connection, user_id, action_type, details)
+
+
+def _insert_log(connection, user_id, action_type, details):
+    """activity_logs tablosuna tek bir kayıt ekler ve commit eder."""
     cursor = None
     try:
         cursor = connection.cursor()
@@ -68,12 +82,6 @@ def log_activity(connection, user_id: int, action_type: str, details: str = None
         timestamp = datetime.datetime.now()
         params = (user_id, action_type, details, timestamp)
         cursor.execute(sql, params)
-
-        # ÖNEMLİ: Loglama işlemi genellikle ana işlemin bir parçası olarak
-        # aynı transaction içinde yapılmalı ve ana işlemle birlikte commit edilmelidir.
-        # Ancak, bu fonksiyonu çağıran yerlerde transaction yönetimi karmaşıklaşabilir.
-        # Şimdilik her log kaydını ayrı ayrı commit edelim.
-        # Performans veya veri bütünlüğü açısından kritik olursa bu yaklaşım gözden geçirilebilir.
         connection.commit()
         return True
     except Error as e:
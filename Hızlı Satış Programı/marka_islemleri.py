@@ -1,9 +1,11 @@
 # marka_islemleri.py
 # Marka ekleme, listeleme, durum değiştirme ve seçme ile ilgili
 # kullanıcı etkileşimlerini yönetir.
+# v2: Marka seçimi bellekteki indeksten (referans_onbellek) yapılıyor; marka eklenince/durumu değişince indeks yenileniyor.
 
 import arayuz_yardimcilari as ui
 import marka_veritabani as brand_db_ops
+import referans_onbellek
 from hatalar import DatabaseError, DuplicateEntryError, UserInputError
 from rich.console import Console
 from rich.table import Table
@@ -50,6 +52,7 @@ def handle_add_brand(connection):
     try:
         name = ui.get_non_empty_input("Marka Adı: ")
         new_brand_id = brand_db_ops.add_brand(connection, name)
+        referans_onbellek.invalidate(referans_onbellek.brands)
         # Başarı mesajı add_brand içinde veriliyor.
         # Eklenen markanın ID'sini döndür (select_brand içinde kullanılabilir)
         return new_brand_id
@@ -89,7 +92,7 @@ def handle_toggle_brand_status(connection):
     try:
         search_term = ui.get_non_empty_input(
             "Durumu değiştirilecek Markanın Adını girin: ")
-        brands = brand_db_ops.get_brands_by_name_like(
+        brands = referans_onbellek.search_brands(
             connection, search_term, only_active=False)  # Aktif/Pasif ara
 
         if not brands:
@@ -132,6 +135,8 @@ def handle_toggle_brand_status(connection):
                 else:
                     success = brand_db_ops.reactivate_brand(
                         connection, brand_id)
+                if success:
+                    referans_onbellek.invalidate(referans_onbellek.brands)
                 # Başarı/hata mesajları DB fonksiyonlarında veriliyor.
             else:
                 console.print("İşlem iptal edildi.", style="yellow")
@@ -161,7 +166,7 @@ def select_brand(connection, prompt_message="Marka Adı: ", allow_none=False):
     while True:
         search_term = ui.get_non_empty_input(prompt_message)
         try:
-            brands = brand_db_ops.get_brands_by_name_like(
+            brands = referans_onbellek.search_brands(
                 connection, search_term, only_active=True)  # Sadece aktifleri ara
 
             if not brands:
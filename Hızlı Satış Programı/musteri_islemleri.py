@@ -5,6 +5,7 @@
 # v46: handle_customer_payment fonksiyonuna active_shift_id parametresi eklendi.
 # v49: Müşteri işlemleri için loglama eklendi.
 # v50: handle_customer_payment fonksiyonuna customer_payment_methods parametresi eklendi.
+# v51: Müşteri listesi sayfa sayfa gösteriliyor; durum (aktif/pasif/tümü) ile filtrelenebiliyor.
 
 import arayuz_yardimcilari as ui
 import musteri_veritabani as customer_db_ops
@@ -142,13 +143,15 @@ def handle_list_customers(connection):
     """Müşterileri listeleme işlemini yönetir."""
     console.print("\n--- Müşteri Listesi ---", style="bold blue")
     try:
-        show_inactive = ui.get_yes_no_input(
-            "Pasif müşteriler de gösterilsin mi?")
-        customers = customer_db_ops.get_all_customers_detailed(
-            connection, include_inactive=show_inactive)
-        status_text = "Tüm" if show_inactive else "Aktif"
-        ui.display_customer_list_detailed(
-            customers, title=f"{status_text} Müşteriler")
+        active = ui.get_active_filter_input("Listelenecek müşteriler:")
+
+        def fetch_page(after=None, before=None):
+            return customer_db_ops.get_customers_page(
+                connection, after=after, before=before, active=active)
+
+        status_text = {True: "Aktif", False: "Pasif", None: "Tüm"}[active]
+        ui.browse_pages(fetch_page, lambda rows, title: ui.display_customer_list_detailed(rows, title=title),
+                        f"{status_text} Müşteriler")
     except DatabaseError as e:
         console.print(
             f">>> VERİTABANI HATASI (Listeleme): {e}", style="bold red")
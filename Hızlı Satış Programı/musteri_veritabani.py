@@ -4,11 +4,16 @@
 # v46: record_customer_payment fonksiyonuna shift_id eklendi.
 # v49: get_customer_available_coupons sorgusundaki expiry_date sütun adı ve durum kontrolü düzeltildi.
 # v50: get_customer_ledger sorgusundaki payment_id sütun adı customer_payment_id olarak düzeltildi.
+# v51: iter_customers_detailed ile müşteri listesi akışlı (parça parça) okunabiliyor.
+# v52: get_customers_by_name_like, name_search = fulltext ise FULLTEXT (ngram) indeksiyle arıyor.
+# v53: get_customers_page ile müşteri listesi durum filtreli ve sayfa sayfa (keyset) okunabiliyor.
 
 from mysql.connector import Error, errorcode
 from decimal import Decimal
 import datetime
 from hatalar import DatabaseError, DuplicateEntryError
+from db_config import is_transaction_conflict, iter_rows, fulltext_query, fetch_keyset_page
+import ayarlar
 from rich import print as rprint
 import arayuz_yardimcilari as ui  # console için
 
@@ -109,18 +114,29 @@ def get_customer_by_phone(connection, phone, only_active=True):
 
 
 def get_customers_by_name_like(connection, search_term, only_active=True):
-    """Verilen isim parçasını içeren müşterileri arar (ID, Ad, Aktiflik)."""
+    """
+    Verilen isim parçasını içeren müşterileri arar (ID, Ad, Aktiflik).
+    name_search = fulltext ise FULLTEXT indeksiyle, ilgiye göre sıralı ve sınırlı sonuç döner.
+    """
     if not connection or not connection.is_connected():
         raise DatabaseError("Müşteri aramak için aktif bağlantı gerekli.")
     cursor = None
     try:
         cursor = connection.cursor()
-        sql = "SELECT customer_id, name, is_active FROM customers WHERE LOWER(name) LIKE LOWER(%s)"
-        pattern = f"%{search_term}%"
-        params = [pattern]
+        boolean_query = fulltext_query(connection, search_term)
+        if boolean_query:
+            sql = "SELECT customer_id, name, is_active FROM customers WHERE MATCH(name) AGAINST(%s IN BOOLEAN MODE)"
+            params = [boolean_query]
+        else:
+            sql = "SELECT customer_id, name, is_active FROM customers WHERE LOWER(name) LIKE LOWER(%s)"
+            params = [f"%{search_term}%"]
         if only_active:
             sql += " AND is_active = TRUE"
-        sql += " ORDER BY name ASC"
+        if boolean_query:
+            sql += " ORDER BY MATCH(name) AGAINST(%s IN BOOLEAN MODE) DESC, name ASC LIMIT %s"
+            params += [boolean_query, ayarlar.get_settings().performance.search_result_limit]
+        else:
+            sql += " ORDER BY name ASC"
         cursor.execute(sql, params)
         return cursor.fetchall()  # Liste döner
     except Error as e:
@@ -131,25 +147,44 @@ def get_customers_by_name_like(connection, search_term, only_active=True):
             cursor.close()
 
 
-def get_all_customers_detailed(connection, include_inactive=False):
-    """Tüm müşterilerin detaylı bilgilerini getirir."""
+def iter_customers_detailed(connection, include_inactive=False):
+    """
+    Tüm müşterilerin detaylı bilgilerini tek tek döndüren üreteç (sunucudan parça parça okunur,
+    bkz. db_config.iter_rows). Üreteç tükenene kadar aynı bağlantıda başka sorgu çalıştırılmamalıdır.
+    """
     if not connection or not connection.is_connected():
         raise DatabaseError(
             "Müşterileri listelemek için aktif bağlantı gerekli.")
-    cursor = None
-    try:
-        cursor = connection.cursor(dictionary=True)
-        sql = "SELECT * FROM customers"
-        if not include_inactive:
-            sql += " WHERE is_active = TRUE"
-        sql += " ORDER BY name ASC"
-        cursor.execute(sql)
-        return cursor.fetchall()
-    except Error as e:
-        raise DatabaseError(f"Detaylı müşteri listesi alma hatası: {e}") from e
-    finally:
-        if cursor:
-            cursor.close()
+    sql = "SELECT * FROM customers"
+    if not include_inactive:
+        sql += " WHERE is_active = TRUE"
+    sql += " ORDER BY name ASC"
+    return iter_rows(connection, sql, error_message="Detaylı müşteri listesi alma hatası")
+
+
+def get_customers_page(connection, after=None, before=None, page_size=None, active=True):
+    """
+    Detaylı müşteri listesinin bir sayfasını (ad, ID sırasıyla) getirir; bkz. db_config.fetch_keyset_page.
+    Args:
+        active (bool): True: sadece aktif, False: sadece pasif, None: tüm müşteriler.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError(
+            "Müşterileri listelemek için aktif bağlantı gerekli.")
+    where_clauses = []
+    params = []
+    if active is not None:
+        where_clauses.append("is_active = %s")
+        params.append(bool(active))
+    return fetch_keyset_page(connection, "SELECT * FROM customers", where_clauses, params,
+                             order_columns=("name", "customer_id"), key_fields=("name", "customer_id"),
+                             after=after, before=before, page_size=page_size,
+                             error_message="Detaylı müşteri listesi alma hatası")
+
+
+def get_all_customers_detailed(connection, include_inactive=False):
+    """Tüm müşterilerin detaylı bilgilerini getirir."""
+    return list(iter_customers_detailed(connection, include_inactive))
 
 # === Müşteri Güncelleme ===
 
@@ -443,6 +478,10 @@ def add_loyalty_points(connection, customer_id, points_to_add, reason=""):
         else:
             return False
     except Error as e:
+        if is_transaction_conflict(e):
+            # Deadlock'ta InnoDB tüm işlemi geri alır; yutulursa satışın kalanı yarım kaydedilir.
+            raise DatabaseError(
+                f"Müşteri (ID: {customer_id}) sadakat puanı eklenirken kilit çakışması: {e}") from e
         rprint(
             f"[yellow]Uyarı: Müşteri (ID: {customer_id}) sadakat puanı eklenirken hata: {e}[/]")
         return False
@@ -0,0 +1,147 @@
+# otomatik_tamamlama.py
+# Tuş tuş güncellenen öneri listesiyle girdi alma (otomatik tamamlama).
+# Her tuşta öneri fonksiyonu çağrılır ve ilk sonuçlar girdinin altında gösterilir; kasiyer
+# Yukarı/Aşağı oklarıyla öneri seçip Enter'a basar. Tuşlar Windows'ta msvcrt, diğer sistemlerde
+# termios ile tek tek okunur (ek paket gerekmez). Terminal desteklemiyorsa (ör. girdi
+# yönlendirilmişse) is_supported() False döner ve çağıran normal input() akışını kullanır.
+
+import codecs
+import os
+import select
+import sys
+from rich.console import Group
+from rich.live import Live
+from rich.table import Table
+from rich.text import Text
+from arayuz_yardimcilari import console
+
+try:
+    import msvcrt  # Windows
+except ImportError:
+    msvcrt = None
+try:
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = tty = None
+
+# Özel tuşlar _read_key_windows / _read_key_posix ve _CONTROL_KEYS ile bu adlara çevrilir
+KEY_ENTER = 'ENTER'
+KEY_BACKSPACE = 'BACKSPACE'
+KEY_UP = 'UP'
+KEY_DOWN = 'DOWN'
+KEY_ESC = 'ESC'
+
+_WINDOWS_SPECIAL = {'H': KEY_UP, 'P': KEY_DOWN}
+_ANSI_ESCAPES = {'[A': KEY_UP, '[B': KEY_DOWN, 'OA': KEY_UP, 'OB': KEY_DOWN}
+_CONTROL_KEYS = {'\r': KEY_ENTER, '\n': KEY_ENTER, '\x08': KEY_BACKSPACE, '\x7f': KEY_BACKSPACE, '\x1b': KEY_ESC}
+
+
+def is_supported():
+    """Tuş tuş okuma yapılabiliyorsa (etkileşimli terminal) True."""
+    try:
+        if not sys.stdin.isatty():
+            return False
+    except (AttributeError, ValueError):
+        return False
+    return msvcrt is not None or termios is not None
+
+
+def _read_key_windows():
+    char = msvcrt.getwch()
+    if char in ('\x00', '\xe0'):  # Ok tuşları iki karakter gönderir
+        return _WINDOWS_SPECIAL.get(msvcrt.getwch(), '')
+    return char
+
+
+def _read_key_posix(fd, decoder):
+    char = ''
+    while not char:
+        char = decoder.decode(os.read(fd, 1))
+    if char != '\x1b':
+        return char
+    # ESC tek başına mı, yoksa ok tuşu dizisinin (ESC [ A) başı mı?
+    sequence = ''
+    while select.select([fd], [], [], 0.03)[0]:
+        sequence += os.read(fd, 1).decode('ascii', errors='ignore')
+        if sequence[-1:].isalpha() or sequence[-1:] == '~':
+            break
+    if not sequence:
+        return char
+    return _ANSI_ESCAPES.get(sequence, '')
+
+
+def _render(prompt, text, suggestions, highlighted, columns, format_row, empty_message):
+    line = Text.assemble((prompt, "bold"), (text, "cyan"), ("▏", "dim"))
+    if not text:
+        return line
+    if not suggestions:
+        return Group(line, Text(empty_message, style="dim"))
+    table = Table(show_header=False, box=None, padding=(0, 1))
+    for column in columns:
+        table.add_column(column)
+    for i, item in enumerate(suggestions):
+        table.add_row(*format_row(item), style="reverse" if i == highlighted else None)
+    return Group(line, table, Text("↑/↓: Seç  Enter: Onayla  Esc: İptal", style="dim"))
+
+
+def autocomplete_input(prompt, suggest, format_row, columns, empty_message="Öneri yok, Enter ile ara."):
+    """
+    Öneri listesiyle girdi alır.
+    Args:
+        prompt: Girdinin önündeki metin.
+        suggest: suggest(metin) -> öneri listesi; her tuşta çağrılır, hızlı olmalıdır (veritabanına gitmemeli).
+        format_row: format_row(öneri) -> sütun metinleri demeti.
+        columns: Sütun adları (tablo sütun sayısı için).
+    Returns:
+        tuple: (girilen metin, seçilen öneri veya None, oklarla seçim yapıldı mı);
+               Esc ile iptal edilirse None.
+    Raises:
+        KeyboardInterrupt: Ctrl+C.
+    """
+    text = ''
+    suggestions = []
+    highlighted = 0
+    navigated = False
+    fd = old_attrs = decoder = None
+    if msvcrt is None:
+        fd = sys.stdin.fileno()
+        old_attrs = termios.tcgetattr(fd)
+        decoder = codecs.getincrementaldecoder(sys.stdin.encoding or 'utf-8')(errors='ignore')
+        tty.setcbreak(fd)  # Satır beklemeden, yazılanı ekrana basmadan oku (Ctrl+C çalışmaya devam eder)
+    try:
+        with Live(_render(prompt, text, suggestions, highlighted, columns, format_row, empty_message),
+                  console=console, auto_refresh=False, transient=True) as live:
+            while True:
+                key = _read_key_windows() if msvcrt is not None else _read_key_posix(fd, decoder)
+                if key == '\x03':
+                    raise KeyboardInterrupt
+                key = _CONTROL_KEYS.get(key, key)
+                if key == KEY_ESC:
+                    return None
+                if key == KEY_ENTER:
+                    selected = suggestions[highlighted] if suggestions else None
+                    return text.strip(), selected, navigated
+                if key == KEY_UP and suggestions:
+                    highlighted = (highlighted - 1) % len(suggestions)
+                    navigated = True
+                elif key == KEY_DOWN and suggestions:
+                    highlighted = (highlighted + 1) % len(suggestions)
+                    navigated = True
+                elif key in (KEY_UP, KEY_DOWN, ''):
+                    continue
+                else:
+                    if key == KEY_BACKSPACE:
+                        text = text[:-1]
+                    elif key.isprintable():
+                        text += key
+                    else:
+                        continue
+                    suggestions = suggest(text) if text.strip() else []
+                    highlighted = 0
+                    navigated = False
+                live.update(_render(prompt, text, suggestions, highlighted, columns, format_row, empty_message),
+                            refresh=True)
+    finally:
+        if old_attrs is not None:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
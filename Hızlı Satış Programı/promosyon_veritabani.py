@@ -3,11 +3,16 @@
 # v2: BOGO ve BuyXGetYFree promosyon türleri için sütunlar eklendi.
 # v3: add_promotion ve update_promotion fonksiyonlarında, ilgili türe ait olmayan
 #     NOT NULL sütunlara varsayılan değer (0) ataması eklendi.
+# v4: get_active_promotions_for_product bağlantı koptuğunda yeniden bağlanıp tekrar deneniyor.
+# v5: get_active_promotions_for_product hazır ifade (hazir_sorgular) kullanıyor.
+# v6: get_active_promotions_for_products ile sepetteki tüm ürünlerin promosyonları tek sorguda alınıyor.
 
 from mysql.connector import Error, errorcode
 from decimal import Decimal
 import datetime
 from hatalar import DatabaseError, DuplicateEntryError
+from db_config import retry_on_disconnect
+import hazir_sorgular
 from rich import print as rprint
 
 # === Promosyon Ekleme ===
@@ -137,6 +142,7 @@ def list_all_promotions(connection, include_inactive=False):
 # === Aktif Promosyonları Getirme (Ürüne Göre) ===
 
 
+@retry_on_disconnect
 def get_active_promotions_for_product(connection, product_id):
     """
     Belirli bir ürün için şu anda aktif ve geçerli olan promosyonları getirir.
@@ -147,9 +153,7 @@ def get_active_promotions_for_product(connection, product_id):
     """
     if not connection or not connection.is_connected():
         raise DatabaseError("Aktif promosyonları getirmek için bağlantı gerekli.")
-    cursor = None
     try:
-        cursor = connection.cursor(dictionary=True)
         today = datetime.date.today()
         sql = """SELECT
                     promotion_id, name, description, promotion_type, product_id,
@@ -162,11 +166,49 @@ def get_active_promotions_for_product(connection, product_id):
                    AND (end_date IS NULL OR end_date >= %s)
               """
         params = (product_id, today, today)
-        cursor.execute(sql, params)
-        results = cursor.fetchall()
-        return results
+        return hazir_sorgular.fetch_all(connection, 'promosyon.urun_aktif', sql, params)
     except Error as e:
         raise DatabaseError(f"Ürün (ID: {product_id}) için aktif promosyonları getirme hatası: {e}") from e
+
+
+@retry_on_disconnect
+def get_active_promotions_for_products(connection, product_ids):
+    """
+    Verilen ürünler için şu anda aktif ve geçerli olan promosyonları tek sorguda getirir
+    (satış tamamlanırken sepetteki ürünler için).
+    Args:
+        product_ids (iterable): Ürün ID'leri (tekrar edenler bir kez sorgulanır).
+    Returns:
+        dict: {product_id: geçerli promosyon sözlükleri listesi}; promosyonu olmayan ürünler için boş liste.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Aktif promosyonları getirmek için bağlantı gerekli.")
+    product_ids = list(dict.fromkeys(product_ids))
+    promotions = {product_id: [] for product_id in product_ids}
+    if not product_ids:
+        return promotions
+
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        today = datetime.date.today()
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        sql = f"""SELECT
+                    promotion_id, name, description, promotion_type, product_id,
+                    required_quantity, discount_amount,
+                    required_bogo_quantity, free_quantity, free_product_id
+                 FROM promotions
+                 WHERE product_id IN ({placeholders})
+                   AND is_active = TRUE
+                   AND (start_date IS NULL OR start_date <= %s)
+                   AND (end_date IS NULL OR end_date >= %s)
+              """
+        cursor.execute(sql, product_ids + [today, today])
+        for row in cursor.fetchall():
+            promotions[row['product_id']].append(row)
+        return promotions
+    except Error as e:
+        raise DatabaseError(f"Sepetteki ürünler için aktif promosyonları getirme hatası: {e}") from e
     finally:
         if cursor:
             cursor.close()
@@ -0,0 +1,210 @@
+# referans_onbellek.py
+# Marka, kategori ve tedarikçi listelerinin bellekteki arama indeksi.
+# Bu tablolar küçüktür ve nadiren değişir; ama CSV içe aktarmada her satırda, ürün ekleme/güncellemede
+# ve alış girişinde tedarikçi seçerken tekrar tekrar sorgulanıyordu. Her liste ilk kullanıldığında tek
+# sorguyla (pasifler dahil) okunur; ada göre tam eşleşme (önce birebir, sonra Türkçe küçük harfle),
+# önek ve kelime içi arama bellekten yapılır.
+# Bu kasada yapılan değişikliklerden sonra ilgili işlem ekranı invalidate() çağırır; liste bir sonraki
+# kullanımda yeniden okunur. Diğer kasalardaki değişiklikler için liste en fazla
+# [performance] reference_cache_ttl saniyede bir yeniden okunur (0: sadece invalidate ile).
+# Sonuçlar sözlük kopyası olarak döner (marka_veritabani / kategori_veritabani sözlükleriyle aynı alanlar).
+
+import bisect
+import threading
+import time
+import ayarlar
+import marka_veritabani as brand_db_ops
+import kategori_veritabani as category_db_ops
+import tedarikci_veritabani as supplier_db_ops
+from urun_arama import turkish_casefold
+
+# tedarikci_veritabani.iter_suppliers demetlerinin alanları
+SUPPLIER_FIELDS = ('supplier_id', 'name', 'contact_person', 'phone', 'email', 'is_active')
+
+# Önek araması için sıralı listede anahtarın üst sınırı (aynı önekle başlayan tüm adlardan büyük)
+_PREFIX_END = '\U0010ffff'
+
+
+def _digits(text):
+    return ''.join(ch for ch in str(text or '') if ch.isdigit())
+
+
+class ReferenceIndex:
+    """
+    Bir referans tablosunun (marka, kategori veya tedarikçi) bellekteki görüntüsü.
+    Okuma kilitsizdir: yükleme yeni yapıları hazırlayıp tek atamayla değiştirir.
+    """
+
+    def __init__(self, title, id_field, fetch):
+        self.title = title
+        self._id_field = id_field
+        self._fetch = fetch  # connection -> sözlük listesi (pasifler dahil)
+        self._lock = threading.Lock()
+        self._state = None  # (id -> satır, ad -> satır, küçük harf ad -> [satır], sıralı [(küçük harf ad, id)])
+        self._loaded_at = 0.0
+        self._generation = 0  # invalidate() her çağrıldığında artar
+        self._stats = {'loads': 0, 'hits': 0, 'invalidations': 0}
+
+    def _build(self, rows):
+        by_id, by_name, by_folded, keys = {}, {}, {}, []
+        for row in rows:
+            row_id = row[self._id_field]
+            folded = turkish_casefold(row.get('name') or '')
+            by_id[row_id] = row
+            by_name.setdefault(row.get('name'), row)
+            by_folded.setdefault(folded, []).append(row)
+            keys.append((folded, row_id))
+        keys.sort()
+        return by_id, by_name, by_folded, keys
+
+    def _current(self, connection):
+        """Geçerli görüntü; hiç yüklenmemişse, geçersiz kılındıysa veya süresi dolduysa yeniden okunur."""
+        state = self._state
+        ttl = ayarlar.get_settings().performance.reference_cache_ttl
+        if state is None or (ttl > 0 and time.monotonic() - self._loaded_at >= ttl):
+            generation = self._generation
+            state = self._build(self._fetch(connection))
+            with self._lock:
+                # Okuma sırasında invalidate() çağrıldıysa bu sonuç saklanmaz (değişikliği içermeyebilir)
+                if generation == self._generation:
+                    self._state = state
+                    self._loaded_at = time.monotonic()
+                self._stats['loads'] += 1
+        else:
+            with self._lock:
+                self._stats['hits'] += 1
+        return state
+
+    def invalidate(self):
+        """Bu kasada kayıt eklendi/güncellendi/durumu değişti; bir sonraki kullanımda yeniden okunur."""
+        with self._lock:
+            self._state = None
+            self._generation += 1
+            self._stats['invalidations'] += 1
+
+    @staticmethod
+    def _visible(rows, only_active):
+        return [dict(row) for row in rows if not only_active or row.get('is_active')]
+
+    def get_by_id(self, connection, row_id):
+        row = self._current(connection)[0].get(row_id)
+        return dict(row) if row is not None else None
+
+    def get_by_name(self, connection, name, only_active=True):
+        """
+        Adı verilen kayıt: önce birebir aynı ad, yoksa Türkçe küçük harfe çevrilmiş adla eşleşen ilk kayıt.
+        Returns:
+            dict veya None
+        """
+        _, by_name, by_folded, _ = self._current(connection)
+        row = by_name.get(name)
+        if row is not None and (not only_active or row.get('is_active')):
+            return dict(row)
+        matches = self._visible(by_folded.get(turkish_casefold(name or ''), ()), only_active)
+        return matches[0] if matches else None
+
+    def complete(self, connection, prefix, only_active=True, limit=None):
+        """Adı verilen önekle başlayan kayıtlar (ada göre sıralı)."""
+        by_id, _, _, keys = self._current(connection)
+        folded = turkish_casefold(prefix or '')
+        start = bisect.bisect_left(keys, (folded,))
+        end = bisect.bisect_left(keys, (folded + _PREFIX_END,), start)
+        rows = self._visible((by_id[row_id] for _, row_id in keys[start:end]), only_active)
+        return rows[:limit] if limit else rows
+
+    def search(self, connection, term, only_active=True):
+        """
+        Adında aranan metin geçen kayıtlar (LIKE '%...%' karşılığı, Türkçe büyük/küçük harf duyarsız).
+        Adı aranan metinle başlayanlar önce, diğerleri sonra; her grup ada göre sıralı.
+        """
+        by_id, _, _, keys = self._current(connection)
+        folded = turkish_casefold(term or '')
+        prefix_rows, contains_rows = [], []
+        for key, row_id in keys:
+            if key.startswith(folded):
+                prefix_rows.append(by_id[row_id])
+            elif folded in key:
+                contains_rows.append(by_id[row_id])
+        return self._visible(prefix_rows + contains_rows, only_active)
+
+    def search_field_digits(self, connection, field, term, only_active=True):
+        """Verilen alanın rakamlarında (ör. telefon) aranan rakamlar geçen kayıtlar (ada göre sıralı)."""
+        by_id, _, _, keys = self._current(connection)
+        digits = _digits(term)
+        if not digits:
+            return []
+        return self._visible((by_id[row_id] for _, row_id in keys
+                              if digits in _digits(by_id[row_id].get(field))), only_active)
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'title', 'rows', 'loads', 'hits', 'invalidations', 'age'}
+                  age: Son yüklemeden bu yana geçen süre (saniye, yüklenmemişse None).
+        """
+        with self._lock:
+            state = self._state
+            return dict(self._stats, title=self.title,
+                        rows=len(state[0]) if state else 0,
+                        age=time.monotonic() - self._loaded_at if state else None)
+
+
+def _fetch_suppliers(connection):
+    return [dict(zip(SUPPLIER_FIELDS, row))
+            for row in supplier_db_ops.iter_suppliers(connection, include_inactive=True)]
+
+
+# Uygulama boyunca tek indeks (her tablo için)
+brands = ReferenceIndex("Markalar", 'brand_id',
+                        lambda connection: brand_db_ops.list_all_brands(connection, include_inactive=True))
+categories = ReferenceIndex("Kategoriler", 'category_id',
+                            lambda connection: category_db_ops.list_all_categories(connection, include_inactive=True))
+suppliers = ReferenceIndex("Tedarikçiler", 'supplier_id', _fetch_suppliers)
+
+_INDEXES = (brands, categories, suppliers)
+
+
+def get_brand_by_name(connection, name, only_active=True):
+    """marka_veritabani.get_brand_by_name karşılığı (bellekten)."""
+    return brands.get_by_name(connection, name, only_active)
+
+
+def search_brands(connection, term, only_active=True):
+    """marka_veritabani.get_brands_by_name_like karşılığı (bellekten)."""
+    return brands.search(connection, term, only_active)
+
+
+def get_category_by_name(connection, name, only_active=True):
+    """Adı verilen kategori (bellekten); bulunamazsa None."""
+    return categories.get_by_name(connection, name, only_active)
+
+
+def search_categories(connection, term, only_active=True):
+    """kategori_veritabani.get_categories_by_name_like karşılığı (bellekten)."""
+    return categories.search(connection, term, only_active)
+
+
+def get_supplier_by_id(connection, supplier_id):
+    """Tedarikçi (adres hariç, bellekten); bulunamazsa None."""
+    return suppliers.get_by_id(connection, supplier_id)
+
+
+def search_suppliers(connection, term, only_active=True):
+    """Adında aranan metin geçen tedarikçiler (bellekten)."""
+    return suppliers.search(connection, term, only_active)
+
+
+def search_suppliers_by_phone(connection, term, only_active=True):
+    """Telefon numarasında aranan rakamlar geçen tedarikçiler (bellekten; boşluk/tire fark etmez)."""
+    return suppliers.search_field_digits(connection, 'phone', term, only_active)
+
+
+def invalidate(*indexes):
+    """Verilen indeksleri (verilmezse hepsini) geçersiz kılar; bir sonraki kullanımda yeniden okunurlar."""
+    for index in indexes or _INDEXES:
+        index.invalidate()
+
+
+def get_stats():
+    """Her indeks için get_stats() sonuçlarının listesi."""
+    return [index.get_stats() for index in _INDEXES]
@@ -0,0 +1,592 @@
+# sema_yonetimi.py
+# Veritabanı şemasının sürümlü kurulumu ve güncellenmesi (migration).
+# Tüm tablolar ve sık çalışan sorguların ihtiyaç duyduğu indeksler buradan oluşturulur.
+# Uygulanan sürümler schema_migrations tablosunda tutulur; her adım yalnızca bir kez çalışır.
+#
+# Kullanım:
+#   python sema_yonetimi.py            -> Bekleyen tüm adımları uygular
+#   python sema_yonetimi.py kontrol    -> Sadece durumu ve eksik indeksleri listeler, değişiklik yapmaz
+#
+# Program açılışta ensure_current() ile sürümü kontrol eder: SQLite bekleyen adımları kendisi
+# uygular, MySQL'de (ortak sunucu) adımlar bu araçla elle çalıştırılana kadar program açılmaz.
+#
+# Not: SQLite arka ucunda tablolar yerel_veritabani tarafından oluşturulur; burada sadece
+#      eksik sütun ve indeksler tamamlanır.
+
+import sys
+from mysql.connector import Error
+from rich import print as rprint
+from hatalar import DatabaseError
+import db_config
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+# === Tablolar (MySQL) ===
+# Sıra önemlidir: yabancı anahtar (FOREIGN KEY) ile başvurulan tablo önce oluşturulur.
+_TABLE_OPTIONS = "ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_turkish_ci"
+
+MYSQL_TABLES = (
+    ("users", """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(50) NOT NULL UNIQUE,
+        password_hash VARBINARY(255) NOT NULL,
+        full_name VARCHAR(100),
+        role VARCHAR(20) NOT NULL DEFAULT 'user',
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )"""),
+    ("brands", """
+    CREATE TABLE IF NOT EXISTS brands (
+        brand_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE
+    )"""),
+    ("categories", """
+    CREATE TABLE IF NOT EXISTS categories (
+        category_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        description TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE
+    )"""),
+    ("suppliers", """
+    CREATE TABLE IF NOT EXISTS suppliers (
+        supplier_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(150) NOT NULL UNIQUE,
+        contact_person VARCHAR(100),
+        phone VARCHAR(20) UNIQUE,
+        email VARCHAR(100) UNIQUE,
+        address TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE
+    )"""),
+    ("products", """
+    CREATE TABLE IF NOT EXISTS products (
+        product_id INT AUTO_INCREMENT PRIMARY KEY,
+        barcode VARCHAR(50) NOT NULL UNIQUE,
+        name VARCHAR(200) NOT NULL,
+        brand_id INT,
+        category_id INT,
+        price_before_kdv DECIMAL(10,2) NOT NULL DEFAULT 0,
+        kdv_rate DECIMAL(5,2) NOT NULL DEFAULT 0,
+        selling_price DECIMAL(10,2) NOT NULL DEFAULT 0,
+        previous_selling_price DECIMAL(10,2),
+        stock DECIMAL(12,3) NOT NULL DEFAULT 0,
+        min_stock_level INT DEFAULT 2,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (brand_id) REFERENCES brands(brand_id),
+        FOREIGN KEY (category_id) REFERENCES categories(category_id)
+    )"""),
+    ("product_barcodes", """
+    CREATE TABLE IF NOT EXISTS product_barcodes (
+        barcode_id INT AUTO_INCREMENT PRIMARY KEY,
+        product_id INT NOT NULL,
+        barcode VARCHAR(50) NOT NULL UNIQUE,
+        description VARCHAR(100),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_product_barcodes_product (product_id),
+        FOREIGN KEY (product_id) REFERENCES products(product_id) ON DELETE CASCADE
+    )"""),
+    ("customers", """
+    CREATE TABLE IF NOT EXISTS customers (
+        customer_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(150) NOT NULL,
+        phone VARCHAR(20) UNIQUE,
+        email VARCHAR(100) UNIQUE,
+        address TEXT,
+        balance DECIMAL(10,2) NOT NULL DEFAULT 0,
+        loyalty_points INT NOT NULL DEFAULT 0,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )"""),
+    ("shifts", """
+    CREATE TABLE IF NOT EXISTS shifts (
+        shift_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        start_time DATETIME NOT NULL,
+        end_time DATETIME,
+        starting_cash DECIMAL(10,2) NOT NULL DEFAULT 0,
+        ending_cash DECIMAL(10,2),
+        total_sales DECIMAL(10,2),
+        cash_sales DECIMAL(10,2),
+        card_sales DECIMAL(10,2),
+        veresiye_sales DECIMAL(10,2),
+        cash_payments_received DECIMAL(10,2),
+        card_payments_received DECIMAL(10,2),
+        calculated_difference DECIMAL(10,2),
+        notes TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )"""),
+    ("promotions", """
+    CREATE TABLE IF NOT EXISTS promotions (
+        promotion_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(150) NOT NULL UNIQUE,
+        description TEXT,
+        promotion_type VARCHAR(30) NOT NULL,
+        product_id INT,
+        required_quantity INT NOT NULL DEFAULT 0,
+        discount_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+        required_bogo_quantity INT NOT NULL DEFAULT 0,
+        free_quantity INT NOT NULL DEFAULT 0,
+        free_product_id INT,
+        start_date DATE,
+        end_date DATE,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        FOREIGN KEY (product_id) REFERENCES products(product_id),
+        FOREIGN KEY (free_product_id) REFERENCES products(product_id)
+    )"""),
+    ("coupons", """
+    CREATE TABLE IF NOT EXISTS coupons (
+        coupon_id INT AUTO_INCREMENT PRIMARY KEY,
+        coupon_code VARCHAR(50) NOT NULL UNIQUE,
+        description TEXT,
+        discount_type VARCHAR(20) NOT NULL,
+        discount_value DECIMAL(10,2) NOT NULL,
+        min_purchase_amount DECIMAL(10,2) DEFAULT 0,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE
+    )"""),
+    ("customer_coupons", """
+    CREATE TABLE IF NOT EXISTS customer_coupons (
+        customer_coupon_id INT AUTO_INCREMENT PRIMARY KEY,
+        customer_id INT NOT NULL,
+        coupon_id INT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'available',
+        assigned_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        expiry_date DATE,
+        used_sale_id INT,
+        used_date DATETIME,
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+        FOREIGN KEY (coupon_id) REFERENCES coupons(coupon_id)
+    )"""),
+    ("loyalty_rules", """
+    CREATE TABLE IF NOT EXISTS loyalty_rules (
+        rule_id INT AUTO_INCREMENT PRIMARY KEY,
+        rule_name VARCHAR(100) NOT NULL UNIQUE,
+        points_per_tl DECIMAL(10,4) NOT NULL DEFAULT 0,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE
+    )"""),
+    ("sales", """
+    CREATE TABLE IF NOT EXISTS sales (
+        sale_id INT AUTO_INCREMENT PRIMARY KEY,
+        customer_id INT,
+        shift_id INT,
+        sale_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        total_amount DECIMAL(10,2) NOT NULL,
+        discount_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+        promotion_discount DECIMAL(10,2) NOT NULL DEFAULT 0,
+        applied_customer_coupon_id INT,
+        applied_promotion_id INT,
+        status VARCHAR(20) NOT NULL DEFAULT 'completed',
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+        FOREIGN KEY (shift_id) REFERENCES shifts(shift_id),
+        FOREIGN KEY (applied_customer_coupon_id) REFERENCES customer_coupons(customer_coupon_id),
+        FOREIGN KEY (applied_promotion_id) REFERENCES promotions(promotion_id)
+    )"""),
+    ("sale_items", """
+    CREATE TABLE IF NOT EXISTS sale_items (
+        sale_item_id INT AUTO_INCREMENT PRIMARY KEY,
+        sale_id INT NOT NULL,
+        product_id INT NOT NULL,
+        quantity DECIMAL(10,3) NOT NULL,
+        price_at_sale DECIMAL(10,2) NOT NULL,
+        line_total DECIMAL(10,2) NULL,
+        FOREIGN KEY (sale_id) REFERENCES sales(sale_id),
+        FOREIGN KEY (product_id) REFERENCES products(product_id)
+    )"""),
+    ("payments", """
+    CREATE TABLE IF NOT EXISTS payments (
+        payment_id INT AUTO_INCREMENT PRIMARY KEY,
+        sale_id INT NOT NULL,
+        payment_method VARCHAR(30) NOT NULL,
+        amount_paid DECIMAL(10,2) NOT NULL,
+        payment_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        status VARCHAR(20) NOT NULL DEFAULT 'completed',
+        FOREIGN KEY (sale_id) REFERENCES sales(sale_id)
+    )"""),
+    ("returns", """
+    CREATE TABLE IF NOT EXISTS returns (
+        return_id INT AUTO_INCREMENT PRIMARY KEY,
+        original_sale_id INT NOT NULL,
+        customer_id INT,
+        return_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        return_amount DECIMAL(10,2) NOT NULL,
+        reason TEXT,
+        notes TEXT,
+        FOREIGN KEY (original_sale_id) REFERENCES sales(sale_id),
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+    )"""),
+    ("customer_payments", """
+    CREATE TABLE IF NOT EXISTS customer_payments (
+        cust_payment_id INT AUTO_INCREMENT PRIMARY KEY,
+        customer_id INT NOT NULL,
+        shift_id INT,
+        payment_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        amount DECIMAL(10,2) NOT NULL,
+        payment_method VARCHAR(30) NOT NULL,
+        notes TEXT,
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+        FOREIGN KEY (shift_id) REFERENCES shifts(shift_id)
+    )"""),
+    ("purchases", """
+    CREATE TABLE IF NOT EXISTS purchases (
+        purchase_id INT AUTO_INCREMENT PRIMARY KEY,
+        supplier_id INT,
+        purchase_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        invoice_number VARCHAR(50),
+        notes TEXT,
+        FOREIGN KEY (supplier_id) REFERENCES suppliers(supplier_id)
+    )"""),
+    ("purchase_items", """
+    CREATE TABLE IF NOT EXISTS purchase_items (
+        purchase_item_id INT AUTO_INCREMENT PRIMARY KEY,
+        purchase_id INT NOT NULL,
+        product_id INT NOT NULL,
+        quantity INT NOT NULL,
+        cost_price DECIMAL(10,2),
+        expiry_date DATE,
+        FOREIGN KEY (purchase_id) REFERENCES purchases(purchase_id),
+        FOREIGN KEY (product_id) REFERENCES products(product_id)
+    )"""),
+    ("activity_logs", """
+    CREATE TABLE IF NOT EXISTS activity_logs (
+        log_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT,
+        action_type VARCHAR(50) NOT NULL,
+        details TEXT,
+        timestamp DATETIME NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )"""),
+)
+
+# === İndeksler ===
+# (indeks adı, tablo, sütunlar, kullanan sorgu)
+# Aynı sütunlarla başlayan herhangi bir indeks (UNIQUE ve yabancı anahtar indeksleri dahil)
+# varsa indeks mevcut sayılır ve yenisi oluşturulmaz.
+REQUIRED_INDEXES = (
+    ("idx_products_barcode", "products", ("barcode",), "get_product_by_barcode, get_products_by_barcodes"),
+    ("idx_products_last_updated", "products", ("last_updated",), "urun_katalogu artımlı yenileme"),
+    ("idx_products_name_id", "products", ("name", "product_id"), "get_products_page (sayfalı ürün listesi)"),
+    ("idx_customers_name_id", "customers", ("name", "customer_id"), "get_customers_page (sayfalı müşteri listesi)"),
+    ("idx_sales_status_date", "sales", ("status", "sale_date"), "Günlük satış ve kâr/zarar raporları"),
+    ("idx_sales_shift", "sales", ("shift_id",), "get_shift_sales_summary"),
+    ("idx_sale_items_sale", "sale_items", ("sale_id",), "Satış detayı ve iade"),
+    ("idx_sale_items_product", "sale_items", ("product_id",), "En çok satanlar, sipariş önerisi"),
+    ("idx_payments_sale", "payments", ("sale_id",), "Satış ödemeleri ve vardiya özeti"),
+    ("idx_purchase_items_product", "purchase_items", ("product_id",), "Son alış fiyatı, SKT raporu"),
+    ("idx_promotions_product_active", "promotions", ("product_id", "is_active"), "get_active_promotions_for_product(s)"),
+    ("idx_customer_payments_shift", "customer_payments", ("shift_id",), "get_shift_customer_payments_summary"),
+    ("idx_customer_payments_customer", "customer_payments", ("customer_id",), "Müşteri hesap ekstresi"),
+    ("idx_shifts_user_active", "shifts", ("user_id", "is_active"), "get_active_shift"),
+    ("idx_customer_coupons_customer_status", "customer_coupons", ("customer_id", "status"), "Müşteri kuponları"),
+    ("idx_activity_logs_type_time", "activity_logs", ("action_type", "timestamp"), "Log sorgulama"),
+)
+
+# İsim araması için FULLTEXT indeksler (sadece MySQL, ngram ayrıştırıcısı; config.ini name_search = fulltext)
+# (indeks adı, tablo, sütun)
+FULLTEXT_INDEXES = (
+    ("ft_products_name", "products", "name"),
+    ("ft_customers_name", "customers", "name"),
+    ("ft_suppliers_name", "suppliers", "name"),
+)
+
+# Eski kurulumlarda eksik olabilen sütunlar: (tablo, sütun, MySQL sütun tanımı)
+REQUIRED_COLUMNS = (
+    ("payments", "status", "VARCHAR(20) NOT NULL DEFAULT 'completed'"),
+    # Satırın tahsil edilen tutarı (fiyatı barkoda gömülü terazi ürünlerinde miktar x fiyat'a eşit olmayabilir)
+    ("sale_items", "line_total", "DECIMAL(10,2) NULL"),
+)
+
+
+# Terazi barkodlarıyla ondalıklı miktar (kg vb.) satılabilmesi için DECIMAL'e çevrilen sütunlar:
+# (tablo, sütun, MySQL sütun tanımı)
+DECIMAL_QUANTITY_COLUMNS = (
+    ("products", "stock", "DECIMAL(12,3) NOT NULL DEFAULT 0"),
+    ("sale_items", "quantity", "DECIMAL(10,3) NOT NULL"),
+)
+
+
+# === Yardımcı Fonksiyonlar ===
+
+def _is_sqlite(connection):
+    return getattr(connection, 'backend', 'mysql') == 'sqlite'
+
+
+def _check_connection(connection):
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Şema işlemleri için aktif veritabanı bağlantısı gerekli.")
+
+
+def _table_exists(cursor, connection, table):
+    if _is_sqlite(connection):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+    else:
+        cursor.execute("""SELECT TABLE_NAME FROM information_schema.TABLES
+                          WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s""", (table,))
+    return bool(cursor.fetchall())
+
+
+def _column_exists(cursor, connection, table, column):
+    if _is_sqlite(connection):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cursor.fetchall())
+    cursor.execute("""SELECT COLUMN_NAME FROM information_schema.COLUMNS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s""",
+                   (table, column))
+    return bool(cursor.fetchall())
+
+
+def _existing_indexes(cursor, connection, table):
+    """Tablodaki indeksleri {indeks adı: (sütun1, sütun2, ...)} olarak döndürür."""
+    indexes = {}
+    if _is_sqlite(connection):
+        cursor.execute(f"PRAGMA index_list({table})")
+        names = [row[1] for row in cursor.fetchall()]
+        for name in names:
+            cursor.execute(f"PRAGMA index_info({name})")
+            indexes[name] = tuple(row[2] for row in sorted(cursor.fetchall()))
+        return indexes
+    cursor.execute("""SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                      ORDER BY INDEX_NAME, SEQ_IN_INDEX""", (table,))
+    for name, column in cursor.fetchall():
+        indexes[name] = indexes.get(name, ()) + (column,)
+    return indexes
+
+
+def _ensure_migrations_table(cursor, connection):
+    if _is_sqlite(connection):
+        cursor.execute(f"""CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                               version INTEGER PRIMARY KEY,
+                               description VARCHAR(200) NOT NULL,
+                               applied_at DATETIME DEFAULT (datetime('now', 'localtime')))""")
+    else:
+        cursor.execute(f"""CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                               version INT PRIMARY KEY,
+                               description VARCHAR(200) NOT NULL,
+                               applied_at DATETIME DEFAULT CURRENT_TIMESTAMP) {_TABLE_OPTIONS}""")
+
+
+# === Sürüm Adımları ===
+# Her adım (cursor, connection) alır. MySQL'de DDL ifadeleri otomatik commit edildiği için
+# adımlar tekrar çalıştırılsa da zarar vermeyecek şekilde (IF NOT EXISTS / varlık kontrolü) yazılmıştır.
+
+def _create_tables(cursor, connection):
+    if _is_sqlite(connection):
+        return  # yerel_veritabani bağlantı açılırken şemayı oluşturur
+    for _, ddl in MYSQL_TABLES:
+        cursor.execute(f"{ddl} {_TABLE_OPTIONS}")
+
+
+def _add_missing_columns(cursor, connection):
+    for table, column, definition in REQUIRED_COLUMNS:
+        if _table_exists(cursor, connection, table) and not _column_exists(cursor, connection, table, column):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            rprint(f"  [green]+ {table}.{column} sütunu eklendi.[/]")
+
+
+def _create_indexes(cursor, connection):
+    for name, table, columns, _ in _find_missing_indexes(cursor, connection):
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+        rprint(f"  [green]+ {name} ({table}: {', '.join(columns)}) oluşturuldu.[/]")
+
+
+def _widen_quantity_columns(cursor, connection):
+    if _is_sqlite(connection):
+        return  # SQLite sütun türünü zorlamaz; ondalıklı değerler mevcut sütunlarda saklanabilir
+    for table, column, definition in DECIMAL_QUANTITY_COLUMNS:
+        cursor.execute("""SELECT DATA_TYPE FROM information_schema.COLUMNS
+                          WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s""",
+                       (table, column))
+        row = cursor.fetchone()
+        if row is None or str(row[0]).lower() == 'decimal':
+            continue
+        cursor.execute(f"ALTER TABLE {table} MODIFY COLUMN {column} {definition}")
+        rprint(f"  [green]~ {table}.{column} -> {definition}[/]")
+
+
+def _create_fulltext_indexes(cursor, connection):
+    if _is_sqlite(connection):
+        return  # SQLite'ta FULLTEXT yok; isim aramaları LIKE ile yapılır
+    for name, table, column in FULLTEXT_INDEXES:
+        if not _table_exists(cursor, connection, table) or name in _existing_indexes(cursor, connection, table):
+            continue
+        cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({column}) WITH PARSER ngram")
+        rprint(f"  [green]+ {name} ({table}: {column}, FULLTEXT ngram) oluşturuldu.[/]")
+
+
+MIGRATIONS = (
+    (1, "Temel tablolar", _create_tables),
+    (2, "Eski kurulumlarda eksik sütunlar (payments.status)", _add_missing_columns),
+    (3, "Sık çalışan sorgular için indeksler", _create_indexes),
+    (4, "Ürün kataloğu artımlı yenileme indeksi (products.last_updated)", _create_indexes),
+    (5, "İsim araması için FULLTEXT (ngram) indeksler (ürün, müşteri, tedarikçi)", _create_fulltext_indexes),
+    (6, "Sayfalı listeler için ad + ID indeksleri (ürün, müşteri)", _create_indexes),
+    (7, "Ürün ek barkodları tablosu (product_barcodes)", _create_tables),
+    (8, "Ondalıklı miktarlar (products.stock, sale_items.quantity DECIMAL)", _widen_quantity_columns),
+    (9, "Satış kalemlerinde tahsil edilen satır tutarı (sale_items.line_total)", _add_missing_columns),
+)
+
+
+# === Dışa Açık Fonksiyonlar ===
+
+def _find_missing_indexes(cursor, connection):
+    missing = []
+    cache = {}
+    for name, table, columns, used_by in REQUIRED_INDEXES:
+        if not _table_exists(cursor, connection, table):
+            continue
+        if table not in cache:
+            cache[table] = _existing_indexes(cursor, connection, table)
+        if not any(existing[:len(columns)] == columns for existing in cache[table].values()):
+            missing.append((name, table, columns, used_by))
+    return missing
+
+
+def find_missing_indexes(connection):
+    """
+    Mevcut veritabanında REQUIRED_INDEXES listesindeki indekslerden eksik olanları bulur.
+    Returns:
+        list: [(indeks adı, tablo, sütunlar, kullanan sorgu), ...]
+    """
+    _check_connection(connection)
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        return _find_missing_indexes(cursor, connection)
+    except Error as e:
+        raise DatabaseError(f"İndeks kontrolü hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def create_missing_indexes(connection):
+    """
+    Eksik indeksleri oluşturur (sürüm 3 uygulandıktan sonra silinmiş olanlar dahil).
+    Returns:
+        int: Oluşturulan indeks sayısı.
+    """
+    _check_connection(connection)
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        missing = _find_missing_indexes(cursor, connection)
+        _create_indexes(cursor, connection)
+        connection.commit()
+        return len(missing)
+    except Error as e:
+        raise DatabaseError(f"İndeks oluşturma hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def get_applied_versions(connection):
+    """Uygulanmış şema sürümlerini küme olarak döndürür (tablo yoksa boş küme)."""
+    _check_connection(connection)
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        if not _table_exists(cursor, connection, MIGRATIONS_TABLE):
+            return set()
+        cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+        return {row[0] for row in cursor.fetchall()}
+    except Error as e:
+        raise DatabaseError(f"Şema sürümü okunamadı: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def get_pending_versions(connection):
+    """Henüz uygulanmamış şema adımlarını [(sürüm, açıklama), ...] listesi olarak döndürür."""
+    applied = get_applied_versions(connection)
+    return [(version, description) for version, description, _ in MIGRATIONS
+            if version not in applied]
+
+
+def ensure_current(connection):
+    """
+    Program açılışında şema sürümünü kontrol eder.
+    SQLite (kasanın yerel dosyası) bekleyen adımları hemen uygular. MySQL'de şema değişikliği
+    diğer kasaları da etkilediği için otomatik yapılmaz; bekleyen adımlar döndürülür.
+    Returns:
+        list: Bekleyen [(sürüm, açıklama), ...]; boşsa şema güncel.
+    """
+    if _is_sqlite(connection):
+        migrate(connection)
+    return get_pending_versions(connection)
+
+
+def migrate(connection):
+    """
+    Bekleyen şema adımlarını sırayla uygular. Her adımdan sonra sürüm kaydedilir;
+    bir adım hata verirse sonraki adımlar çalıştırılmaz.
+    Returns:
+        list: Bu çağrıda uygulanan sürüm numaraları.
+    """
+    _check_connection(connection)
+    applied_now = []
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        _ensure_migrations_table(cursor, connection)
+        connection.commit()
+        cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+        applied = {row[0] for row in cursor.fetchall()}
+        for version, description, step in MIGRATIONS:
+            if version in applied:
+                continue
+            rprint(f"[cyan]Sürüm {version}: {description}[/]")
+            step(cursor, connection)
+            cursor.execute(f"INSERT INTO {MIGRATIONS_TABLE} (version, description) VALUES (%s, %s)",
+                           (version, description))
+            connection.commit()
+            applied_now.append(version)
+        return applied_now
+    except Error as e:
+        try:
+            connection.rollback()
+        except Error:
+            pass
+        raise DatabaseError(f"Şema güncelleme hatası (uygulanan: {applied_now}): {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def print_status(connection):
+    """Şema sürüm durumunu ve eksik indeksleri yazdırır."""
+    applied = get_applied_versions(connection)
+    for version, description, _ in MIGRATIONS:
+        mark = "[green]✓[/]" if version in applied else "[yellow]bekliyor[/]"
+        rprint(f"  Sürüm {version}: {description} ... {mark}")
+    missing = find_missing_indexes(connection)
+    if not missing:
+        rprint("[green]Gerekli tüm indeksler mevcut.[/]")
+        return
+    rprint(f"[bold yellow]Eksik indeksler ({len(missing)}):[/]")
+    for name, table, columns, used_by in missing:
+        rprint(f"  - {table}({', '.join(columns)})  [dim]{name} - {used_by}[/dim]")
+
+
+if __name__ == '__main__':
+    only_check = len(sys.argv) > 1 and sys.argv[1].lower() in ('kontrol', '--kontrol', 'check')
+    try:
+        with db_config.db_session() as conn:
+            if only_check:
+                print_status(conn)
+            else:
+                versions = migrate(conn)
+                if versions:
+                    rprint(f"[bold green]Şema güncellendi. Uygulanan sürümler: {versions}[/]")
+                else:
+                    rprint("[green]Şema güncel, uygulanacak adım yok.[/]")
+                # Sürüm 3 daha önce uygulanmış olsa bile sonradan silinen indeksleri tamamla
+                created = create_missing_indexes(conn)
+                if created:
+                    rprint(f"[green]{created} eksik indeks oluşturuldu.[/]")
+    except (DatabaseError, Error) as e:
+        rprint(f"[bold red]HATA:[/bold red] {e}")
+        sys.exit(1)
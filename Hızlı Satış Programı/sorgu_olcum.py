@@ -0,0 +1,247 @@
+# sorgu_olcum.py
+# Veritabanı sorgularının süre ölçümü.
+# db_config ve yerel_veritabani bağlantılarının cursor() metodu imleçleri InstrumentedCursor ile sarar;
+# böylece projedeki tüm sorgular (hazır ifadeler dahil) merkezi olarak ölçülür.
+# Her mantıksal sorgu, sorguyu çalıştıran fonksiyonun adıyla (modül.fonksiyon) anahtarlanır;
+# hazir_sorgular üzerinden çalışan sorgularda sorgu adı da eklenir (örn. 'veritabani_islemleri.finalize_sale [satis.ekle]').
+# Süreye execute ile birlikte sonuç satırlarının okunması (fetch) da dahildir.
+
+import csv
+import datetime
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Yüzdelik hesapları için her sorgu adına saklanan son ölçüm sayısı
+MAX_SAMPLES = 1000
+
+# Anahtar belirlenirken atlanan modüller (imleci açan/çalıştıran altyapı modülleri)
+_INFRA_MODULES = {__name__, 'hazir_sorgular', 'db_config', 'yerel_veritabani'}
+
+_lock = threading.Lock()
+_listeners = []  # Her tamamlanan sorgu için çağrılır: listener(anahtar, sql, parametreler, süre)
+_metrics = {}  # {anahtar: {'count': int, 'total': float, 'max': float, 'samples': deque}}
+
+
+def _caller_key(suffix=None):
+    """Sorguyu çalıştıran ilk uygulama fonksiyonunu 'modül.fonksiyon' olarak döndürür."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get('__name__') in _INFRA_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        key = '?'
+    else:
+        key = f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+    return f"{key} [{suffix}]" if suffix else key
+
+
+def record(key, elapsed):
+    """Bir ölçümü (saniye) kaydeder."""
+    with _lock:
+        entry = _metrics.get(key)
+        if entry is None:
+            entry = {'count': 0, 'total': 0.0, 'max': 0.0, 'samples': deque(maxlen=MAX_SAMPLES)}
+            _metrics[key] = entry
+        entry['count'] += 1
+        entry['total'] += elapsed
+        if elapsed > entry['max']:
+            entry['max'] = elapsed
+        entry['samples'].append(elapsed)
+
+
+def add_listener(listener):
+    """
+    Tamamlanan her sorgudan sonra çağrılacak fonksiyonu kaydeder (örn. yavaş sorgu kaydı).
+    listener(key, sql, params, elapsed) hata fırlatmamalıdır; fırlatırsa yok sayılır.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _notify(key, sql, params, elapsed):
+    for listener in _listeners:
+        try:
+            listener(key, sql, params, elapsed)
+        except Exception:
+            pass  # Ölçüm/kayıt hatası sorguyu etkilememeli
+
+
+def _percentile(sorted_samples, percent):
+    """Sıralı listede en yakın sıra (nearest-rank) yöntemiyle yüzdelik değeri döndürür."""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, math.ceil(percent / 100.0 * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+def get_stats():
+    """
+    Sorgu süre istatistiklerini toplam süreye göre azalan sırada döndürür.
+    Returns:
+        list: [{'query', 'count', 'total_ms', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}, ...]
+              Yüzdelikler son MAX_SAMPLES ölçüm üzerinden hesaplanır.
+    """
+    with _lock:
+        snapshot = [(key, entry['count'], entry['total'], entry['max'], sorted(entry['samples']))
+                    for key, entry in _metrics.items()]
+    stats = []
+    for key, count, total, maximum, samples in snapshot:
+        stats.append({
+            'query': key,
+            'count': count,
+            'total_ms': total * 1000,
+            'avg_ms': total * 1000 / count if count else 0.0,
+            'p50_ms': _percentile(samples, 50) * 1000,
+            'p95_ms': _percentile(samples, 95) * 1000,
+            'p99_ms': _percentile(samples, 99) * 1000,
+            'max_ms': maximum * 1000,
+        })
+    stats.sort(key=lambda s: s['total_ms'], reverse=True)
+    return stats
+
+
+def reset_stats():
+    """Tüm ölçümleri sıfırlar."""
+    with _lock:
+        _metrics.clear()
+
+
+def dump_stats(filename=None, shift_id=None):
+    """
+    Sorgu istatistiklerini CSV dosyasına yazar (veri_aktarim ile aynı biçim: ';' ayraçlı, utf-8-sig).
+    Göreli dosya adları çalışma dizinine değil program dizinine göre çözülür (yavas_sorgu kaydı gibi).
+    Returns:
+        str: Yazılan dosyanın adı; ölçüm yoksa None.
+    """
+    stats = get_stats()
+    if not stats:
+        return None
+    if filename is None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        prefix = f"sorgu_olcumleri_vardiya_{shift_id}" if shift_id else "sorgu_olcumleri"
+        filename = f"{prefix}_{stamp}.csv"
+    if not os.path.isabs(filename):
+        filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    with open(filename, mode='w', newline='', encoding='utf-8-sig') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerow(['Sorgu', 'Adet', 'Toplam (ms)', 'Ortalama (ms)',
+                         'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'En Yüksek (ms)'])
+        for s in stats:
+            writer.writerow([s['query'], s['count']] + [
+                f"{s[k]:.3f}".replace('.', ',')
+                for k in ('total_ms', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')])
+    return os.path.abspath(filename)
+
+
+# === Ölçen İmleç ===
+
+class InstrumentedCursor:
+    """
+    Bir veritabanı imlecini sarar ve her sorgunun süresini ölçer.
+    Süre execute ile başlar; sonuç satırları okundukça (fetch) eklenir ve sonuç tamamen okunduğunda,
+    imleç kapatıldığında ya da aynı imleçle yeni bir sorgu çalıştırıldığında kaydedilir.
+    Sonuç döndürmeyen sorgular (INSERT/UPDATE...) execute biter bitmez kaydedilir.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.label = None  # Mantıksal sorgu adı (set_label ile verilir)
+        self._pending_key = None
+        self._pending_elapsed = 0.0
+        self._pending_sql = None
+        self._pending_params = None
+
+    def _finish(self):
+        if self._pending_key is not None:
+            record(self._pending_key, self._pending_elapsed)
+            if _listeners:
+                _notify(self._pending_key, self._pending_sql, self._pending_params, self._pending_elapsed)
+            self._pending_key = None
+            self._pending_sql = self._pending_params = None
+
+    def _run(self, method, sql, params):
+        self._finish()
+        key = _caller_key(self.label)
+        start = time.perf_counter()
+        try:
+            return method(sql, params)
+        finally:
+            self._pending_key = key
+            self._pending_elapsed = time.perf_counter() - start
+            self._pending_sql = sql
+            self._pending_params = params
+            if not getattr(self._cursor, 'with_rows', False):
+                self._finish()
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self._run(self._cursor.executemany, sql, seq_params)
+
+    def _timed_fetch(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._pending_elapsed += time.perf_counter() - start
+
+    def fetchone(self):
+        row = self._timed_fetch(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._timed_fetch(self._cursor.fetchmany, size)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __getattr__(self, name):
+        # Tanımlanmayan her şey (rowcount, lastrowid, column_names...) asıl imlece iletilir
+        return getattr(self._cursor, name)
+
+
+def instrument(cursor):
+    """İmleci ölçen imleçle sarar (zaten sarılmışsa olduğu gibi döndürür)."""
+    if isinstance(cursor, InstrumentedCursor):
+        return cursor
+    return InstrumentedCursor(cursor)
+
+
+def set_label(cursor, label):
+    """Ölçen imleçte bundan sonraki sorguların mantıksal adını belirler (ölçülmeyen imleçte bir şey yapmaz)."""
+    if isinstance(cursor, InstrumentedCursor):
+        cursor.label = label
+
+
+def timed_commit(commit):
+    """commit() çağrısını ölçer; süre çağıran fonksiyonun adına '[COMMIT]' ekiyle kaydedilir."""
+    key = _caller_key('COMMIT')
+    start = time.perf_counter()
+    try:
+        return commit()
+    finally:
+        elapsed = time.perf_counter() - start
+        record(key, elapsed)
+        if _listeners:
+            _notify(key, 'COMMIT', None, elapsed)
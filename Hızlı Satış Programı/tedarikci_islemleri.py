@@ -4,9 +4,13 @@
 # v2: find_supplier fonksiyonu select_supplier olarak güncellendi,
 #     bulunamadığında yeni ekleme seçeneği eklendi.
 # v3: select_supplier fonksiyonunda tek sonuç bulunduğunda tuple index hatası düzeltildi.
+# v4: Tedarikçi listesi sayfa sayfa gösteriliyor; durum (aktif/pasif/tümü) ile filtrelenebiliyor.
+# v5: Tedarikçi seçiminde ad/telefon araması bellekteki indeksten (referans_onbellek) yapılıyor
+#     (olmayan get_suppliers_by_phone_like çağrısı kaldırıldı); tedarikçi değişince indeks yenileniyor.
 
 import arayuz_yardimcilari as ui
 import tedarikci_veritabani as supplier_db_ops
+import referans_onbellek
 from hatalar import DatabaseError, DuplicateEntryError
 from rich.console import Console
 from rich.table import Table
@@ -30,6 +34,7 @@ def handle_add_supplier(connection):
         address = input("Adres: ").strip() or None
         new_supplier_id = supplier_db_ops.add_supplier(
             connection, name, contact_person, phone, email, address)
+        referans_onbellek.invalidate(referans_onbellek.suppliers)
         # Başarı mesajı add_supplier içinde veriliyor.
         return new_supplier_id  # Eklenen ID'yi döndür
     except (DuplicateEntryError, ValueError) as e:
@@ -48,14 +53,16 @@ def handle_list_suppliers(connection):
     """Tedarikçileri listeleme işlemini yönetir."""
     console.print("\n--- Tedarikçi Listesi ---", style="bold blue")
     try:
-        show_inactive = ui.get_yes_no_input(
-            "Pasif tedarikçiler de gösterilsin mi?")
-        suppliers = supplier_db_ops.list_all_suppliers(
-            connection, include_inactive=show_inactive)
-        status_text = "Tüm" if show_inactive else "Aktif"
+        active = ui.get_active_filter_input("Listelenecek tedarikçiler:")
+
+        def fetch_page(after=None, before=None):
+            return supplier_db_ops.get_suppliers_page(
+                connection, after=after, before=before, active=active)
+
+        status_text = {True: "Aktif", False: "Pasif", None: "Tüm"}[active]
         # display_supplier_list arayuz_yardimcilari içinde
-        ui.display_supplier_list(
-            suppliers, title=f"{status_text} Tedarikçiler")
+        ui.browse_pages(fetch_page, lambda rows, title: ui.display_supplier_list(rows, title=title),
+                        f"{status_text} Tedarikçiler")
     except DatabaseError as e:
         console.print(
             f">>> VERİTABANI HATASI (Listeleme): {e}", style="bold red")
@@ -112,6 +119,8 @@ def handle_update_supplier(connection):
         success = supplier_db_ops.update_supplier(
             connection, supplier_id, new_name, new_contact, new_phone, new_email, new_address
         )
+        if success:
+            referans_onbellek.invalidate(referans_onbellek.suppliers)
         # Başarı/hata mesajı DB fonksiyonunda veriliyor.
 
     except (DuplicateEntryError, ValueError) as e:
@@ -146,6 +155,8 @@ def handle_toggle_supplier_status(connection):
             else:
                 success = supplier_db_ops.reactivate_supplier(
                     connection, supplier_id)
+            if success:
+                referans_onbellek.invalidate(referans_onbellek.suppliers)
             # Başarı/hata mesajları DB fonksiyonlarında veriliyor.
         else:
             console.print("İşlem iptal edildi.", style="yellow")
@@ -202,10 +213,10 @@ def select_supplier(connection, prompt_message="Tedarikçi Adı/Tel: ", allow_no
             suppliers = []
             is_phone = any(char.isdigit() for char in search_term)
             if is_phone:
-                suppliers = supplier_db_ops.get_suppliers_by_phone_like(
+                suppliers = referans_onbellek.search_suppliers_by_phone(
                     connection, search_term, only_active=only_active)
             if not suppliers:
-                suppliers = supplier_db_ops.get_suppliers_by_name_like(
+                suppliers = referans_onbellek.search_suppliers(
                     connection, search_term, only_active=only_active)
 
             if not suppliers:
@@ -217,11 +228,10 @@ def select_supplier(connection, prompt_message="Tedarikçi Adı/Tel: ", allow_no
                     return None, None, None
 
             elif len(suppliers) == 1:
-                # Arama fonksiyonları tuple listesi döndürüyor, index ile erişelim
-                selected_tuple = suppliers[0]
-                supplier_id = selected_tuple[0]
-                supplier_name = selected_tuple[1]
-                is_active = selected_tuple[2]
+                selected = suppliers[0]
+                supplier_id = selected.get('supplier_id')
+                supplier_name = selected.get('name')
+                is_active = selected.get('is_active')
                 status_text = "[green]Aktif[/]" if is_active else "[red]Pasif[/]"
                 console.print(
                     f">>> Tedarikçi bulundu: {supplier_name} (ID: {supplier_id}) {status_text}", style="green")
@@ -258,11 +268,10 @@ def select_supplier(connection, prompt_message="Tedarikçi Adı/Tel: ", allow_no
                     elif choice_input.isdigit():
                         choice_num = int(choice_input)
                         if 1 <= choice_num <= len(suppliers):
-                            # Seçilen tuple'ı al
-                            selected_tuple = suppliers[choice_num - 1]
-                            supplier_id = selected_tuple[0]
-                            supplier_name = selected_tuple[1]
-                            is_active = selected_tuple[2]
+                            selected = suppliers[choice_num - 1]
+                            supplier_id = selected.get('supplier_id')
+                            supplier_name = selected.get('name')
+                            is_active = selected.get('is_active')
                             status_text = "[green]Aktif[/]" if is_active else "[red]Pasif[/]"
                             console.print(
                                 f">>> Tedarikçi seçildi: {supplier_name} (ID: {supplier_id}) {status_text}", style="green")
@@ -1,9 +1,15 @@
 # tedarikci_veritabani.py
 # Tedarikçilerle ilgili veritabanı işlemlerini içerir.
 # v15: Aktif/Pasif yapma fonksiyonları eklendi. Arama fonksiyonları güncellendi.
+# v16: iter_suppliers ile tedarikçi listesi akışlı (parça parça) okunabiliyor.
+# v17: get_suppliers_by_name_like, name_search = fulltext ise FULLTEXT (ngram) indeksiyle arıyor.
+# v18: get_suppliers_page ile tedarikçi listesi durum filtreli ve sayfa sayfa (keyset) okunabiliyor.
+# v19: get_supplier_by_id, çağıranların beklediği gibi sözlük döndürüyor.
 
 from mysql.connector import Error, errorcode
 from hatalar import DatabaseError, DuplicateEntryError
+from db_config import iter_rows, fulltext_query, fetch_keyset_page
+import ayarlar
 from rich import print as rprint
 
 # === Tedarikçi Ekleme ===
@@ -45,7 +51,7 @@ def get_supplier_by_id(connection, supplier_id):
         raise DatabaseError("Tedarikçi aramak için aktif bağlantı gerekli.")
     cursor = None
     try:
-        cursor = connection.cursor(buffered=True)
+        cursor = connection.cursor(dictionary=True)
         sql = """SELECT supplier_id, name, contact_person, phone, email, address, is_active
                  FROM suppliers WHERE supplier_id = %s"""
         cursor.execute(sql, (supplier_id,))
@@ -100,6 +106,7 @@ def get_suppliers_by_name_like(connection, search_term, only_active=True):
         connection: Aktif veritabanı bağlantısı.
         search_term (str): Aranacak isim parçası.
         only_active (bool): True ise sadece aktif tedarikçileri arar.
+    name_search = fulltext ise FULLTEXT indeksiyle, ilgiye göre sıralı ve sınırlı sonuç döner.
     """
     if not connection or not connection.is_connected():
         raise DatabaseError("Tedarikçi aramak için aktif bağlantı gerekli.")
@@ -109,13 +116,21 @@ def get_suppliers_by_name_like(connection, search_term, only_active=True):
         sql = """
             SELECT supplier_id, name, is_active -- is_active eklendi
             FROM suppliers
-            WHERE LOWER(name) LIKE LOWER(%s)
             """
-        pattern = f"%{search_term}%"
-        params = [pattern]
+        boolean_query = fulltext_query(connection, search_term)
+        if boolean_query:
+            sql += " WHERE MATCH(name) AGAINST(%s IN BOOLEAN MODE)"
+            params = [boolean_query]
+        else:
+            sql += " WHERE LOWER(name) LIKE LOWER(%s)"
+            params = [f"%{search_term}%"]
         if only_active:
             sql += " AND is_active = TRUE"
-        sql += " ORDER BY name ASC"
+        if boolean_query:
+            sql += " ORDER BY MATCH(name) AGAINST(%s IN BOOLEAN MODE) DESC, name ASC LIMIT %s"
+            params += [boolean_query, ayarlar.get_settings().performance.search_result_limit]
+        else:
+            sql += " ORDER BY name ASC"
         cursor.execute(sql, params)
         return cursor.fetchall() # [(id, ad, is_active), ...] listesi
     except Error as e:
@@ -125,26 +140,46 @@ def get_suppliers_by_name_like(connection, search_term, only_active=True):
             cursor.close()
 
 # === Tedarikçi Listeleme ===
-def list_all_suppliers(connection, include_inactive=False):
-    """Veritabanındaki tedarikçileri listeler."""
-    # (Fonksiyon içeriği öncekiyle aynı - değişiklik yok)
+def iter_suppliers(connection, include_inactive=False):
+    """
+    Tedarikçileri (supplier_id, name, contact_person, phone, email, is_active) demetleri olarak
+    tek tek döndüren üreteç (sunucudan parça parça okunur, bkz. db_config.iter_rows).
+    """
     if not connection or not connection.is_connected():
         raise DatabaseError("Tedarikçileri listelemek için aktif bağlantı gerekli.")
-    cursor = None
-    try:
-        cursor = connection.cursor(buffered=True)
-        sql = """SELECT supplier_id, name, contact_person, phone, email, is_active
-                 FROM suppliers"""
-        if not include_inactive:
-            sql += " WHERE is_active = TRUE"
-        sql += " ORDER BY name ASC"
-        cursor.execute(sql)
-        return cursor.fetchall()
-    except Error as e:
-        raise DatabaseError(f"Tedarikçileri listeleme hatası: {e}") from e
-    finally:
-        if cursor:
-            cursor.close()
+    sql = """SELECT supplier_id, name, contact_person, phone, email, is_active
+             FROM suppliers"""
+    if not include_inactive:
+        sql += " WHERE is_active = TRUE"
+    sql += " ORDER BY name ASC"
+    return iter_rows(connection, sql, dictionary=False, error_message="Tedarikçileri listeleme hatası")
+
+
+def get_suppliers_page(connection, after=None, before=None, page_size=None, active=True):
+    """
+    Tedarikçi listesinin bir sayfasını getirir (satırlar iter_suppliers ile aynı demetler);
+    bkz. db_config.fetch_keyset_page.
+    Args:
+        active (bool): True: sadece aktif, False: sadece pasif, None: tüm tedarikçiler.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Tedarikçileri listelemek için aktif bağlantı gerekli.")
+    sql = """SELECT supplier_id, name, contact_person, phone, email, is_active
+             FROM suppliers"""
+    where_clauses = []
+    params = []
+    if active is not None:
+        where_clauses.append("is_active = %s")
+        params.append(bool(active))
+    return fetch_keyset_page(connection, sql, where_clauses, params,
+                             order_columns=("name", "supplier_id"), key_fields=(1, 0),
+                             after=after, before=before, page_size=page_size, dictionary=False,
+                             error_message="Tedarikçileri listeleme hatası")
+
+
+def list_all_suppliers(connection, include_inactive=False):
+    """Veritabanındaki tedarikçileri listeler."""
+    return list(iter_suppliers(connection, include_inactive))
 
 # === Tedarikçi Güncelleme ===
 def update_supplier(connection, supplier_id, name, contact=None, phone=None, email=None, address=None):
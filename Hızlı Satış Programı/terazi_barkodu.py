@@ -0,0 +1,133 @@
+# terazi_barkodu.py
+# Terazi / reyon etiketlerindeki mağaza içi barkodların (EAN-13, 20-29 önekli) çözülmesi.
+# Bu barkodlar ürünün PLU kodunu ve tartılan miktarı veya tutarı içerir; barkodun tamamı
+# veritabanında kayıtlı olmadığı için normal aramada bulunamaz. Kurallar config.ini
+# [scale_barcodes] bölümünden okunur (ayarlar.ScaleBarcodeRule). Barkod bellekte önek/uzunluk
+# eşleşmesiyle parçalanır, PLU ürün kataloğundan (urun_katalogu) aranır; miktar Decimal olarak döner.
+# Çağıran önce barkodun tamamını normal şekilde arar, sadece bulunamazsa buraya gelir (aynı
+# öneklerle başlayan gerçek EAN-13 ürünler terazi barkodu sanılmasın). PLU ile ürün bulunamazsa
+# veya barkoddaki değer 0 ise None döner ve barkod bulunamadı olarak bildirilir.
+
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+import threading
+import ayarlar
+import urun_katalogu
+import urun_veritabani as product_db_ops
+from hatalar import UserInputError
+
+# Fiyatlı barkodlarda tutardan hesaplanan miktarın hassasiyeti (satış kalemlerindeki DECIMAL(10,3) ile aynı)
+QUANTITY_STEP = Decimal('0.001')
+
+# decode() sonucu: eşleşen kural, PLU hanesi ve barkoddaki değer (miktar veya tutar)
+ScaleBarcode = namedtuple('ScaleBarcode', 'rule plu value')
+# resolve() sonucu: ürün sözlüğü, sepete eklenecek miktar, satır tutarı (fiyatlı barkodda barkoddaki tutar,
+# tartılı barkodda None: tutar birim fiyat x miktardan hesaplanır) ve çözülen barkod
+ScaleItem = namedtuple('ScaleItem', 'product quantity line_total decoded')
+
+_lock = threading.Lock()
+_index_source = None
+_index = {}  # {barkod uzunluğu: ((önek, kural), ...)}
+_stats = {'decoded': 0, 'resolved': 0, 'unknown_plu': 0}
+
+
+def _rules_by_length():
+    """Kuralları barkod uzunluğuna göre gruplar; ayarlar değişmedikçe aynı indeks kullanılır."""
+    global _index_source, _index
+    rules = ayarlar.get_settings().scale_barcodes
+    if rules is _index_source:
+        return _index
+    index = {}
+    for rule in rules:
+        index.setdefault(rule.length, []).append((rule.prefix, rule))
+    with _lock:
+        _index = {length: tuple(entries) for length, entries in index.items()}
+        _index_source = rules
+    return _index
+
+
+def decode(barcode):
+    """
+    Barkodu tanımlı kurallarla parçalar (veritabanına gitmez).
+    Returns:
+        ScaleBarcode: Barkod bir kurala uyuyorsa, uymuyorsa None.
+    """
+    if not barcode.isdigit():
+        return None
+    for prefix, rule in _rules_by_length().get(len(barcode), ()):
+        if barcode.startswith(prefix):
+            plu_start = len(prefix)
+            value_start = plu_start + rule.plu_digits
+            value = Decimal(int(barcode[value_start:value_start + rule.value_digits])).scaleb(-rule.decimals)
+            return ScaleBarcode(rule, barcode[plu_start:value_start], value)
+    return None
+
+
+def _find_plu_product(connection, plu):
+    """
+    PLU'yu önce olduğu gibi (00123), sonra baştaki sıfırlar olmadan (123) arar.
+    Katalog yüklüyse sadece bellekten bakılır. Barkod aramasının negatif önbelleği kullanılmaz:
+    kısa PLU kodları orada gerçek barkodlarla karışmasın.
+    """
+    candidates = [plu]
+    stripped = plu.lstrip('0')
+    if stripped and stripped != plu:
+        candidates.append(stripped)
+    catalog = urun_katalogu.get_catalog()
+    use_catalog = urun_katalogu.is_enabled() and catalog.loaded
+    for candidate in candidates:
+        if use_catalog:
+            _, product = catalog.lookup(candidate, only_active=True)
+        else:
+            product = product_db_ops.get_product_by_barcode(connection, candidate, only_active=True)
+        if product:
+            return product
+    return None
+
+
+def resolve(connection, barcode):
+    """
+    Terazi barkodunu ürüne ve miktara çevirir.
+    Returns:
+        ScaleItem: Barkod bir kurala uyuyor, değeri 0'dan büyük ve PLU ile aktif ürün bulunduysa,
+                   aksi halde None.
+    Raises:
+        UserInputError: Fiyatlı barkodda ürünün satış fiyatı yoksa.
+        DatabaseError: Katalog kapalıyken yapılan PLU aramasında hata olursa.
+    """
+    decoded = decode(barcode)
+    if decoded is None or decoded.value <= 0:
+        return None
+    _count('decoded')
+    product = _find_plu_product(connection, decoded.plu)
+    if product is None:
+        _count('unknown_plu')
+        return None
+    if decoded.rule.kind == 'weight':
+        quantity, line_total = decoded.value, None
+    else:
+        unit_price = product.get('selling_price')
+        if not unit_price or unit_price <= 0:
+            raise UserInputError(
+                f"'{product.get('name', '?')}' ürününün satış fiyatı olmadığı için barkoddaki tutardan miktar hesaplanamadı.")
+        line_total = decoded.value.quantize(Decimal('0.01'))
+        quantity = (line_total / unit_price).quantize(QUANTITY_STEP, rounding=ROUND_HALF_UP)
+        if quantity <= 0:
+            quantity = QUANTITY_STEP
+    _count('resolved')
+    return ScaleItem(product, quantity, line_total, decoded)
+
+
+def _count(key):
+    with _lock:
+        _stats[key] += 1
+
+
+def get_stats():
+    """
+    Returns:
+        dict: {'rules', 'decoded', 'resolved', 'unknown_plu'}
+              decoded: Bir kurala uyan barkod sayısı, unknown_plu: PLU'su bulunamayanlar.
+    """
+    with _lock:
+        return dict(_stats, rules=len(ayarlar.get_settings().scale_barcodes))
@@ -0,0 +1,248 @@
+# urun_analiz.py
+# Stok raporu, stok analizi ve sipariş önerisi için ürünlerin sütun (columnar) görüntüsü.
+# Ürünler istendiğinde tek sorguyla (urun_veritabani.get_product_analytics_rows) okunur ve her alan
+# (ID, fiyat, son alış fiyatı, stok, min. stok, kategori, marka, durum) bir NumPy dizisinde tutulur.
+# Kritik stok, eşik altı stok, kategori bazında stok değeri ve fiyat bandı dağılımı satır satır
+# sözlük oluşturmadan dizi işlemleriyle hesaplanır; sözlükler sadece ekranda gösterilecek satırlar için üretilir.
+# NumPy isteğe bağlıdır: yüklü değilse is_available() False döner ve çağıran mevcut SQL raporlarını kullanır.
+
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+import urun_veritabani as product_db_ops
+
+try:
+    import numpy as np
+except ImportError:  # NumPy yoksa raporlar urun_veritabani'ndaki SQL sorgularıyla hazırlanır
+    np = None
+
+# Fiyat bandı alt sınırları (TL); son bant üst sınırsızdır
+PRICE_BANDS = (0, 10, 25, 50, 100, 250, 500, 1000)
+
+# Sipariş önerisi için ürün başına okunan son alış sayısı (son iki alış arası gün sayısı için 2 yeterli)
+ORDER_HISTORY_PURCHASES = 2
+
+_COLUMN = {name: i for i, name in enumerate(product_db_ops.ANALYTICS_COLUMNS)}
+
+
+def is_available():
+    """NumPy yüklüyse True."""
+    return np is not None
+
+
+# Toplamların Decimal'e çevrilirken yuvarlandığı basamak (tutar: kuruş, stok: satış kalemleriyle aynı 3 hane)
+MONEY_STEP = Decimal('0.01')
+QUANTITY_STEP = Decimal('0.001')
+
+
+def _to_decimal(value, step=MONEY_STEP):
+    """Dizi toplamını (float) Decimal'e çevirip verilen basamağa yuvarlar."""
+    return Decimal(repr(float(value))).quantize(step, rounding=ROUND_HALF_UP)
+
+
+class ProductSnapshot:
+    """
+    Ürünlerin sütun görüntüsü. Sayısal alanlar NumPy dizileridir (aynı indeks = aynı ürün):
+    product_id, price, cost (son alış fiyatı, bilinmiyorsa NaN), stock, min_stock (NULL: 0),
+    category_id / brand_id (NULL: -1), is_active. Görüntü oluşturulduktan sonra değiştirilmez.
+    """
+
+    def __init__(self, rows):
+        self._rows = rows  # Ekranda gösterilecek satırların sözlükleri bu demetlerden üretilir
+        self.loaded_at = datetime.datetime.now()
+        columns = list(zip(*rows)) if rows else [()] * len(_COLUMN)
+
+        def column(name, dtype, default):
+            values = columns[_COLUMN[name]]
+            return np.fromiter((default if v is None else v for v in values), dtype=dtype, count=len(values))
+
+        self.product_id = column('product_id', np.int64, 0)
+        self.price = column('selling_price', np.float64, 0.0)
+        self.cost = column('last_cost', np.float64, np.nan)
+        self.stock = column('stock', np.float64, 0.0)
+        self.min_stock = column('min_stock_level', np.float64, 0.0)
+        self.category_id = column('category_id', np.int64, -1)
+        self.brand_id = column('brand_id', np.int64, -1)
+        self.is_active = column('is_active', np.bool_, False)
+        self._category_names = {cid: name for cid, name in zip(self.category_id.tolist(),
+                                                               columns[_COLUMN['category_name']])}
+
+    def __len__(self):
+        return len(self._rows)
+
+    # --- Filtreler (boolean maskeler) ---
+
+    def active_mask(self, include_inactive=False):
+        return np.ones(len(self), dtype=np.bool_) if include_inactive else self.is_active
+
+    def critical_mask(self, include_inactive=False):
+        """Stoğu minimum stok seviyesinde veya altında olan ürünler."""
+        return self.active_mask(include_inactive) & (self.stock <= self.min_stock)
+
+    def threshold_mask(self, threshold, include_inactive=False):
+        return self.active_mask(include_inactive) & (self.stock <= float(threshold))
+
+    # --- Satırlar ---
+
+    def _row_dict(self, index, fields):
+        row = self._rows[index]
+        return {field: row[_COLUMN[field]] for field in fields}
+
+    def stock_report(self, stock_threshold=None, include_inactive=False, only_critical=False):
+        """
+        urun_veritabani.get_stock_report_data ile aynı satırlar (stok, sonra ada göre sıralı).
+        Returns:
+            list: [{'product_id', 'barcode', 'name', 'stock', 'min_stock_level', 'is_active', 'brand_name'}, ...]
+        """
+        if only_critical:
+            mask = self.critical_mask(include_inactive)
+        elif stock_threshold is not None:
+            mask = self.threshold_mask(stock_threshold, include_inactive)
+        else:
+            mask = self.active_mask(include_inactive)
+        indexes = np.flatnonzero(mask)
+        by_name = sorted(indexes.tolist(), key=lambda i: self._rows[i][_COLUMN['name']] or '')
+        ordered = np.asarray(by_name, dtype=np.int64)
+        if len(ordered):
+            ordered = ordered[np.argsort(self.stock[ordered], kind='stable')]
+        fields = ('product_id', 'barcode', 'name', 'stock', 'min_stock_level', 'is_active', 'brand_name')
+        return [self._row_dict(i, fields) for i in ordered.tolist()]
+
+    # --- Özetler ---
+
+    def summary(self):
+        """
+        Aktif ürünler için genel stok özeti.
+        Returns:
+            dict: {'products', 'active', 'critical', 'negative_stock', 'cost_value', 'retail_value', 'unknown_cost'}
+        """
+        active = self.is_active
+        positive_stock = np.where(active, np.clip(self.stock, 0, None), 0.0)
+        known_cost = ~np.isnan(self.cost)
+        return {
+            'products': len(self),
+            'active': int(active.sum()),
+            'critical': int(self.critical_mask().sum()),
+            'negative_stock': int((active & (self.stock < 0)).sum()),
+            'cost_value': _to_decimal((positive_stock * np.where(known_cost, self.cost, 0.0)).sum()),
+            'retail_value': _to_decimal((positive_stock * self.price).sum()),
+            'unknown_cost': int((active & ~known_cost & (self.stock > 0)).sum()),
+        }
+
+    def stock_value_by_category(self):
+        """
+        Aktif ürünlerin kategori bazında stok değeri (negatif stoklar 0 sayılır).
+        Alış değeri son alış fiyatıyla hesaplanır; alış fiyatı bilinmeyen ürünler unknown_cost'ta sayılır.
+        Returns:
+            list: [{'category_id', 'category_name', 'products', 'critical', 'stock', 'cost_value',
+                    'retail_value', 'unknown_cost'}, ...] (satış değerine göre büyükten küçüğe)
+        """
+        active = self.is_active
+        if not active.any():
+            return []
+        categories, group = np.unique(self.category_id[active], return_inverse=True)
+        stock = np.clip(self.stock[active], 0, None)
+        cost = self.cost[active]
+        known_cost = ~np.isnan(cost)
+        size = len(categories)
+        products = np.bincount(group, minlength=size)
+        critical = np.bincount(group, weights=(self.stock[active] <= self.min_stock[active]), minlength=size)
+        total_stock = np.bincount(group, weights=stock, minlength=size)
+        cost_value = np.bincount(group, weights=stock * np.where(known_cost, cost, 0.0), minlength=size)
+        retail_value = np.bincount(group, weights=stock * self.price[active], minlength=size)
+        unknown_cost = np.bincount(group, weights=(~known_cost & (stock > 0)), minlength=size)
+        result = []
+        for i in np.argsort(-retail_value, kind='stable').tolist():
+            category_id = int(categories[i])
+            result.append({
+                'category_id': category_id if category_id >= 0 else None,
+                'category_name': self._category_names.get(category_id) if category_id >= 0 else None,
+                'products': int(products[i]),
+                'critical': int(critical[i]),
+                'stock': _to_decimal(total_stock[i], QUANTITY_STEP),
+                'cost_value': _to_decimal(cost_value[i]),
+                'retail_value': _to_decimal(retail_value[i]),
+                'unknown_cost': int(unknown_cost[i]),
+            })
+        return result
+
+    def price_band_histogram(self, bands=PRICE_BANDS):
+        """
+        Aktif ürünlerin satış fiyatı bantlarına dağılımı.
+        Returns:
+            list: [{'low', 'high' (son bantta None), 'products', 'stock', 'retail_value'}, ...]
+        """
+        edges = np.asarray(bands, dtype=np.float64)
+        active = self.is_active
+        prices = self.price[active]
+        stock = np.clip(self.stock[active], 0, None)
+        # Fiyatı ilk sınırın altında olanlar (ör. negatif) ilk banda sayılır
+        band = np.clip(np.searchsorted(edges, prices, side='right') - 1, 0, len(edges) - 1)
+        products = np.bincount(band, minlength=len(edges))
+        band_stock = np.bincount(band, weights=stock, minlength=len(edges))
+        band_value = np.bincount(band, weights=stock * prices, minlength=len(edges))
+        return [{
+            'low': Decimal(str(bands[i])),
+            'high': Decimal(str(bands[i + 1])) if i + 1 < len(bands) else None,
+            'products': int(products[i]),
+            'stock': _to_decimal(band_stock[i], QUANTITY_STEP),
+            'retail_value': _to_decimal(band_value[i]),
+        } for i in range(len(edges))]
+
+
+def load_snapshot(connection):
+    """
+    Ürünlerin güncel sütun görüntüsünü oluşturur (tek sorgu; okuma kopyası varsa oradan).
+    Raises:
+        RuntimeError: NumPy yüklü değilse (önce is_available() kontrol edilmelidir).
+        DatabaseError: Ürünler okunamazsa.
+    """
+    if np is None:
+        raise RuntimeError("Ürün analizi için NumPy gerekli (pip install numpy).")
+    return ProductSnapshot(product_db_ops.get_product_analytics_rows(connection))
+
+
+def get_order_suggestions(connection, snapshot=None):
+    """
+    urun_veritabani.get_order_suggestion_data ile aynı sonuç: kritik stoklu aktif ürünler görüntüden
+    seçilir, alış geçmişleri ürün başına ayrı sorgu yerine tek sorguda alınır.
+    Returns:
+        list: [{'product_id', 'barcode', 'name', 'current_stock', 'min_stock_level',
+                'last_cost', 'last_supplier', 'days_lasted'}, ...] (ada göre sıralı)
+    Raises:
+        DatabaseError: Ürünler veya alış geçmişi okunamazsa.
+    """
+    if snapshot is None:
+        snapshot = load_snapshot(connection)
+    fields = ('product_id', 'barcode', 'name', 'stock', 'min_stock_level')
+    critical = [snapshot._row_dict(i, fields) for i in np.flatnonzero(snapshot.critical_mask()).tolist()]
+    if not critical:
+        return []
+    history = {}
+    for purchase in product_db_ops.get_purchase_history_for_products(
+            connection, [p['product_id'] for p in critical], ORDER_HISTORY_PURCHASES):
+        history.setdefault(purchase['product_id'], []).append(purchase)
+
+    suggestions = []
+    for product in sorted(critical, key=lambda p: p['name'] or ''):
+        purchases = history.get(product['product_id'], [])
+        last_costed = next((p for p in purchases if p['cost_price'] is not None), None)
+        days_lasted = None
+        if len(purchases) >= 2:
+            date1, date2 = purchases[0]['purchase_date'], purchases[1]['purchase_date']
+            if isinstance(date1, datetime.datetime):
+                date1 = date1.date()
+            if isinstance(date2, datetime.datetime):
+                date2 = date2.date()
+            if isinstance(date1, datetime.date) and isinstance(date2, datetime.date):
+                days_lasted = (date1 - date2).days
+        suggestions.append({
+            'product_id': product['product_id'],
+            'barcode': product['barcode'],
+            'name': product['name'],
+            'current_stock': product['stock'],
+            'min_stock_level': product['min_stock_level'],
+            'last_cost': last_costed['cost_price'] if last_costed else None,
+            'last_supplier': last_costed['supplier_name'] if last_costed else None,
+            'days_lasted': days_lasted,
+        })
+    return suggestions
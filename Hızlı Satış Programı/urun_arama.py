@@ -0,0 +1,409 @@
+# urun_arama.py
+# Ürün adları için bellekte tutulan trigram (3'lü harf grubu) arama indeksi.
+# LIKE '%terim%' sorgusu tüm tabloyu tarar ve LOWER() İ/ı/I/i harflerini Türkçe kurallara göre
+# küçültmez. İndeks Türkçe küçük harfe çevrilmiş adlardan kurulur: ad ve kelime başları sıralı
+# listelerde (ikili arama ile önek eşleşmesi), trigramlar ise ürün kümelerinde (kelime içi eşleşme)
+# tutulur. İndeksi ürün kataloğu (urun_katalogu) besler; katalog güncellendikçe indeks de artımlı güncellenir.
+# Tam arama sonuç vermezse yazım hatalarına toleranslı (bulanık) arama yapılır: Türkçe harfler
+# ASCII karşılıklarına indirilir (çikolata -> cikolata) ve kelimeler, önceden hesaplanmış "bir harfi
+# silinmiş" varyantları üzerinden (SymSpell yöntemi) sınırlı düzenleme mesafesiyle eşleştirilir.
+
+import bisect
+import heapq
+import time
+
+# str.lower() 'I' harfini 'i', 'İ' harfini 'i̇' (noktalı i + birleşik nokta) yapar; Türkçede I -> ı, İ -> i.
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+
+
+def turkish_casefold(text):
+    """Metni Türkçe kurallarla küçük harfe çevirir ve boşlukları teke indirir."""
+    return ' '.join(str(text).translate(_TURKISH_UPPER).lower().split())
+
+
+# Bulanık aramada Türkçe harfler ASCII karşılıklarına indirilir (kasiyer ç/ş/ğ yerine c/s/g yazabilir)
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+FUZZY_MIN_WORD = 3  # Bundan kısa kelimeler bulanık eşleştirilmez (sadece önek olarak)
+FUZZY_MAX_PREFIX_WORDS = 50  # Önek olarak eşleşen en fazla kelime (tek harflik aramalar taşmasın)
+FUZZY_CANDIDATES_PER_RESULT = 20  # Bulanık aramada sıralanacak en fazla aday: istenen sonuç sayısının bu katı
+FUZZY_DEADLINE_CHECK = 256  # Uzun döngülerde süre sınırı bu kadar üründe bir kontrol edilir
+
+
+def ascii_fold(text):
+    """Türkçe küçük harfli metindeki ç, ğ, ı, ö, ş, ü harflerini c, g, i, o, s, u yapar."""
+    return text.translate(_ASCII_FOLD)
+
+
+def _deletes(word):
+    """Kelimenin bir harfi silinmiş tüm varyantları."""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _is_fuzzy_word(word):
+    # Gramaj, adet gibi sayı içeren kelimeler yazım hatası olarak eşleştirilmez
+    return len(word) >= FUZZY_MIN_WORD and not any(char.isdigit() for char in word)
+
+
+def edit_distance(a, b, max_distance):
+    """
+    İki kelime arasındaki düzenleme mesafesi (ekleme, silme, değiştirme ve yan yana iki harfin
+    yer değiştirmesi birer işlem). max_distance aşılınca hesaplama kesilir ve max_distance + 1 döner.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _word_starts(text):
+    """Adın ilk kelimeden sonraki her kelimesinden başlayan son ekleri (ör. 'a b c' -> 'b c', 'c')."""
+    return [text[i + 1:] for i, char in enumerate(text) if char == ' ']
+
+
+class FuzzyWordIndex:
+    """
+    Ad kelimelerinin (ASCII'ye indirilmiş) bulanık arama indeksi:
+      - kelime -> product_id kümesi,
+      - kelimenin bir harfi silinmiş varyantı -> kelimeler (yazım hatası adayları),
+      - sıralı kelime listesi (yazılmakta olan kelimenin önek eşleşmesi).
+    Ürünü kalmayan kelimeler varyant eşlemesinde kalabilir; aramada atlanırlar.
+    """
+
+    def __init__(self):
+        self._word_ids = {}  # {kelime: {product_id, ...}}
+        self._variants = {}  # {bir harfi silinmiş kelime: (kelime, ...)}
+        self._vocabulary = []  # Sıralı kelimeler
+        self._sorted = True
+
+    def add(self, product_id, folded_name):
+        for word in set(ascii_fold(folded_name).split()):
+            ids = self._word_ids.get(word)
+            if ids is None:
+                ids = self._word_ids[word] = set()
+                self._index_word(word)
+            ids.add(product_id)
+
+    def remove(self, product_id, folded_name):
+        for word in set(ascii_fold(folded_name).split()):
+            ids = self._word_ids.get(word)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._word_ids[word]
+                    if self._sorted:
+                        i = bisect.bisect_left(self._vocabulary, word)
+                        if i < len(self._vocabulary) and self._vocabulary[i] == word:
+                            del self._vocabulary[i]
+
+    def _index_word(self, word):
+        if self._sorted:
+            bisect.insort(self._vocabulary, word)
+        else:
+            self._vocabulary.append(word)
+        if not _is_fuzzy_word(word):
+            return
+        for variant in _deletes(word):
+            words = self._variants.get(variant, ())
+            if word not in words:
+                self._variants[variant] = words + (word,)
+
+    def compact(self):
+        """Toplu yüklemeden sonra kelime listesini sıralar."""
+        self._vocabulary = sorted(self._word_ids)
+        self._sorted = True
+
+    def begin_bulk(self):
+        self._sorted = False
+
+    def match_word(self, query_word, deadline):
+        """
+        Sorgu kelimesine benzeyen kelimeleri {kelime: mesafe} olarak döndürür.
+        Önek eşleşmesi (yazılmakta olan kelime) 0, yazım hatası eşleşmesi düzenleme mesafesi kadar sayılır.
+        """
+        matches = {}
+        i = bisect.bisect_left(self._vocabulary, query_word)
+        while (i < len(self._vocabulary) and len(matches) < FUZZY_MAX_PREFIX_WORDS
+               and self._vocabulary[i].startswith(query_word)):
+            matches[self._vocabulary[i]] = 0
+            i += 1
+        if not _is_fuzzy_word(query_word):
+            return matches
+        max_distance = 1 if len(query_word) <= 5 else 2
+        candidates = set(self._variants.get(query_word, ()))  # Sorguda bir harf eksik
+        for variant in _deletes(query_word):
+            if variant in self._word_ids:
+                candidates.add(variant)  # Sorguda bir harf fazla
+            candidates.update(self._variants.get(variant, ()))  # Harf değişmiş / yer değiştirmiş
+        for word in candidates:
+            if word in matches or word not in self._word_ids:
+                continue
+            if time.perf_counter() > deadline:
+                break
+            distance = edit_distance(query_word, word, max_distance)
+            if distance <= max_distance:
+                matches[word] = distance
+        return matches
+
+    def search(self, term, deadline, max_results=None):
+        """
+        Sorgudaki her kelimeye benzeyen bir kelimesi olan ürünleri bulur.
+        Adaylar en az ürünü olan sorgu kelimesinin ürünlerinden (mesafesi küçük kelimeler önce) tek tek
+        alınır ve diğer kelimelerin kümelerinde aranır; böylece 100 bin ürünlük kümeler hiç
+        birleştirilmez. Süre sınırı (deadline) bu döngüde de kontrol edilir; aşılınca veya max_results
+        kadar ürün bulununca o ana kadar tüm kelimelerle eşleşmiş ürünler döner.
+        Returns:
+            dict: {product_id: kelime mesafelerinin toplamı}
+        """
+        query = []  # Her sorgu kelimesi için mesafeye göre sıralı [(mesafe, ürün kümesi), ...]
+        for query_word in ascii_fold(turkish_casefold(term)).split():
+            matches = self.match_word(query_word, deadline)
+            postings = sorted(((distance, self._word_ids[word]) for word, distance in matches.items()
+                               if word in self._word_ids), key=lambda posting: posting[0])
+            if not postings:
+                return {}
+            query.append(postings)
+            if time.perf_counter() > deadline:
+                break
+        if not query:
+            return {}
+        query.sort(key=lambda postings: sum(len(ids) for _, ids in postings))
+        rarest, others = query[0], query[1:]
+
+        scores = {}
+        seen = set()
+        checked = 0
+        for first_distance, first_ids in rarest:
+            for product_id in first_ids:
+                checked += 1
+                if checked % FUZZY_DEADLINE_CHECK == 0 and time.perf_counter() > deadline:
+                    return scores
+                if product_id in seen:
+                    continue  # Daha küçük mesafeli bir kelimeden zaten alındı
+                seen.add(product_id)
+                score = first_distance
+                for postings in others:
+                    distance = next((d for d, ids in postings if product_id in ids), None)
+                    if distance is None:
+                        break
+                    score += distance
+                else:
+                    scores[product_id] = score
+                    if max_results and len(scores) >= max_results:
+                        return scores
+        return scores
+
+
+class NameIndex:
+    """
+    Küçük harfli ad üzerinden üç aşamalı arama:
+      1. Adı aranan metinle başlayanlar (sıralı ad listesinde ikili arama),
+      2. Bir kelimesi aranan metinle başlayanlar (sıralı kelime-başı listesinde ikili arama),
+      3. Kelimeleri adın herhangi bir yerinde geçenler (trigram kesişimi).
+    Sonuç sınırı ilk aşamalarda dolarsa sonraki aşamalar çalışmaz; sık geçen kelimelerde bile
+    sadece sınır kadar kayda bakılır. Kilit tutmaz; eşzamanlı kullanımda çağıran (ProductCatalog) kilitlemelidir.
+    """
+
+    def __init__(self):
+        self._names = {}  # {product_id: küçük harfli ad}
+        self._grams = {}  # {trigram: {product_id, ...}}
+        self._prefixes = []  # Sıralı [(küçük harfli ad, product_id)]
+        self._word_starts = []  # Sıralı [(kelime başından itibaren ad, product_id)]
+        self._sorted = True  # False: toplu yüklemede listeler sıralanmadan dolduruluyor (bkz. compact)
+        self._fuzzy = FuzzyWordIndex()  # Yazım hatasına toleranslı arama (fuzzy_search)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, product_id, name):
+        """Ürünü indekse ekler; ad değiştiyse eski kayıtlar silinir."""
+        folded = turkish_casefold(name or '')
+        old = self._names.get(product_id)
+        if old == folded:
+            return
+        if old is not None:
+            self._unindex(product_id, old)
+        self._names[product_id] = folded
+        for gram in _trigrams(folded):
+            self._grams.setdefault(gram, set()).add(product_id)
+        self._insert(self._prefixes, (folded, product_id))
+        for suffix in _word_starts(folded):
+            self._insert(self._word_starts, (suffix, product_id))
+        self._fuzzy.add(product_id, folded)
+
+    def remove(self, product_id):
+        old = self._names.pop(product_id, None)
+        if old is not None:
+            self._unindex(product_id, old)
+
+    def compact(self):
+        """Toplu yüklemeden sonra listeleri sıralar ve geçersiz (adı değişmiş) kayıtları atar."""
+        self._prefixes = sorted(entry for entry in self._prefixes if self._is_current(entry))
+        self._word_starts = sorted(entry for entry in self._word_starts if self._is_current(entry))
+        self._fuzzy.compact()
+        self._sorted = True
+
+    def begin_bulk(self):
+        """Toplu yükleme başlatır: add() kayıtları sıralamadan ekler, compact() ile bitirilir."""
+        self._sorted = False
+        self._fuzzy.begin_bulk()
+
+    def _insert(self, entries, entry):
+        if self._sorted:
+            bisect.insort(entries, entry)
+        else:
+            entries.append(entry)
+
+    def _delete(self, entries, entry):
+        if not self._sorted:
+            return  # compact() ve _is_current() eski kaydı zaten eler
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def _unindex(self, product_id, folded):
+        for gram in _trigrams(folded):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._grams[gram]
+        self._delete(self._prefixes, (folded, product_id))
+        for suffix in _word_starts(folded):
+            self._delete(self._word_starts, (suffix, product_id))
+        self._fuzzy.remove(product_id, folded)
+
+    def _is_current(self, entry):
+        text, product_id = entry
+        name = self._names.get(product_id)
+        return name is not None and name.endswith(text)
+
+    def _scan_prefix(self, entries, query, results, seen, limit, accept):
+        """Sıralı listede query ile başlayan kayıtları sırayla sonuca ekler; sınır dolunca True döner."""
+        i = bisect.bisect_left(entries, (query,))
+        while i < len(entries):
+            text, product_id = entries[i]
+            if not text.startswith(query):
+                break
+            i += 1
+            if product_id in seen or not self._is_current((text, product_id)):
+                continue
+            if accept is not None and not accept(product_id):
+                continue
+            seen.add(product_id)
+            results.append(product_id)
+            if limit and len(results) >= limit:
+                return True
+        return False
+
+    def complete(self, term, limit=None, accept=None):
+        """
+        Otomatik tamamlama: adı veya bir kelimesi aranan metinle başlayan ürünler (sadece ikili arama,
+        trigram/bulanık aşamalar çalışmaz). Her tuşta çağrılabilecek kadar hızlıdır.
+        Returns:
+            list: product_id listesi (önce adı metinle başlayanlar).
+        """
+        query = turkish_casefold(term)
+        if not query:
+            return []
+        if not self._sorted:
+            self.compact()
+        results, seen = [], set()
+        if not self._scan_prefix(self._prefixes, query, results, seen, limit, accept):
+            self._scan_prefix(self._word_starts, query, results, seen, limit, accept)
+        return results
+
+    def search(self, term, limit=None, accept=None):
+        """
+        Adında aranan kelimelerin hepsi (herhangi bir sırada, kelime parçası olarak) geçen ürünleri arar.
+        Sıralama: adı aranan metinle başlayanlar, bir kelimesi aranan metinle başlayanlar,
+        sonra diğerleri (metnin adda geçtiği yer ve ad uzunluğuna göre).
+        Args:
+            term: Aranan metin (büyük/küçük harf farkı Türkçe kurallarla yok sayılır).
+            limit: En fazla döndürülecek sonuç (None: hepsi).
+            accept: product_id alıp False dönerse ürün atlanır (ör. pasif ürünler).
+        Returns:
+            list: En iyi eşleşmeden başlayarak product_id listesi.
+        """
+        words = turkish_casefold(term).split()
+        if not words:
+            return []
+        if not self._sorted:
+            self.compact()
+        query = ' '.join(words)
+        results, seen = [], set()
+        if self._scan_prefix(self._prefixes, query, results, seen, limit, accept):
+            return results
+        if self._scan_prefix(self._word_starts, query, results, seen, limit, accept):
+            return results
+
+        # Her kelime için en seyrek trigramın ürünleri alınır ve kesiştirilir; tüm trigramları
+        # kesiştirmek büyük kümelerde daha yavaştır, kesin eşleşme zaten aşağıda kontrol ediliyor.
+        posting_lists = []
+        for word in words:
+            grams = _trigrams(word)
+            if grams:
+                posting_lists.append(min((self._grams.get(gram, ()) for gram in grams), key=len))
+        if posting_lists:
+            posting_lists.sort(key=len)
+            if not posting_lists[0]:
+                return results
+            candidates = set(posting_lists[0]).intersection(*posting_lists[1:])
+        else:
+            candidates = self._names.keys()  # 3 harften kısa kelimeler: tüm adlar taranır
+        scored = []
+        for product_id in candidates:
+            if product_id in seen:
+                continue
+            name = self._names[product_id]
+            if not all(word in name for word in words):
+                continue
+            if accept is not None and not accept(product_id):
+                continue
+            pos = name.find(query)
+            scored.append((pos if pos >= 0 else len(name), len(name), name, product_id))
+        remaining = limit - len(results) if limit else None
+        if remaining:
+            scored = heapq.nsmallest(remaining, scored)
+        else:
+            scored.sort()
+        results.extend(entry[-1] for entry in scored)
+        return results
+
+    def fuzzy_search(self, term, limit=None, accept=None, budget_ms=20.0):
+        """
+        Yazım hatalarına toleranslı arama (tam arama sonuç vermediğinde kullanılır): Türkçe harf
+        farkları yok sayılır, her kelime için önek eşleşmesi veya kelime uzunluğuna göre 1-2 harflik
+        düzenleme mesafesi kabul edilir. budget_ms aşılınca o ana kadar bulunan adaylarla dönülür;
+        limit verilirse en fazla limit * FUZZY_CANDIDATES_PER_RESULT aday sıralanır.
+        Returns:
+            list: Toplam mesafesi en küçük olandan başlayarak product_id listesi.
+        """
+        if not self._sorted:
+            self.compact()
+        deadline = time.perf_counter() + budget_ms / 1000
+        scored = []
+        max_results = limit * FUZZY_CANDIDATES_PER_RESULT if limit else None
+        for product_id, distance in self._fuzzy.search(term, deadline, max_results).items():
+            if accept is not None and not accept(product_id):
+                continue
+            name = self._names.get(product_id)
+            if name is not None:
+                scored.append((distance, len(name), name, product_id))
+        scored = heapq.nsmallest(limit, scored) if limit else sorted(scored)
+        return [entry[-1] for entry in scored]
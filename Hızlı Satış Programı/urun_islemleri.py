@@ -4,7 +4,16 @@
 # v53: Etiket yazdırma için handle_print_shelf_label eklendi.
 # v54: CSV içe/dışa aktarma için handle_export_products ve handle_import_products eklendi.
 # v58: handle_add_product fonksiyonu config.ini'den default_min_stock okuyacak şekilde güncellendi.
-# v60 (Bu versiyon): handle_add_product fonksiyonu config.ini'den default_kdv_rate okuyacak şekilde güncellendi.
+# v60: handle_add_product fonksiyonu config.ini'den default_kdv_rate okuyacak şekilde güncellendi.
+# v61: Varsayılan KDV ve min stok değerleri ayarlar.get_settings() üzerinden okunuyor.
+# v62 (Bu versiyon): Ürün yönetiminde isim araması ürün kataloğunun ad indeksinden yapılıyor;
+#      ürün ekleme/güncelleme/durum değişikliği ve içe aktarma sonrası katalog hemen güncelleniyor.
+# v63: Ürün listesi sayfa sayfa gösteriliyor; marka, kategori ve durum (aktif/pasif/tümü) ile filtrelenebiliyor.
+# v64: Ürün değişikliklerinden sonra hızlı buton ürünleri (hizli_butonlar) arka planda yenileniyor.
+# v65: Ürünlerin ek barkodlarını yönetmek için handle_manage_product_barcodes eklendi.
+# v66: Stok ondalıklı olabildiği için (terazi ürünleri) stok gösterimi format_quantity ile yapılıyor;
+#      stok sayımında ondalıklı miktar (ör. 12,5) girilebiliyor.
+# v67: Stok analizi için handle_stock_analysis eklendi (urun_analiz; ürünler bir kez okunur, filtreler bellekte).
 
 import arayuz_yardimcilari as ui
 import urun_veritabani as product_db_ops
@@ -14,28 +23,20 @@ import marka_islemleri as brand_handlers
 import loglama
 import yazdirma_islemleri as print_handlers
 import veri_aktarim
+import urun_katalogu
+import hizli_butonlar
+import urun_analiz
 import os
 from hatalar import DatabaseError, DuplicateEntryError, SaleIntegrityError, UserInputError
 from decimal import Decimal, InvalidOperation
 from rich.console import Console
 from rich.table import Table
-from rich import print as rprint
 import datetime
-import configparser # Yapılandırma okumak için eklendi
+import ayarlar
 
 # arayuz_yardimcilari içinde tanımlı console'u kullanalım
 console = ui.console
 
-# --- Yardımcı Fonksiyon: Yapılandırmayı Oku ---
-def _get_config():
-    """config.ini dosyasını okur ve config nesnesini döndürür."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(base_dir, 'config.ini')
-    config = configparser.ConfigParser(interpolation=None)
-    if not config.read(config_path, encoding='utf-8'):
-        rprint(f"[yellow]Uyarı: Yapılandırma dosyası okunamadı: {config_path}. Varsayılan değerler kullanılabilir.[/]")
-    return config
-
 # === Yardımcı Fonksiyon: Ürün Bul/Seç (Yönetim için) ===
 # ... (_find_product_for_management fonksiyonu aynı kalır) ...
 def _find_product_for_management(connection, prompt_message):
@@ -66,8 +67,8 @@ def _find_product_for_management(connection, prompt_message):
 
             # İsim ile ara (eğer önceki adımlarda bulunamadıysa)
             if not product_list:
-                product_list = product_db_ops.get_products_by_name_like(
-                    connection, user_input, only_active=False) # Aktif olmayanları da ara
+                product_list = urun_katalogu.search_products(
+                    connection, user_input, only_active=False) # Aktif olmayanları da ara (sıralı)
 
             # Sonuçları değerlendir
             if not product_list:
@@ -147,19 +148,15 @@ def handle_add_product(connection, current_user_id):
 
         price_before_kdv = ui.get_positive_decimal_input("KDV Hariç Fiyat: ", allow_zero=False)
 
-        # Varsayılan KDV oranını config'den oku
-        config = _get_config()
-        try:
-            kdv_rate_default = config.getfloat('general', 'default_kdv_rate', fallback=10.0)
-        except (ValueError, configparser.NoSectionError, configparser.NoOptionError):
-            kdv_rate_default = 10.0 # Hata olursa veya ayar yoksa %10 kullan
-            rprint(f"[yellow]Uyarı: config.ini'den 'default_kdv_rate' okunamadı veya geçersiz. Varsayılan değer (%{kdv_rate_default:.1f}) kullanılıyor.[/]")
+        # Varsayılan KDV oranını ayarlardan al
+        settings = ayarlar.get_settings().general
+        kdv_rate_default = settings.default_kdv_rate
 
         # Kullanıcıdan KDV oranını iste, varsayılanı göster
         # get_optional_decimal_input boş bırakılırsa mevcut değeri (burada default) döndürür
-        kdv_rate = ui.get_optional_decimal_input(f"KDV Oranı (%) [{kdv_rate_default:.1f}]", Decimal(str(kdv_rate_default)))
+        kdv_rate = ui.get_optional_decimal_input(f"KDV Oranı (%) [{kdv_rate_default:.1f}]", kdv_rate_default)
         if kdv_rate is None or kdv_rate < 0: # Geçersiz giriş veya negatifse varsayılana dön
-            kdv_rate = Decimal(str(kdv_rate_default))
+            kdv_rate = kdv_rate_default
 
         price_with_kdv = ui.calculate_price_with_kdv(
             price_before_kdv, kdv_rate)
@@ -180,12 +177,8 @@ def handle_add_product(connection, current_user_id):
         stock = ui.get_positive_int_input(
             "Başlangıç Stok Adedi: ", allow_zero=True)
 
-        # Varsayılan min stok seviyesini config'den oku
-        try:
-            min_stock_level_default = config.getint('general', 'default_min_stock', fallback=2)
-        except (ValueError, configparser.NoSectionError, configparser.NoOptionError):
-            min_stock_level_default = 2
-            rprint(f"[yellow]Uyarı: config.ini'den 'default_min_stock' okunamadı veya geçersiz. Varsayılan değer ({min_stock_level_default}) kullanılıyor.[/]")
+        # Varsayılan min stok seviyesini ayarlardan al
+        min_stock_level_default = settings.default_min_stock
 
         # Kullanıcıdan min stok seviyesini iste, varsayılanı göster
         min_stock_level = ui.get_optional_int_input(f"Minimum Stok Seviyesi [{min_stock_level_default}]", min_stock_level_default)
@@ -198,6 +191,8 @@ def handle_add_product(connection, current_user_id):
             connection, barcode, name, brand_id, price_before_kdv, kdv_rate, selling_price, stock, category_id, min_stock_level)
 
         if new_product_id:
+            urun_katalogu.reconcile(connection) # Yeni ürün barkod ve isim aramasında hemen bulunsun
+            hizli_butonlar.request_refresh() # Barkodu hızlı butonda tanımlıysa butona gelsin
             log_details = f"Ürün ID: {new_product_id}, Ad: {name}, Barkod: {barcode}"
             loglama.log_activity(connection, current_user_id, loglama.LOG_ACTION_PRODUCT_ADD, log_details)
 
@@ -214,11 +209,22 @@ def handle_list_products(connection):
     """Ürünleri listeleme işlemini yönetir."""
     console.print("\n--- Ürün Listesi ---", style="bold blue")
     try:
-        show_inactive = ui.get_yes_no_input("Pasif ürünler de gösterilsin mi?")
-        products = product_db_ops.list_all_products(
-            connection, include_inactive=show_inactive)
-        status_text = "Tüm" if show_inactive else "Aktif"
-        ui.display_product_list(products, title=f"{status_text} Ürünler")
+        active = ui.get_active_filter_input("Listelenecek ürünler:")
+        brand_id = category_id = None
+        if ui.get_yes_no_input("Markaya göre filtrelensin mi?"):
+            brand_id = brand_handlers.select_brand(connection, "Filtre Marka Adı: ")
+        if ui.get_yes_no_input("Kategoriye göre filtrelensin mi?"):
+            category_id = category_handlers.select_category(
+                connection, "Filtre Kategori Adı: ", allow_none=True, only_active=False)
+
+        def fetch_page(after=None, before=None):
+            return product_db_ops.get_products_page(
+                connection, after=after, before=before, brand_id=brand_id,
+                category_id=category_id, active=active)
+
+        status_text = {True: "Aktif", False: "Pasif", None: "Tüm"}[active]
+        ui.browse_pages(fetch_page, lambda rows, title: ui.display_product_list(rows, title=title),
+                        f"{status_text} Ürünler")
     except DatabaseError as e:
         console.print(f">>> VERİTABANI HATASI (Listeleme): {e}", style="bold red")
     except Exception as e:
@@ -254,7 +260,7 @@ def handle_update_product(connection, current_user_id):
     kdv_rate_display = f"{current_kdv_rate:.2f}" if current_kdv_rate is not None else "-"
     selling_price_display = f"{current_selling_price:.2f}" if current_selling_price is not None else "-"
     prev_price_display = f"{current_previous_selling_price:.2f} TL" if current_previous_selling_price is not None else "-"
-    stock_display = str(current_stock) if current_stock is not None else "?"
+    stock_display = ui.format_quantity(current_stock) if current_stock is not None else "?"
     min_stock_display = str(current_min_stock_level) if current_min_stock_level is not None else "?"
     brand_display = f"{current_brand_name} (ID: {current_brand_id})" if current_brand_id else "Yok"
     category_display = f"{current_category_name} (ID: {current_category_id})" if current_category_id else "Yok"
@@ -348,6 +354,9 @@ def handle_update_product(connection, current_user_id):
         )
 
         # Loglama
+        if success:
+            urun_katalogu.reconcile(connection) # Yeni ad/fiyat/stok katalog ve ad indeksine yansısın
+            hizli_butonlar.request_refresh()
         if success and changes_made:
             log_details = f"Ürün ID: {current_id}, Yeni Ad: {final_name}"
             changed_fields = []
@@ -431,7 +440,7 @@ def handle_stock_input(connection, current_user_id):
                 elif current_stock == 0: stock_status_msg = " [bold red](STOK 0!)[/]"
                 elif current_stock <= min_stock: stock_status_msg = " [bold yellow](KRİTİK STOK!)[/]"
 
-            console.print(f"   -> Seçilen: {product_name} ({brand_name or 'Markasız'}) (Mevcut Stok: {current_stock if current_stock is not None else '?'}){stock_status_msg}")
+            console.print(f"   -> Seçilen: {product_name} ({brand_name or 'Markasız'}) (Mevcut Stok: {ui.format_quantity(current_stock) if current_stock is not None else '?'}){stock_status_msg}")
 
             # Miktar Al
             quantity = ui.get_positive_int_input(
@@ -543,6 +552,8 @@ def handle_toggle_product_status(connection, current_user_id):
                 new_status = "Aktif"
 
             if success:
+                urun_katalogu.reconcile(connection)
+                hizli_butonlar.request_refresh()
                 log_details = f"Ürün ID: {product_id}, Ad: {product_name}, Yeni Durum: {new_status}"
                 loglama.log_activity(connection, current_user_id, loglama.LOG_ACTION_PRODUCT_STATUS_CHANGE, log_details)
             # else: Hata mesajı DB fonksiyonunda veriliyor
@@ -554,6 +565,106 @@ def handle_toggle_product_status(connection, current_user_id):
     else:
         console.print("İşlem iptal edildi.", style="yellow")
 
+def _display_product_barcodes(product_data, alias_rows):
+    barcode_table = Table(title=f"{product_data.get('name', '?')} - Barkodlar", show_header=True, header_style="blue")
+    barcode_table.add_column("Barkod", style="cyan")
+    barcode_table.add_column("Tür")
+    barcode_table.add_column("Açıklama", style="dim")
+    barcode_table.add_row(product_data.get('barcode', '?'), "[bold]Ana[/]", "-")
+    for row in alias_rows:
+        barcode_table.add_row(row['barcode'], "Ek", row.get('description') or "-")
+    console.print(barcode_table)
+
+def handle_manage_product_barcodes(connection, current_user_id):
+    """Bir ürünün ek barkodlarını (koli, eski ambalaj, tedarikçi barkodu vb.) listeler, ekler ve siler."""
+    console.print("\n--- Ürün Ek Barkodları ---", style="bold blue")
+    product_data = _find_product_for_management(
+        connection, "Ek barkodları yönetilecek ürünün Barkodunu veya Adını girin: ")
+    if not product_data:
+        return
+
+    product_id = product_data.get('product_id')
+    product_name = product_data.get('name')
+    changed = False
+    try:
+        while True:
+            _display_product_barcodes(product_data, product_db_ops.get_product_barcodes(connection, product_id))
+            choice = ui.get_non_empty_input("(E)k barkod ekle, (S)il, (Ç)ıkış: ").strip().lower()
+            if choice in ('ç', 'c'):
+                break
+            if choice == 'e':
+                barcode = ui.get_non_empty_input("Eklenecek barkod: ").strip()
+                description = input("Açıklama (Boş bırakılabilir): ").strip() or None
+                try:
+                    product_db_ops.add_product_barcode(connection, product_id, barcode, description)
+                except DuplicateEntryError as e:
+                    console.print(f">>> {e}", style="yellow")
+                    continue
+                changed = True
+                console.print(f">>> '{barcode}' ek barkod olarak eklendi.", style="green")
+                loglama.log_activity(connection, current_user_id, loglama.LOG_ACTION_PRODUCT_UPDATE,
+                                     f"Ürün ID: {product_id}, Ad: {product_name}, Ek barkod eklendi: {barcode}")
+            elif choice == 's':
+                barcode = ui.get_non_empty_input("Silinecek ek barkod: ").strip()
+                if product_db_ops.remove_product_barcode(connection, product_id, barcode):
+                    changed = True
+                    console.print(f">>> '{barcode}' silindi.", style="green")
+                    loglama.log_activity(connection, current_user_id, loglama.LOG_ACTION_PRODUCT_UPDATE,
+                                         f"Ürün ID: {product_id}, Ad: {product_name}, Ek barkod silindi: {barcode}")
+                else:
+                    console.print(f">>> '{barcode}' bu ürünün ek barkodu değil.", style="yellow")
+            else:
+                console.print(">>> Geçersiz seçim!", style="red")
+    except DatabaseError as e:
+        console.print(f">>> VERİTABANI HATASI (Ek Barkod): {e}", style="bold red")
+    except ValueError as e:
+        console.print(f">>> {e}", style="red")
+    except Exception as e:
+        console.print(f">>> BEKLENMEDİK HATA (Ek Barkod): {e}", style="bold red")
+    finally:
+        if changed:
+            urun_katalogu.reconcile(connection) # Ek barkodlar katalogdaki barkod indeksine yansısın
+            hizli_butonlar.request_refresh()
+
+def handle_stock_analysis(connection):
+    """
+    Stok analizi: ürünler bir kez okunur (urun_analiz), özet, kategori bazında stok değeri ve fiyat bantları
+    gösterilir. Kritik stok ve eşik altı stok listeleri aynı görüntüden, veritabanına tekrar gitmeden hazırlanır.
+    """
+    console.print("\n--- Stok Analizi ---", style="bold blue")
+    if not urun_analiz.is_available():
+        console.print(">>> Stok analizi için NumPy gerekli (pip install numpy). Stok Raporu menüsü kullanılabilir.", style="yellow")
+        return
+    try:
+        snapshot = urun_analiz.load_snapshot(connection)
+        show_summary = True
+        while True:
+            if show_summary:
+                ui.display_stock_analysis(snapshot.summary(), snapshot.stock_value_by_category(),
+                                          snapshot.price_band_histogram(), snapshot.loaded_at)
+                show_summary = False
+            choice = ui.get_non_empty_input(
+                "(K)ritik stok listesi, (E)şik altı stok, (Ö)zet, (Y)enile, (Ç)ıkış: ").strip().lower()
+            if choice in ('ç', 'c'):
+                break
+            if choice == 'k':
+                ui.display_stock_report(snapshot.stock_report(only_critical=True), only_critical=True)
+            elif choice == 'e':
+                threshold = ui.get_positive_decimal_input("Stok eşiği (bu değer ve altı gösterilecek): ", allow_zero=True)
+                include_inactive = ui.get_yes_no_input("Pasif ürünler de dahil edilsin mi?")
+                ui.display_stock_report(snapshot.stock_report(threshold, include_inactive), threshold, include_inactive)
+            elif choice in ('ö', 'o'):
+                show_summary = True
+            elif choice == 'y':
+                snapshot = urun_analiz.load_snapshot(connection)
+                show_summary = True
+            else:
+                console.print(">>> Geçersiz seçim!", style="red")
+    except DatabaseError as e:
+        console.print(f">>> VERİTABANI HATASI (Stok Analizi): {e}", style="bold red")
+    except Exception as e:
+        console.print(f">>> BEKLENMEDİK HATA (Stok Analizi): {e}", style="bold red")
+
 def handle_price_check(connection):
     """Kullanıcıdan alınan barkod veya isme göre ürünün fiyatını sorgular ve gösterir."""
     console.print("\n--- Fiyat Sorgula ---", style="bold blue")
@@ -643,7 +754,7 @@ def handle_stock_adjustment(connection, current_user_id):
     product_id = product_data.get('product_id')
     product_name = product_data.get('name')
     current_stock = product_data.get('stock')
-    current_stock_display = current_stock if current_stock is not None else 'Bilinmiyor'
+    current_stock_display = ui.format_quantity(current_stock) if current_stock is not None else 'Bilinmiyor'
 
     console.print(f"\nSeçilen Ürün: [cyan]{product_name}[/]")
     console.print(f"Mevcut Sistem Stoğu: [yellow]{current_stock_display}[/]")
@@ -655,13 +766,15 @@ def handle_stock_adjustment(connection, current_user_id):
             if not new_stock_str:
                 console.print(">>> HATA: Stok miktarı boş bırakılamaz.", style="red")
                 continue
-            new_stock_level = int(new_stock_str)
+            new_stock_level = Decimal(new_stock_str.replace(',', '.'))
+            if not new_stock_level.is_finite():
+                raise ValueError(new_stock_str)
             # Negatif stok girişi yapılabilir mi? Şimdilik izin verelim.
             break
-        except ValueError:
-            console.print(">>> HATA: Geçersiz giriş. Lütfen bir tam sayı girin.", style="red")
+        except (ValueError, InvalidOperation):
+            console.print(">>> HATA: Geçersiz giriş. Lütfen bir sayı girin (ör. 12 veya 12,5).", style="red")
 
-    if ui.get_yes_no_input(f">>> '{product_name}' stoğu {current_stock_display} -> {new_stock_level} olarak güncellensin mi?"):
+    if ui.get_yes_no_input(f">>> '{product_name}' stoğu {current_stock_display} -> {ui.format_quantity(new_stock_level)} olarak güncellensin mi?"):
         try:
             success = product_db_ops.set_stock_level(
                 connection, product_id, new_stock_level)
@@ -755,6 +868,9 @@ def handle_import_products(connection, current_user_id):
             # İçe aktarma fonksiyonunu çağır
             added, updated, skipped = veri_aktarim.import_products_from_csv(
                 connection, filename)
+            if added or updated:
+                urun_katalogu.reconcile(connection)
+                hizli_butonlar.request_refresh()
             # Özet mesajı import_products_from_csv içinde veriliyor.
             # loglama.log_activity(connection, current_user_id, "URUN_ICE_AKTAR", f"Dosya: {filename}, E:{added}, G:{updated}, A:{skipped}")
 
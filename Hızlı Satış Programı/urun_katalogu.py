@@ -0,0 +1,447 @@
+# urun_katalogu.py
+# Satış ekranı için bellekte tutulan ürün kataloğu (barkod -> ürün).
+# Program açılışında tüm ürünler (pasifler dahil) bir kez yüklenir; sonra sadece
+# products.last_updated değeri en son görülen değerden (high-water mark) büyük olan ürünler
+# çekilerek katalog artımlı olarak güncellenir. Bu yoklama arka plandaki bir iş parçacığında,
+# havuzdan ödünç alınan ayrı bir bağlantıyla yapılır (hizli_butonlar ile aynı yöntem); barkod
+# okutmaları ve isim aramaları sadece bellekteki indeksi okur, yoklamayı beklemez.
+# Stok değişiklikleri de last_updated'i güncellediği için (MySQL: ON UPDATE CURRENT_TIMESTAMP,
+# SQLite: tetikleyici) diğer kasalardaki satışlar bir sonraki yoklamada kataloğa yansır.
+# Katalogdaki stok sadece ekranda uyarı için kullanılır; satışta stok düşümü her zaman veritabanında yapılır.
+# Katalogda da veritabanında da olmayan barkodlar bir süre negatif önbellekte (barkod) hatırlanır.
+# Ürün adları ayrıca trigram indeksinde (urun_arama) tutulur; isimle arama da bellekten yapılır.
+# İsimle arama sonuç vermezse yazım hatalarına toleranslı (bulanık) arama yapılır.
+# Otomatik tamamlama için barkodlar da sıralı listede tutulur (complete: önek araması).
+# Ek barkodlar (product_barcodes) ayrı bir sözlükte (ek barkod -> product_id) tutulur; ana barkodda
+# bulunamayan kod bu sözlükten tek adımda ürüne çözülür.
+
+import bisect
+import datetime
+import threading
+import time
+from rich import print as rprint
+from hatalar import DatabaseError
+from mysql.connector import Error
+import ayarlar
+import barkod
+import db_config
+import urun_arama
+import urun_veritabani as product_db_ops
+
+# Yoklamada high-water mark'tan bu kadar geriye de bakılır: last_updated saniye hassasiyetinde
+# olduğundan ve geç commit edilen işlemler daha eski zaman damgası taşıyabildiğinden.
+REFRESH_OVERLAP = datetime.timedelta(seconds=5)
+# catalog_refresh_interval 0 iken (arka plan yoklaması kapalı) ayarın tekrar kontrol edileceği aralık (saniye)
+IDLE_CHECK_INTERVAL = 5.0
+
+# Ürün sözlüğünün alanları (urun_veritabani.iter_products ile aynı sıra).
+# Bellekten tasarruf için ürünler demet (tuple) olarak saklanır, istenince sözlüğe çevrilir.
+PRODUCT_FIELDS = (
+    'product_id', 'barcode', 'name', 'price_before_kdv', 'kdv_rate',
+    'selling_price', 'stock', 'is_active', 'category_id', 'min_stock_level',
+    'brand_id', 'brand_name', 'category_name', 'previous_selling_price', 'last_updated',
+    'alias_barcodes',
+)
+_IS_ACTIVE = PRODUCT_FIELDS.index('is_active')
+_BARCODE = PRODUCT_FIELDS.index('barcode')
+_NAME = PRODUCT_FIELDS.index('name')
+_PRODUCT_ID = PRODUCT_FIELDS.index('product_id')
+_LAST_UPDATED = PRODUCT_FIELDS.index('last_updated')
+_ALIAS_BARCODES = PRODUCT_FIELDS.index('alias_barcodes')
+
+
+def _to_row(product):
+    return tuple(product.get(field) for field in PRODUCT_FIELDS)
+
+
+def _to_dict(row):
+    return dict(zip(PRODUCT_FIELDS, row))
+
+
+class ProductCatalog:
+    """
+    Barkodla anahtarlanmış, süreç içi ürün kataloğu.
+
+    - load(): Tüm ürünleri yükler (açılışta ve zorla yenilemede).
+    - refresh(): last_updated'e göre sadece değişen ürünleri çeker (artımlı; arka planda ve reconcile ile).
+    - get_product_by_barcode(): Önce katalog; katalogda olmayan barkod için veritabanı.
+    - search_products(): Ad indeksinden (urun_arama) sıralı isim araması.
+    - complete(): Barkod veya ad önekiyle otomatik tamamlama önerileri (sadece bellek).
+    Dönen sözlükler kopyadır; çağıran değiştirse de katalog etkilenmez.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.RLock()  # load/refresh sırayla çalışsın (eski sonuç yenisinin üstüne yazılmasın)
+        self._worker = None
+        self._by_barcode = {}  # {barkod: ürün demeti}
+        self._barcode_by_id = {}  # {product_id: barkod}; barkodu değişen ürünün eski kaydını silmek için
+        self._alias_ids = {}  # {ek barkod: product_id}
+        self._aliases_by_id = {}  # {product_id: ek barkodlar demeti}; kaldırılan ek barkodları silmek için
+        self._barcodes = []  # Sıralı barkodlar (otomatik tamamlama); toplu yüklemede sonda sıralanır
+        self._bulk = False
+        self._names = urun_arama.NameIndex()  # Ad araması için trigram indeksi
+        self._high_water = None  # Görülen en büyük last_updated
+        self._loaded = False
+        self._last_poll = 0.0  # Son yoklamanın zamanı (time.monotonic)
+        self._stats = {'hits': 0, 'misses': 0, 'loads': 0, 'refreshes': 0,
+                       'refreshed_rows': 0, 'load_seconds': 0.0, 'last_refresh': None,
+                       'searches': 0, 'search_seconds': 0.0, 'fuzzy_searches': 0,
+                       'refresh_errors': 0, 'last_error': None}
+
+    def __len__(self):
+        return len(self._by_barcode)
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def _store(self, product):
+        """Bir ürünü kataloğa ekler/günceller. Kilit çağıran tarafından alınmış olmalıdır."""
+        row = _to_row(product)
+        product_id = row[_PRODUCT_ID]
+        barcode = row[_BARCODE]
+        old_barcode = self._barcode_by_id.get(product_id)
+        if old_barcode is not None and old_barcode != barcode:
+            self._by_barcode.pop(old_barcode, None)
+            i = bisect.bisect_left(self._barcodes, old_barcode)
+            if i < len(self._barcodes) and self._barcodes[i] == old_barcode:
+                del self._barcodes[i]
+        if barcode not in self._by_barcode:
+            if self._bulk:
+                self._barcodes.append(barcode)
+            else:
+                bisect.insort(self._barcodes, barcode)
+        if 'alias_barcodes' in product:
+            self._store_aliases(product_id, row[_ALIAS_BARCODES])
+        elif product_id in self._aliases_by_id:
+            # Ek barkodları getirmeyen sorgudan gelen ürün: bilinen ek barkodlar korunur
+            row = row[:_ALIAS_BARCODES] + (','.join(self._aliases_by_id[product_id]),) + row[_ALIAS_BARCODES + 1:]
+        self._by_barcode[barcode] = row
+        self._barcode_by_id[product_id] = barcode
+        self._names.add(product_id, row[_NAME])
+        last_updated = row[_LAST_UPDATED]
+        if last_updated is not None and (self._high_water is None or last_updated > self._high_water):
+            self._high_water = last_updated
+
+    def _store_aliases(self, product_id, alias_barcodes):
+        """Ürünün ek barkodlarını (virgülle ayrılmış metin veya None) günceller. Kilit çağırana aittir."""
+        aliases = tuple(alias for alias in (alias_barcodes or '').split(',') if alias)
+        for alias in self._aliases_by_id.pop(product_id, ()):
+            if self._alias_ids.get(alias) == product_id:
+                del self._alias_ids[alias]
+        for alias in aliases:
+            self._alias_ids[alias] = product_id
+        if aliases:
+            self._aliases_by_id[product_id] = aliases
+
+    def load(self, connection):
+        """
+        Tüm ürünleri (pasifler dahil) veritabanından okuyup kataloğu baştan kurar.
+        Returns:
+            int: Yüklenen ürün sayısı.
+        Raises:
+            DatabaseError: Ürünler okunamazsa (mevcut katalog değişmeden kalır).
+        """
+        with self._refresh_lock:
+            count = self._load(connection)
+        self._ensure_worker()
+        return count
+
+    def _load(self, connection):
+        start = time.perf_counter()
+        fresh = ProductCatalog()
+        fresh._bulk = True
+        fresh._names.begin_bulk()
+        for product in product_db_ops.iter_products(connection, include_inactive=True):
+            fresh._store(product)
+        fresh._barcodes.sort()
+        fresh._names.compact()
+        with self._lock:
+            self._by_barcode = fresh._by_barcode
+            self._barcode_by_id = fresh._barcode_by_id
+            self._alias_ids = fresh._alias_ids
+            self._aliases_by_id = fresh._aliases_by_id
+            self._barcodes = fresh._barcodes
+            self._names = fresh._names
+            self._high_water = fresh._high_water
+            self._loaded = True
+            self._last_poll = time.monotonic()
+            self._stats['loads'] += 1
+            self._stats['load_seconds'] = time.perf_counter() - start
+            self._stats['last_refresh'] = datetime.datetime.now()
+        return len(fresh._by_barcode)
+
+    def refresh(self, connection, force=False):
+        """
+        Son yoklamadan bu yana değişen ürünleri çekip kataloğu günceller (arka plan iş parçacığı ve
+        reconcile çağırır; barkod okutma ve isim araması çağırmaz).
+        force False ise en fazla [performance] catalog_refresh_interval saniyede bir yoklanır.
+        Katalog henüz yüklenmediyse tam yükleme yapılır.
+        Returns:
+            int: Güncellenen ürün sayısı (yoklama zamanı gelmediyse 0).
+        Raises:
+            DatabaseError: Değişen ürünler okunamazsa.
+        """
+        with self._refresh_lock:
+            interval = ayarlar.get_settings().performance.catalog_refresh_interval
+            now = time.monotonic()
+            if not force and now - self._last_poll < interval:
+                return 0
+            self._last_poll = now
+            if not self._loaded:
+                return self._load(connection)
+            since = self._high_water - REFRESH_OVERLAP if self._high_water is not None else None
+            changed = list(product_db_ops.iter_products(connection, include_inactive=True, updated_since=since))
+            with self._lock:
+                for product in changed:
+                    self._store(product)
+                self._stats['refreshes'] += 1
+                self._stats['refreshed_rows'] += len(changed)
+                self._stats['last_refresh'] = datetime.datetime.now()
+            return len(changed)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, name='urun_katalogu', daemon=True)
+                self._worker.start()
+
+    def _run_worker(self):
+        while True:
+            interval = ayarlar.get_settings().performance.catalog_refresh_interval
+            time.sleep(interval if interval > 0 else IDLE_CHECK_INTERVAL)
+            if ayarlar.get_settings().performance.catalog_refresh_interval <= 0:
+                continue
+            try:
+                with db_config.db_session() as connection:
+                    self.refresh(connection)
+            except (DatabaseError, Error) as e:
+                # Arka planda ekrana yazılmaz (kasiyerin girdisini bozmasın); P1 ekranında görünür
+                with self._lock:
+                    self._stats['refresh_errors'] += 1
+                    self._stats['last_error'] = str(e)
+            except Exception as e:
+                with self._lock:
+                    self._stats['refresh_errors'] += 1
+                    self._stats['last_error'] = f"Beklenmedik hata: {e}"
+
+    def lookup(self, barcode, only_active=True):
+        """
+        Sadece bellekten arar, veritabanına gitmez. Ana barkodda yoksa ek barkodlara bakılır.
+        Returns:
+            tuple: (katalogda var mı, ürün sözlüğü veya None)
+        """
+        with self._lock:
+            row = self._by_barcode.get(barcode)
+            if row is None:
+                product_id = self._alias_ids.get(barcode)
+                if product_id is not None:
+                    row = self._by_barcode.get(self._barcode_by_id.get(product_id))
+        if row is None:
+            return False, None
+        if only_active and not row[_IS_ACTIVE]:
+            return True, None
+        return True, _to_dict(row)
+
+    def get_product_by_barcode(self, connection, barcode, only_active=True):
+        """
+        Barkoda ait ürünü döndürür (urun_veritabani.get_product_by_barcode ile aynı sözlük).
+        Katalogda olmayan barkod veritabanında aranır; bulunursa kataloğa eklenir, bulunamazsa
+        negatif önbelleğe alınır (süresi dolana veya add_product ile eklenene kadar tekrar sorgulanmaz).
+        Katalog arka planda yenilendiği için burada yoklama yapılmaz.
+        """
+        found, product = self.lookup(barcode, only_active)
+        with self._lock:
+            self._stats['hits' if found else 'misses'] += 1
+        if found:
+            return product
+        if barkod.is_known_missing(barcode):
+            return None
+        product = product_db_ops.get_product_by_barcode(connection, barcode, only_active=False)
+        if product is None:
+            barkod.remember_missing(barcode)
+            return None
+        with self._lock:
+            self._store(product)
+        if only_active and not product.get('is_active'):
+            return None
+        return dict(product)
+
+    def search_products(self, connection, term, only_active=True, limit=None):
+        """
+        Adında aranan kelimeler geçen ürünleri en iyi eşleşmeden başlayarak döndürür
+        (urun_veritabani.get_products_by_name_like ile aynı sözlükler).
+        Eşleşme yoksa ve [performance] fuzzy_search açıksa benzer adlı ürünler döner.
+        Sadece bellekteki ad indeksi okunur (veritabanına gitmez).
+        """
+        start = time.perf_counter()
+        with self._lock:
+            accept = None
+            if only_active:
+                accept = lambda product_id: self._by_barcode[self._barcode_by_id[product_id]][_IS_ACTIVE]
+            ids = self._names.search(term, limit=limit, accept=accept)
+            settings = ayarlar.get_settings().performance
+            if not ids and settings.fuzzy_search:
+                ids = self._names.fuzzy_search(term, limit=settings.fuzzy_result_limit, accept=accept,
+                                               budget_ms=settings.fuzzy_search_budget_ms)
+                self._stats['fuzzy_searches'] += 1
+                if ids:
+                    rprint(f"[dim]'{term}' ile tam eşleşme yok, benzer adlı ürünler gösteriliyor.[/dim]")
+            products = [_to_dict(self._by_barcode[self._barcode_by_id[product_id]]) for product_id in ids]
+            self._stats['searches'] += 1
+            self._stats['search_seconds'] += time.perf_counter() - start
+        return products
+
+    def complete(self, prefix, limit, only_active=True):
+        """
+        Otomatik tamamlama önerileri: rakamlardan oluşan önek barkodlarda (sıralı listede ikili arama),
+        diğerleri adlarda (urun_arama.NameIndex.complete) aranır. Veritabanına gitmez, yenileme yapmaz.
+        """
+        prefix = prefix.strip()
+        with self._lock:
+            if prefix.isdigit():
+                rows = []
+                i = bisect.bisect_left(self._barcodes, prefix)
+                while i < len(self._barcodes) and len(rows) < limit and self._barcodes[i].startswith(prefix):
+                    row = self._by_barcode[self._barcodes[i]]
+                    if not only_active or row[_IS_ACTIVE]:
+                        rows.append(row)
+                    i += 1
+            else:
+                accept = None
+                if only_active:
+                    accept = lambda product_id: self._by_barcode[self._barcode_by_id[product_id]][_IS_ACTIVE]
+                rows = [self._by_barcode[self._barcode_by_id[product_id]]
+                        for product_id in self._names.complete(prefix, limit=limit, accept=accept)]
+        return [_to_dict(row) for row in rows]
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'products', 'aliases', 'hits', 'misses', 'hit_rate', 'loads', 'refreshes',
+                   'refreshed_rows', 'load_seconds', 'last_refresh', 'high_water',
+                   'searches', 'search_avg_ms', 'fuzzy_searches', 'refresh_errors', 'last_error'}
+                  refresh_errors / last_error: Arka plan yoklamasında oluşan hatalar.
+        """
+        with self._lock:
+            stats = dict(self._stats, products=len(self._by_barcode), aliases=len(self._alias_ids),
+                         high_water=self._high_water)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['search_avg_ms'] = stats.pop('search_seconds') * 1000 / stats['searches'] if stats['searches'] else 0.0
+        return stats
+
+
+# Uygulama boyunca tek katalog
+_catalog = ProductCatalog()
+
+
+def get_catalog():
+    """Uygulamanın ürün kataloğunu döndürür."""
+    return _catalog
+
+
+def is_enabled():
+    return ayarlar.get_settings().performance.catalog_cache
+
+
+def load(connection):
+    """
+    Katalog açıksa tüm ürünleri yükler (program açılışında çağrılır).
+    Yükleme başarısız olursa barkodlar veritabanından aranmaya devam eder.
+    Returns:
+        bool: Katalog yüklendiyse True.
+    """
+    if not is_enabled():
+        return False
+    try:
+        count = _catalog.load(connection)
+    except DatabaseError as e:
+        rprint(f"[yellow]Uyarı: Ürün kataloğu yüklenemedi, barkodlar veritabanından aranacak: {e}[/]")
+        return False
+    rprint(f"[dim]Ürün kataloğu yüklendi ({count} ürün, {_catalog.get_stats()['load_seconds']:.2f} sn).[/dim]")
+    return True
+
+
+def get_product_by_barcode(connection, barcode, only_active=True):
+    """
+    Satış ekranı için barkod araması: katalog açıksa bellekten, kapalıysa doğrudan veritabanından.
+    Her iki durumda da yakın zamanda bulunamamış barkod tekrar sorgulanmaz.
+    Kontrol hanesi doğrulaması (barkod.validation_error) çağıran tarafından önceden yapılır.
+    Returns:
+        dict: Ürün bilgileri sözlüğü veya None.
+    """
+    if not is_enabled():
+        if barkod.is_known_missing(barcode):
+            return None
+        product = product_db_ops.get_product_by_barcode(connection, barcode, only_active=False)
+        if product is None:
+            barkod.remember_missing(barcode)
+            return None
+        if only_active and not product.get('is_active'):
+            return None
+        return product
+    return _catalog.get_product_by_barcode(connection, barcode, only_active)
+
+
+def search_products(connection, term, only_active=True):
+    """
+    İsimle ürün araması (sepete ekleme ve ürün yönetimi ekranları). name_search = catalog ve katalog
+    yüklüyse bellekteki ad indeksinden en iyi [performance] search_result_limit eşleşme döner; aksi halde
+    veritabanında (name_search ayarına göre FULLTEXT veya LIKE ile) aranır.
+    Returns:
+        list: Ürün bilgileri sözlük listesi (boş olabilir).
+    """
+    if ayarlar.get_settings().performance.name_search != 'catalog' or not is_enabled() or not _catalog.loaded:
+        return product_db_ops.get_products_by_name_like(connection, term, only_active=only_active)
+    limit = ayarlar.get_settings().performance.search_result_limit
+    return _catalog.search_products(connection, term, only_active, limit)
+
+
+def can_complete():
+    """Otomatik tamamlama kullanılabiliyorsa (ayar açık, katalog yüklü) True."""
+    settings = ayarlar.get_settings().performance
+    return settings.autocomplete and settings.catalog_cache and _catalog.loaded
+
+
+def complete(prefix, only_active=True):
+    """
+    Yazılan barkod/ad önekine göre en fazla [performance] autocomplete_limit ürün önerir (sadece bellekten).
+    Returns:
+        list: Ürün bilgileri sözlük listesi.
+    """
+    return _catalog.complete(prefix, ayarlar.get_settings().performance.autocomplete_limit, only_active)
+
+
+def reconcile(connection):
+    """
+    Ürünleri değiştiren bir işlem (satış, iade, ürün ekleme/güncelleme, içe aktarma) kaydedildikten
+    sonra çağrılır: değişen ürünler hemen çekilir, böylece katalog ve ad indeksi veritabanıyla eşitlenir.
+    """
+    if not is_enabled() or not _catalog.loaded:
+        return
+    try:
+        _catalog.refresh(connection, force=True)
+    except DatabaseError as e:
+        rprint(f"[dim]Ürün kataloğu güncellenemedi ({e}); bir sonraki yoklamada tekrar denenecek.[/dim]")
+
+
+def force_reload(connection):
+    """
+    Kataloğu tamamen yeniden yükler (K1 komutu); bulunamayan barkod önbelleği de boşaltılır.
+    Returns:
+        int: Yüklenen ürün sayısı.
+    Raises:
+        DatabaseError: Ürünler okunamazsa.
+    """
+    count = _catalog.load(connection)
+    barkod.clear_missing()
+    return count
+
+
+def get_stats():
+    """Katalog istatistiklerini döndürür (katalog kapalıysa None)."""
+    if not is_enabled():
+        return None
+    return _catalog.get_stats()
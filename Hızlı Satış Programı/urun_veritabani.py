@@ -4,10 +4,29 @@
 # v51: get_order_suggestion_data fonksiyonu eklendi.
 # v53: Etiket basımı için get_product_details_for_label eklendi.
 # v53: update_product fonksiyonu previous_selling_price'ı güncelleyecek şekilde düzenlendi.
+# v54: Ürün arama fonksiyonları bağlantı koptuğunda yeniden bağlanıp tekrar deneniyor (retry_on_disconnect).
+# v55: get_product_by_barcode hazır ifade (hazir_sorgular) kullanıyor.
+# v56: get_stock_report_data okuma kopyasına (varsa) yönlendiriliyor.
+# v57: record_purchase deadlock / kilit bekleme hatasında run_transaction ile tekrar deneniyor.
+# v58: iter_products ile ürün listesi akışlı (parça parça) okunabiliyor; list_all_products bunu kullanıyor.
+# v59: add_product eklenen barkodu bulunamayan barkod önbelleğinden (barkod) siliyor.
+# v60: get_products_by_name_like, name_search = fulltext ise FULLTEXT (ngram) indeksiyle ilgiye göre sıralı arıyor.
+# v61: get_products_page ile ürün listesi marka/kategori/durum filtreli ve sayfa sayfa (keyset) okunabiliyor.
+# v62: get_products_by_ids ile birden fazla ürün ID'ye göre tek sorguda getirilebiliyor.
+# v63: Ürünlere ek barkod (product_barcodes) tanımlanabiliyor; get_product_by_barcode ek barkodları da
+#      çözüyor. iter_products ve get_product_by_barcode ek barkodları alias_barcodes sütununda döndürüyor.
+# v64: Ürün analizi (urun_analiz) için get_product_analytics_rows (tüm ürünler + son alış fiyatı, tek sorgu)
+#      ve get_purchase_history_for_products (birden fazla ürünün alış geçmişi, tek sorgu) eklendi.
+# v65: set_product_barcodes silme ve eklemeleri tek işlemde (run_transaction) yapıyor; hata olursa hiçbiri kalmaz.
+# v66: get_purchase_history_for_products ürün başına sadece son N alışı (ve son fiyatlı alışı) getiriyor.
 
 from mysql.connector import Error, errorcode
 from decimal import Decimal, InvalidOperation
 from hatalar import DatabaseError, DuplicateEntryError, SaleIntegrityError
+from db_config import retry_on_disconnect, report_query, run_transaction, iter_rows, fulltext_query, fetch_keyset_page
+import hazir_sorgular
+import ayarlar
+import barkod
 from rich import print as rprint
 import datetime
 
@@ -41,6 +60,11 @@ def add_product(connection, barcode, name, brand_id: int, price_before_kdv: Deci
         existing_barcode = cursor.fetchone()
         if existing_barcode:
             raise DuplicateEntryError(f"Barkod ({barcode}) zaten kayıtlı!")
+        cursor.execute("SELECT product_id FROM product_barcodes WHERE barcode = %s", (barcode,))
+        alias_owner = cursor.fetchone()
+        if alias_owner:
+            raise DuplicateEntryError(
+                f"Barkod ({barcode}) başka bir ürünün (ID: {alias_owner[0]}) ek barkodu olarak kayıtlı!")
 
         # 3. Ürünü Ekle
         # previous_selling_price NULL olarak eklenecek
@@ -53,6 +77,7 @@ def add_product(connection, barcode, name, brand_id: int, price_before_kdv: Deci
         cursor.execute(sql_insert, params)
         connection.commit()
         new_product_id = cursor.lastrowid
+        barkod.forget_missing(barcode)  # Daha önce "bulunamadı" olarak hatırlandıysa artık aranabilsin
         rprint(
             f"[bold green]>>> Ürün '{name}' başarıyla eklendi (ID: {new_product_id}).[/]")
         return new_product_id
@@ -79,6 +104,7 @@ def add_product(connection, barcode, name, brand_id: int, price_before_kdv: Deci
 
 # === Ürün Arama/Getirme ===
 # ... (get_product_by_id, get_product_by_barcode, get_products_by_name_like, get_products_by_barcodes fonksiyonları - değişiklik yok) ...
+@retry_on_disconnect
 def get_product_by_id(connection, product_id):
     """Verilen ID'ye sahip ürünü tüm bilgileriyle (kategori adı, marka adı ve min stok dahil) getirir."""
     if not connection or not connection.is_connected():
@@ -107,44 +133,50 @@ def get_product_by_id(connection, product_id):
             cursor.close()
 
 
+@retry_on_disconnect
 def get_product_by_barcode(connection, barcode, only_active=True):
     """
-    Verilen barkoda sahip ürünü getirir (kategori adı, marka adı ve min stok dahil).
+    Verilen barkoda (ana barkod veya ek barkod) sahip ürünü getirir (kategori adı, marka adı ve min stok dahil).
+    Satış ekranında her okutmada çağrıldığı için hazır ifade (prepared statement) kullanır.
+    Barkod tek sorguda, iki benzersiz indeksten (products.barcode, product_barcodes.barcode) çözülür.
     Returns:
-        dict: Ürün bilgileri sözlüğü veya None.
+        dict: Ürün bilgileri sözlüğü (barcode: ürünün ana barkodu, alias_barcodes: virgülle ayrılmış
+              ek barkodlar veya None) ya da None.
     """
     if not connection or not connection.is_connected():
         raise DatabaseError("Ürün aramak için aktif bağlantı gerekli.")
-    cursor = None
     try:
-        cursor = connection.cursor(dictionary=True)
         # previous_selling_price ve last_updated sütunlarını da seçelim
         sql = """SELECT
                     p.product_id, p.barcode, p.name, p.price_before_kdv, p.kdv_rate,
                     p.selling_price, p.stock, p.is_active, p.category_id, p.min_stock_level,
                     p.brand_id, b.name as brand_name,
                     c.name as category_name,
-                    p.previous_selling_price, p.last_updated
+                    p.previous_selling_price, p.last_updated,
+                    (SELECT GROUP_CONCAT(pb.barcode) FROM product_barcodes pb
+                      WHERE pb.product_id = p.product_id) as alias_barcodes
                  FROM products p
                  LEFT JOIN categories c ON p.category_id = c.category_id
                  LEFT JOIN brands b ON p.brand_id = b.brand_id
-                 WHERE p.barcode = %s"""
-        params = [barcode]
+                 WHERE p.product_id = COALESCE(
+                     (SELECT product_id FROM products WHERE barcode = %s),
+                     (SELECT product_id FROM product_barcodes WHERE barcode = %s))"""
+        query_name = 'urun.barkod'
         if only_active:
             sql += " AND p.is_active = TRUE"
-        cursor.execute(sql, params)
-        return cursor.fetchone()
+            query_name = 'urun.barkod_aktif'
+        return hazir_sorgular.fetch_one(connection, query_name, sql, (barcode, barcode))
     except Error as e:
         raise DatabaseError(
             f"Barkod ({barcode}) ile ürün arama hatası: {e}") from e
-    finally:
-        if cursor:
-            cursor.close()
 
 
+@retry_on_disconnect
 def get_products_by_name_like(connection, search_term, only_active=True):
     """
     Verilen isim parçasını içeren ürünleri arar (kategori adı, marka adı ve min stok dahil).
+    name_search = fulltext ise FULLTEXT indeksiyle aranır; sonuçlar ilgiye göre sıralanır ve
+    search_result_limit ile sınırlanır. Aksi halde LIKE ile aranır, ada göre sıralı tüm sonuçlar döner.
     Returns:
         list: Bulunan ürünlerin bilgilerini içeren sözlük listesi veya boş liste.
     """
@@ -162,13 +194,21 @@ def get_products_by_name_like(connection, search_term, only_active=True):
                     p.previous_selling_price, p.last_updated
                  FROM products p
                  LEFT JOIN categories c ON p.category_id = c.category_id
-                 LEFT JOIN brands b ON p.brand_id = b.brand_id
-                 WHERE LOWER(p.name) LIKE LOWER(%s)"""
-        pattern = f"%{search_term}%"
-        params = [pattern]
+                 LEFT JOIN brands b ON p.brand_id = b.brand_id"""
+        boolean_query = fulltext_query(connection, search_term)
+        if boolean_query:
+            sql += " WHERE MATCH(p.name) AGAINST(%s IN BOOLEAN MODE)"
+            params = [boolean_query]
+        else:
+            sql += " WHERE LOWER(p.name) LIKE LOWER(%s)"
+            params = [f"%{search_term}%"]
         if only_active:
             sql += " AND p.is_active = TRUE"
-        sql += " ORDER BY p.name ASC"
+        if boolean_query:
+            sql += " ORDER BY MATCH(p.name) AGAINST(%s IN BOOLEAN MODE) DESC, p.name ASC LIMIT %s"
+            params += [boolean_query, ayarlar.get_settings().performance.search_result_limit]
+        else:
+            sql += " ORDER BY p.name ASC"
         cursor.execute(sql, params)
         return cursor.fetchall()
     except Error as e:
@@ -179,6 +219,7 @@ def get_products_by_name_like(connection, search_term, only_active=True):
             cursor.close()
 
 
+@retry_on_disconnect
 def get_products_by_barcodes(connection, barcode_list):
     """
     Verilen barkod listesindeki AKTİF ürünlerin bilgilerini getirir.
@@ -220,6 +261,47 @@ def get_products_by_barcodes(connection, barcode_list):
             cursor.close()
 
 
+@retry_on_disconnect
+def get_products_by_ids(connection, product_ids):
+    """
+    Verilen ID'lerdeki ürünleri (aktif/pasif) tek sorguda getirir.
+    Satış tamamlanırken promosyonlardaki bedava ürünler için kullanılır.
+    Args:
+        product_ids (iterable): Ürün ID'leri (tekrar edenler bir kez sorgulanır).
+    Returns:
+        dict: {product_id: ürün sözlüğü (get_product_by_id ile aynı sütunlar)};
+              bulunamayan ID'ler sözlükte yer almaz.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ürün aramak için aktif bağlantı gerekli.")
+    product_ids = list(dict.fromkeys(product_ids))
+    if not product_ids:
+        return {}
+
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        sql = f"""SELECT
+                    p.product_id, p.barcode, p.name, p.price_before_kdv, p.kdv_rate,
+                    p.selling_price, p.stock, p.is_active, p.category_id, p.min_stock_level,
+                    p.brand_id, b.name as brand_name,
+                    c.name as category_name,
+                    p.previous_selling_price, p.last_updated
+                 FROM products p
+                 LEFT JOIN categories c ON p.category_id = c.category_id
+                 LEFT JOIN brands b ON p.brand_id = b.brand_id
+                 WHERE p.product_id IN ({placeholders})"""
+        cursor.execute(sql, product_ids)
+        return {row['product_id']: row for row in cursor.fetchall()}
+    except Error as e:
+        raise DatabaseError(
+            f"ID listesi ile ürün arama hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
 # === Ürün Güncelleme ===
 
 # ***** BU FONKSİYON GÜNCELLENDİ (previous_selling_price kaydı eklendi) *****
@@ -321,34 +403,84 @@ def update_product(connection, product_id, new_name, new_brand_id: int, new_cate
 # ... (list_all_products fonksiyonu - değişiklik yok) ...
 
 
-def list_all_products(connection, include_inactive=False):
-    """Veritabanındaki ürünleri listeler (kategori adı, marka adı ve min stok dahil)."""
+def iter_products(connection, include_inactive=False, updated_since=None):
+    """
+    Ürünleri (kategori adı, marka adı ve min stok dahil) tek tek döndüren üreteç.
+    Sonuç sunucudan parça parça okunur (db_config.iter_rows); büyük kataloglarda bellek
+    kullanımı sabit kalır. Üreteç tükenene kadar aynı bağlantıda başka sorgu çalıştırılmamalıdır.
+    Args:
+        updated_since (datetime, optional): Verilirse sadece last_updated >= updated_since olan ürünler.
+    alias_barcodes: Ürünün ek barkodları (virgülle ayrılmış) veya None.
+    """
     if not connection or not connection.is_connected():
         raise DatabaseError("Ürünleri listelemek için aktif bağlantı gerekli.")
-    cursor = None
-    try:
-        cursor = connection.cursor(dictionary=True)
-        # previous_selling_price ve last_updated sütunlarını da seçelim (listede göstermek için)
-        sql = """SELECT
-                    p.product_id, p.barcode, p.name, p.price_before_kdv, p.kdv_rate,
-                    p.selling_price, p.stock, p.is_active, p.category_id, p.min_stock_level,
-                    p.brand_id, b.name as brand_name,
-                    c.name as category_name,
-                    p.previous_selling_price, p.last_updated
-                 FROM products p
-                 LEFT JOIN categories c ON p.category_id = c.category_id
-                 LEFT JOIN brands b ON p.brand_id = b.brand_id
-                 """
-        if not include_inactive:
-            sql += " WHERE p.is_active = TRUE"
-        sql += " ORDER BY p.name ASC"
-        cursor.execute(sql)
-        return cursor.fetchall()
-    except Error as e:
-        raise DatabaseError(f"Ürünleri listeleme hatası: {e}") from e
-    finally:
-        if cursor:
-            cursor.close()
+    # previous_selling_price ve last_updated sütunlarını da seçelim (listede göstermek için)
+    sql = """SELECT
+                p.product_id, p.barcode, p.name, p.price_before_kdv, p.kdv_rate,
+                p.selling_price, p.stock, p.is_active, p.category_id, p.min_stock_level,
+                p.brand_id, b.name as brand_name,
+                c.name as category_name,
+                p.previous_selling_price, p.last_updated,
+                (SELECT GROUP_CONCAT(pb.barcode) FROM product_barcodes pb
+                  WHERE pb.product_id = p.product_id) as alias_barcodes
+             FROM products p
+             LEFT JOIN categories c ON p.category_id = c.category_id
+             LEFT JOIN brands b ON p.brand_id = b.brand_id
+             """
+    where_clauses = []
+    params = []
+    if not include_inactive:
+        where_clauses.append("p.is_active = TRUE")
+    if updated_since is not None:
+        where_clauses.append("p.last_updated >= %s")
+        params.append(updated_since)
+    if where_clauses:
+        sql += " WHERE " + " AND ".join(where_clauses)
+    sql += " ORDER BY p.name ASC"
+    return iter_rows(connection, sql, params, error_message="Ürünleri listeleme hatası")
+
+
+def get_products_page(connection, after=None, before=None, page_size=None, brand_id=None, category_id=None, active=True):
+    """
+    Ürün listesinin bir sayfasını (ad, ID sırasıyla) getirir; bkz. db_config.fetch_keyset_page.
+    Args:
+        after / before (tuple): Önceki sayfanın son / sonraki sayfanın ilk (ad, ID) değeri.
+        brand_id, category_id (int, optional): Verilirse sadece bu marka / kategorideki ürünler.
+        active (bool): True: sadece aktif, False: sadece pasif, None: tüm ürünler.
+    Returns:
+        dict: fetch_keyset_page sonucu; satırlar iter_products ile aynı sütunları içerir.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ürünleri listelemek için aktif bağlantı gerekli.")
+    sql = """SELECT
+                p.product_id, p.barcode, p.name, p.price_before_kdv, p.kdv_rate,
+                p.selling_price, p.stock, p.is_active, p.category_id, p.min_stock_level,
+                p.brand_id, b.name as brand_name,
+                c.name as category_name,
+                p.previous_selling_price, p.last_updated
+             FROM products p
+             LEFT JOIN categories c ON p.category_id = c.category_id
+             LEFT JOIN brands b ON p.brand_id = b.brand_id"""
+    where_clauses = []
+    params = []
+    if active is not None:
+        where_clauses.append("p.is_active = %s")
+        params.append(bool(active))
+    if brand_id is not None:
+        where_clauses.append("p.brand_id = %s")
+        params.append(brand_id)
+    if category_id is not None:
+        where_clauses.append("p.category_id = %s")
+        params.append(category_id)
+    return fetch_keyset_page(connection, sql, where_clauses, params,
+                             order_columns=("p.name", "p.product_id"), key_fields=("name", "product_id"),
+                             after=after, before=before, page_size=page_size,
+                             error_message="Ürünleri listeleme hatası")
+
+
+def list_all_products(connection, include_inactive=False):
+    """Veritabanındaki ürünleri listeler (kategori adı, marka adı ve min stok dahil)."""
+    return list(iter_products(connection, include_inactive))
 
 # === Stok ve Alış İşlemleri ===
 # ... (increase_stock, record_purchase, get_last_cost_price fonksiyonları - değişiklik yok) ...
@@ -378,18 +510,14 @@ def increase_stock(connection, product_id, quantity_increase):
         pass
 
 
-def record_purchase(connection, purchase_info: dict, items_list: list):
+def _record_purchase_tx(connection, purchase_info, items_list):
     """
-    Alış işlemini (başlık ve kalemler) veritabanına kaydeder ve stokları günceller.
-    items_list içindeki her item'da 'expiry_date' (YYYY-MM-DD veya None) olabilir.
-    Tek bir transaction içinde yapar.
+    record_purchase'in veritabanı işlemi (commit dahil). Hata olursa exception fırlatır.
+    Kilit çakışmasında db_config.run_transaction tarafından baştan tekrar çağrılabilir.
+    Returns:
+        int: Yeni alış ID'si
     """
-    if not items_list:
-        raise ValueError("Alış kaydı için en az bir ürün girilmelidir.")
-    if not connection or not connection.is_connected():
-        raise DatabaseError("Stok girişi için aktif bağlantı gerekli.")
     cursor = None
-    purchase_id = None
     try:
         cursor = connection.cursor()
 
@@ -424,6 +552,24 @@ def record_purchase(connection, purchase_info: dict, items_list: list):
                     f"Stok artırma hatası: Ürün ID {item['product_id']} bulunamadı!")
 
         connection.commit()
+        return purchase_id
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def record_purchase(connection, purchase_info: dict, items_list: list):
+    """
+    Alış işlemini (başlık ve kalemler) veritabanına kaydeder ve stokları günceller.
+    items_list içindeki her item'da 'expiry_date' (YYYY-MM-DD veya None) olabilir.
+    Tek bir transaction içinde yapar; deadlock / kilit bekleme hatasında otomatik tekrar denenir.
+    """
+    if not items_list:
+        raise ValueError("Alış kaydı için en az bir ürün girilmelidir.")
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Stok girişi için aktif bağlantı gerekli.")
+    try:
+        purchase_id = run_transaction(connection, _record_purchase_tx, purchase_info, items_list)
         rprint(
             f"[bold green]>>> Alış işlemi (ID: {purchase_id}) başarıyla kaydedildi ve stoklar güncellendi.[/]")
         return purchase_id
@@ -441,9 +587,6 @@ def record_purchase(connection, purchase_info: dict, items_list: list):
         if connection:
             connection.rollback()
         return None
-    finally:
-        if cursor:
-            cursor.close()
 
 
 def get_last_cost_price(connection, product_id):
@@ -476,6 +619,180 @@ def get_last_cost_price(connection, product_id):
             cursor.close()
 
 
+# === Ek Barkodlar ===
+# Bir ürünün ana barkodu (products.barcode) dışındaki barkodları: tedarikçinin yeniden etiketlediği
+# ürünler, koli/çoklu paket barkodları vb. Her barkod (ana veya ek) tek bir ürüne aittir.
+# Ek barkod değişince ürünün last_updated değeri de güncellenir; böylece ürün kataloğu
+# (urun_katalogu) artımlı yenilemede ek barkodları da günceller.
+
+def _touch_product(cursor, connection, product_id):
+    """Ürünün last_updated değerini şimdiki zaman yapar (commit çağırana aittir)."""
+    if getattr(connection, 'backend', 'mysql') == 'sqlite':
+        sql = "UPDATE products SET last_updated = datetime('now', 'localtime') WHERE product_id = %s"
+    else:
+        sql = "UPDATE products SET last_updated = CURRENT_TIMESTAMP WHERE product_id = %s"
+    cursor.execute(sql, (product_id,))
+
+
+def get_product_barcodes(connection, product_id):
+    """
+    Ürünün ek barkodlarını getirir.
+    Returns:
+        list: [{'barcode_id', 'barcode', 'description', 'created_at'}, ...] (barkoda göre sıralı)
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ek barkodları getirmek için aktif bağlantı gerekli.")
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""SELECT barcode_id, barcode, description, created_at
+                          FROM product_barcodes WHERE product_id = %s ORDER BY barcode""", (product_id,))
+        return cursor.fetchall()
+    except Error as e:
+        raise DatabaseError(
+            f"Ürün (ID: {product_id}) ek barkodlarını getirme hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def add_product_barcode(connection, product_id, barcode, description=None):
+    """
+    Ürüne ek barkod tanımlar.
+    Returns:
+        int: Eklenen kaydın barcode_id değeri.
+    Raises:
+        DuplicateEntryError: Barkod bir ürünün ana veya ek barkodu olarak zaten kayıtlıysa.
+        DatabaseError: Ürün bulunamazsa veya veritabanı hatasında.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ek barkod eklemek için aktif bağlantı gerekli.")
+    barcode = str(barcode).strip()
+    if not barcode:
+        raise ValueError("Barkod boş olamaz.")
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT product_id FROM products WHERE barcode = %s", (barcode,))
+        owner = cursor.fetchone()
+        if owner:
+            raise DuplicateEntryError(f"Barkod ({barcode}) ürün ID {owner[0]} için ana barkod olarak kayıtlı!")
+        cursor.execute("INSERT INTO product_barcodes (product_id, barcode, description) VALUES (%s, %s, %s)",
+                       (product_id, barcode, description))
+        barcode_id = cursor.lastrowid
+        _touch_product(cursor, connection, product_id)
+        connection.commit()
+        barkod.forget_missing(barcode)
+        return barcode_id
+    except Error as e:
+        connection.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            raise DuplicateEntryError(f"Barkod ({barcode}) zaten ek barkod olarak kayıtlı!") from e
+        if e.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+            raise DatabaseError(f"Ürün (ID: {product_id}) bulunamadı.") from e
+        raise DatabaseError(f"Ek barkod ({barcode}) ekleme hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def remove_product_barcode(connection, product_id, barcode):
+    """
+    Ürünün ek barkodunu siler.
+    Returns:
+        bool: Silindiyse True, ürünün böyle bir ek barkodu yoksa False.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ek barkod silmek için aktif bağlantı gerekli.")
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM product_barcodes WHERE product_id = %s AND barcode = %s",
+                       (product_id, barcode))
+        if cursor.rowcount != 1:
+            connection.rollback()
+            return False
+        _touch_product(cursor, connection, product_id)
+        connection.commit()
+        return True
+    except Error as e:
+        connection.rollback()
+        raise DatabaseError(f"Ek barkod ({barcode}) silme hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def _set_product_barcodes_tx(connection, product_id, wanted):
+    """
+    set_product_barcodes'ın veritabanı işlemi (commit dahil). Hata olursa exception fırlatır.
+    Kilit çakışmasında db_config.run_transaction tarafından baştan tekrar çağrılabilir.
+    Returns:
+        tuple: (eklenen barkodlar listesi, silinen sayısı)
+    """
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT barcode FROM product_barcodes WHERE product_id = %s", (product_id,))
+        current = {row[0] for row in cursor.fetchall()}
+        removed = 0
+        for barcode in current.difference(wanted):
+            cursor.execute("DELETE FROM product_barcodes WHERE product_id = %s AND barcode = %s",
+                           (product_id, barcode))
+            removed += cursor.rowcount
+        added = []
+        for barcode in wanted:
+            if barcode in current:
+                continue
+            cursor.execute("SELECT product_id FROM products WHERE barcode = %s", (barcode,))
+            owner = cursor.fetchone()
+            if owner:
+                raise DuplicateEntryError(f"Barkod ({barcode}) ürün ID {owner[0]} için ana barkod olarak kayıtlı!")
+            cursor.execute("INSERT INTO product_barcodes (product_id, barcode) VALUES (%s, %s)",
+                           (product_id, barcode))
+            added.append(barcode)
+        if added or removed:
+            _touch_product(cursor, connection, product_id)
+        connection.commit()
+        return added, removed
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def set_product_barcodes(connection, product_id, barcodes):
+    """
+    Ürünün ek barkodlarını verilen listeyle eşitler (listede olmayanlar silinir, yeniler eklenir).
+    Silme ve eklemeler tek işlemdir: herhangi bir hatada hiçbiri uygulanmaz.
+    Returns:
+        tuple: (eklenen sayısı, silinen sayısı)
+    Raises:
+        DuplicateEntryError: Eklenecek barkodlardan biri bir ürünün ana veya ek barkodu olarak kayıtlıysa.
+        DatabaseError: Ürün bulunamazsa veya veritabanı hatasında.
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ek barkodları güncellemek için aktif bağlantı gerekli.")
+    wanted = list(dict.fromkeys(str(b).strip() for b in barcodes if str(b).strip()))
+    try:
+        added, removed = run_transaction(connection, _set_product_barcodes_tx, product_id, wanted)
+    except DuplicateEntryError:
+        connection.rollback()
+        raise
+    except Error as e:
+        connection.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            raise DuplicateEntryError(f"Ek barkodlardan biri başka bir ürüne kayıtlı: {e}") from e
+        if e.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+            raise DatabaseError(f"Ürün (ID: {product_id}) bulunamadı.") from e
+        raise DatabaseError(f"Ürün (ID: {product_id}) ek barkodlarını güncelleme hatası: {e}") from e
+    except Exception:
+        connection.rollback()
+        raise
+    for barcode in added:
+        barkod.forget_missing(barcode)
+    return len(added), removed
+
+
 # === Ürün Aktif/Pasif Yapma ===
 # ... (deactivate_product, reactivate_product fonksiyonları - değişiklik yok) ...
 def deactivate_product(connection, product_id):
@@ -532,6 +849,7 @@ def reactivate_product(connection, product_id):
 
 # === Stok Raporu ===
 # ... (get_stock_report_data fonksiyonu - değişiklik yok) ...
+@report_query
 def get_stock_report_data(connection, stock_threshold=None, include_inactive=False, only_critical=False):
     """
     Stok raporu için ürün verilerini getirir (marka adı dahil).
@@ -733,6 +1051,89 @@ def get_order_suggestion_data(connection):
             except Error:
                  pass
 
+# === Ürün Analizi (urun_analiz) ===
+
+# get_product_analytics_rows satırlarındaki sütun sırası
+ANALYTICS_COLUMNS = ('product_id', 'barcode', 'name', 'selling_price', 'stock', 'min_stock_level',
+                     'category_id', 'brand_id', 'is_active', 'category_name', 'brand_name', 'last_cost')
+
+
+@report_query
+def get_product_analytics_rows(connection):
+    """
+    Ürün analizi için tüm ürünleri (pasifler dahil) son alış fiyatıyla birlikte tek sorguda getirir.
+    Returns:
+        list: ANALYTICS_COLUMNS sırasında demetler (sözlük oluşturulmaz; urun_analiz sütunlara çevirir).
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Ürün analizi için aktif bağlantı gerekli.")
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT p.product_id, p.barcode, p.name, p.selling_price, p.stock, p.min_stock_level,
+                   p.category_id, p.brand_id, p.is_active, c.name AS category_name, b.name AS brand_name,
+                   (SELECT pi.cost_price
+                      FROM purchase_items pi
+                      JOIN purchases pu ON pi.purchase_id = pu.purchase_id
+                     WHERE pi.product_id = p.product_id AND pi.cost_price IS NOT NULL
+                     ORDER BY pu.purchase_date DESC, pi.purchase_item_id DESC
+                     LIMIT 1) AS last_cost
+            FROM products p
+            LEFT JOIN categories c ON p.category_id = c.category_id
+            LEFT JOIN brands b ON p.brand_id = b.brand_id""")
+        return cursor.fetchall()
+    except Error as e:
+        raise DatabaseError(f"Ürün analizi verisi alma hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
+@report_query
+def get_purchase_history_for_products(connection, product_ids, per_product):
+    """
+    Verilen ürünlerin son alış kayıtlarını tek sorguda, her ürün için en yeniden eskiye sıralı getirir
+    (sipariş önerisinde ürün başına ayrı sorgu yerine). Ürün başına en yeni per_product kayıt döner;
+    bunların hiçbirinde alış fiyatı yoksa fiyatı olan en yeni kayıt da eklenir. Tüm geçmiş okunmaz
+    (pencere fonksiyonu: MySQL 8 / SQLite 3.25+).
+    Returns:
+        list: [{'product_id', 'cost_price', 'purchase_date', 'supplier_name'}, ...]
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Alış geçmişi için aktif bağlantı gerekli.")
+    product_ids = list(dict.fromkeys(product_ids))
+    if not product_ids:
+        return []
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        # recent_rank: ürünün tüm alışları içindeki sıra, costed_rank: fiyatlı / fiyatsız alışlar içindeki sıra
+        cursor.execute(f"""
+            SELECT product_id, cost_price, purchase_date, supplier_name
+            FROM (
+                SELECT pi.product_id, pi.cost_price, pu.purchase_date, s.name AS supplier_name,
+                       pi.purchase_item_id,
+                       ROW_NUMBER() OVER (PARTITION BY pi.product_id
+                                          ORDER BY pu.purchase_date DESC, pi.purchase_item_id DESC) AS recent_rank,
+                       ROW_NUMBER() OVER (PARTITION BY pi.product_id, pi.cost_price IS NULL
+                                          ORDER BY pu.purchase_date DESC, pi.purchase_item_id DESC) AS costed_rank
+                FROM purchase_items pi
+                JOIN purchases pu ON pi.purchase_id = pu.purchase_id
+                LEFT JOIN suppliers s ON pu.supplier_id = s.supplier_id
+                WHERE pi.product_id IN ({placeholders})
+            ) ranked
+            WHERE recent_rank <= %s OR (cost_price IS NOT NULL AND costed_rank = 1)
+            ORDER BY product_id, purchase_date DESC, purchase_item_id DESC""", product_ids + [per_product])
+        return cursor.fetchall()
+    except Error as e:
+        raise DatabaseError(f"Alış geçmişi alma hatası: {e}") from e
+    finally:
+        if cursor:
+            cursor.close()
+
+
 # ***** YENİ FONKSİYON: Etiket Verisi Getirme *****
 
 def get_product_details_for_label(connection, product_id):
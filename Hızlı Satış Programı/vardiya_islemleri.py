@@ -3,10 +3,14 @@
 # kullanıcı etkileşimlerini yönetir.
 # v2: handle_end_shift fonksiyonuna Z Raporu hesaplamaları eklendi.
 # v3: handle_end_shift fonksiyonuna Sipariş Önerisi Raporu eklendi.
+# v4: Vardiya bitince sorgu süre ölçümleri CSV dosyasına yazılıyor.
+# v5: NumPy yüklüyse sipariş önerisi urun_analiz ile hazırlanıyor (alış geçmişi ürün başına değil tek sorguda).
 
 import arayuz_yardimcilari as ui
 import vardiya_veritabani as shift_db_ops
 import urun_veritabani as product_db_ops  # Sipariş önerisi için eklendi
+import urun_analiz
+import sorgu_olcum  # Vardiya sonu sorgu süre ölçümleri için
 from hatalar import DatabaseError, UserInputError
 from decimal import Decimal, InvalidOperation
 from rich.console import Console
@@ -15,6 +19,20 @@ import datetime
 
 console = ui.console
 
+# === Yardımcı Fonksiyonlar ===
+
+def _dump_query_stats(shift_id):
+    """Vardiya boyunca toplanan sorgu süre ölçümlerini dosyaya yazar ve sıfırlar."""
+    try:
+        filename = sorgu_olcum.dump_stats(shift_id=shift_id)
+    except OSError as e:
+        console.print(f"[yellow]Uyarı: Sorgu ölçümleri dosyaya yazılamadı: {e}[/]")
+        return
+    if filename:
+        console.print(f"[dim]Sorgu süre ölçümleri kaydedildi: {filename}[/]")
+        sorgu_olcum.reset_stats()
+
+
 # === Handler Fonksiyonları ===
 # ... (handle_start_shift fonksiyonu - değişiklik yok) ...
 
@@ -142,8 +160,11 @@ def handle_end_shift(connection, user_id):
         # --- Sipariş Önerisi Raporu ---
         console.print("\n[dim]Sipariş önerisi raporu oluşturuluyor...[/]")
         try:
-            suggestion_data = product_db_ops.get_order_suggestion_data(
-                connection)
+            if urun_analiz.is_available():
+                suggestion_data = urun_analiz.get_order_suggestions(connection)
+            else:
+                suggestion_data = product_db_ops.get_order_suggestion_data(
+                    connection)
             if suggestion_data:
                 # Raporu göstermek için arayuz_yardimcilari'ndaki fonksiyonu çağır
                 ui.display_order_suggestion_report(suggestion_data)
@@ -171,6 +192,8 @@ def handle_end_shift(connection, user_id):
             # Vardiya bitince ana programdaki active_shift_id'nin None yapılması gerekiyor.
             # Bu fonksiyonun bir değer döndürmesi veya ana programın kontrol etmesi lazım.
             # Şimdilik ana program kontrol ediyor (hizli_satis.py'da v0 sonrası kontrol var).
+            if success:
+                _dump_query_stats(shift_id)
         else:
             console.print("Vardiya bitirme işlemi iptal edildi.",
                           style="yellow")
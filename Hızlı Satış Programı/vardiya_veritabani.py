@@ -1,11 +1,13 @@
 # vardiya_veritabani.py
 # Vardiyalarla (shifts) ilgili veritabanı işlemlerini içerir.
 # v2: get_shift_customer_payments_summary fonksiyonu aktifleştirildi.
+# v3: Vardiya özetleri (Z raporu) salt okunur işlemde çalışıyor (db_config.read_only_report).
 
 from mysql.connector import Error, errorcode
 from decimal import Decimal
 import datetime
 from hatalar import DatabaseError, DuplicateEntryError
+from db_config import read_only_report  # Z raporu güncel olmalı: okuma kopyası değil, ana sunucu
 from rich import print as rprint
 import arayuz_yardimcilari as ui  # console nesnesi için
 
@@ -181,6 +183,7 @@ def get_shift_by_id(connection, shift_id):
 # === Vardiya Özeti Hesaplama Fonksiyonları (Z Raporu için) ===
 
 
+@read_only_report
 def get_shift_sales_summary(connection, shift_id):
     """Belirli bir vardiyadaki satışların özetini (ödeme türüne göre) hesaplar."""
     if not connection or not connection.is_connected():
@@ -240,6 +243,7 @@ def get_shift_sales_summary(connection, shift_id):
             cursor.close()
 
 
+@read_only_report
 def get_shift_customer_payments_summary(connection, shift_id):
     """Belirli bir vardiyada alınan müşteri ödemelerinin özetini (ödeme türüne göre) hesaplar."""
     if not connection or not connection.is_connected():
@@ -1,16 +1,23 @@
 # veri_aktarim.py
 # Veri içe aktarma ve dışa aktarma işlemlerini yönetir (CSV, Excel vb.)
 # v55: Hata importları eklendi, decimal dönüşüm sağlamlaştırıldı.
+# v56: Ürün dışa aktarma, olmayan get_products_for_export yerine akışlı iter_products kullanıyor;
+#      ürünler okunurken dosyaya yazılır, tüm katalog bellekte tutulmaz.
+# v57: Ürünlerin ek barkodları isteğe bağlı "EkBarkodlar" sütunuyla (virgülle ayrılmış) dışa/içe aktarılıyor.
+#      Sütunu olmayan eski dosyalar aynen içe aktarılır; ek barkodlara dokunulmaz.
+# v58: Stok ondalıklı (terazi ürünleri, ör. 12,5 kg) içe aktarılabiliyor.
+# v59: İçe aktarmada marka ve kategori adları satır başına sorgu yerine bellekteki indeksten (referans_onbellek)
+#      çözülüyor (olmayan kategori_veritabani.get_category_by_name çağrısı da kaldırıldı).
 
 import csv
 from decimal import Decimal, InvalidOperation
 import datetime
+import itertools
 from rich import print as rprint  # Kullanıcıya mesaj vermek için
 # Gerekli hata sınıflarını import edelim
 from hatalar import DatabaseError, DuplicateEntryError, SaleIntegrityError, UserInputError
 import urun_veritabani as product_db_ops
-import marka_veritabani as brand_db_ops
-import kategori_veritabani as category_db_ops
+import referans_onbellek
 import re  # Sayısal değerleri temizlemek için eklendi
 
 # CSV Dosyası için kullanılacak standart başlıklar
@@ -19,6 +26,8 @@ CSV_HEADERS = [
     "KDVHaricSatisFiyati", "KDVOra", "KDVDahilSatisFiyati",
     "MinStok", "Aktif"
 ]
+# İsteğe bağlı sütun: dışa aktarmada her zaman yazılır, içe aktarmada yoksa ek barkodlar değiştirilmez
+ALIAS_BARCODES_HEADER = "EkBarkodlar"
 
 
 def _clean_numeric_string(num_str):
@@ -33,39 +42,58 @@ def _clean_numeric_string(num_str):
     return cleaned
 
 
+def _split_alias_barcodes(value):
+    """"EkBarkodlar" hücresini barkod listesine çevirir (virgül veya boşlukla ayrılmış)."""
+    return [b for b in re.split(r"[,\s]+", value or "") if b]
+
+
+def _import_alias_barcodes(connection, product_id, alias_barcodes, row_num):
+    """Satırdaki ek barkodları ürüne uygular; hata olursa hiçbiri uygulanmaz, uyarı verilir, satırın geri kalanı geçerli kalır."""
+    try:
+        product_db_ops.set_product_barcodes(connection, product_id, alias_barcodes)
+    except (DatabaseError, ValueError, DuplicateEntryError) as alias_err:
+        rprint(
+            f"[yellow]Satır {row_num}: Ek barkodlar uygulanamadı (Ürün ID: {product_id}): {alias_err}[/]")
+
+
 def export_products_to_csv(connection, filename="urun_listesi.csv"):
     """
-    Mevcut ürün verilerini (belirlenen sütunlarla) bir CSV dosyasına aktarır.
+    Mevcut ürün verilerini (belirlenen sütunlarla, pasifler dahil) bir CSV dosyasına aktarır.
+    Ürünler veritabanından parça parça okunup yazıldığı için bellek kullanımı katalog boyutundan bağımsızdır.
     """
     try:
-        products_data = product_db_ops.get_products_for_export(connection)
-        if not products_data:
+        products_data = product_db_ops.iter_products(connection, include_inactive=True)
+        first_item = next(products_data, None)
+        if first_item is None:
             rprint("[yellow]Dışa aktarılacak ürün bulunamadı.[/]")
             return False
 
+        exported_count = 0
         with open(filename, mode='w', newline='', encoding='utf-8-sig') as file:
             writer = csv.writer(file, delimiter=';')
-            writer.writerow(CSV_HEADERS)
+            writer.writerow(CSV_HEADERS + [ALIAS_BARCODES_HEADER])
 
-            for item in products_data:
+            for item in itertools.chain((first_item,), products_data):
                 is_active_str = "Evet" if item.get('is_active') else "Hayir"
                 row_data = [
                     item.get('barcode', ''),
                     item.get('name', ''),
                     item.get('brand_name', ''),
                     item.get('category_name', ''),
-                    str(item.get('stock', '')),
                     # Ondalık ayracı Excel için virgül yapalım
+                    str(item.get('stock', '')).replace('.', ','),
                     str(item.get('price_before_kdv', '')).replace('.', ','),
                     str(item.get('kdv_rate', '')).replace('.', ','),
                     str(item.get('selling_price', '')).replace('.', ','),
                     str(item.get('min_stock_level', '')),
-                    is_active_str
+                    is_active_str,
+                    item.get('alias_barcodes') or ''
                 ]
                 writer.writerow(row_data)
+                exported_count += 1
 
         rprint(
-            f"[bold green]>>> {len(products_data)} ürün başarıyla '{filename}' dosyasına aktarıldı.[/]")
+            f"[bold green]>>> {exported_count} ürün başarıyla '{filename}' dosyasına aktarıldı.[/]")
         return True
 
     except FileNotFoundError:
@@ -107,6 +135,8 @@ def import_products_from_csv(connection, filename):
                     f"[dim]Dosyadaki başlıklar: {';'.join(reader.fieldnames if reader.fieldnames else [])}[/]")
                 return 0, 0, 0
 
+            has_alias_column = ALIAS_BARCODES_HEADER in reader.fieldnames
+
             rprint(f"'{filename}' dosyasından içe aktarma işlemi başlatıldı...")
 
             for row_num, row in enumerate(reader, start=2):
@@ -129,6 +159,8 @@ def import_products_from_csv(connection, filename):
                         row.get(CSV_HEADERS[8], "0"))
                     is_active_str = row.get(
                         CSV_HEADERS[9], "Evet").strip().lower()
+                    alias_barcodes = _split_alias_barcodes(
+                        row.get(ALIAS_BARCODES_HEADER)) if has_alias_column else None
 
                     if not barcode:
                         rprint(
@@ -142,7 +174,7 @@ def import_products_from_csv(connection, filename):
                         continue
 
                     try:
-                        stock = int(stock_str) if stock_str else 0
+                        stock = Decimal(stock_str) if stock_str else Decimal('0')
                         price_before_kdv = Decimal(
                             price_before_kdv_str) if price_before_kdv_str else Decimal('0.00')
                         kdv_rate = Decimal(
@@ -174,7 +206,7 @@ def import_products_from_csv(connection, filename):
 
                     brand_id = None
                     if brand_name:
-                        brand_data = brand_db_ops.get_brand_by_name(
+                        brand_data = referans_onbellek.get_brand_by_name(
                             connection, brand_name)
                         if brand_data:
                             brand_id = brand_data.get('brand_id')
@@ -184,7 +216,7 @@ def import_products_from_csv(connection, filename):
 
                     category_id = None
                     if category_name:
-                        category_data = category_db_ops.get_category_by_name(
+                        category_data = referans_onbellek.get_category_by_name(
                             connection, category_name)
                         if category_data:
                             category_id = category_data.get('category_id')
@@ -219,6 +251,12 @@ def import_products_from_csv(connection, filename):
                                 # rprint(f"[dim]Satır {row_num}: Ürün (Barkod: {barcode}) güncellenmedi (Belki bilgi aynı?).[/dim]")
                                 # Eğer bilgi aynıysa atlanmış saymayalım. Şimdilik bir şey yapma.
                                 pass
+                            if alias_barcodes is not None:
+                                # Satır ürünü ek barkoduyla bulduysa o barkod silinmesin
+                                if existing_product.get('barcode') != barcode and barcode not in alias_barcodes:
+                                    alias_barcodes.append(barcode)
+                                _import_alias_barcodes(
+                                    connection, product_id, alias_barcodes, row_num)
 
                         # Hata yakalama güncellendi
                         except (DatabaseError, ValueError, DuplicateEntryError) as upd_err:
@@ -235,6 +273,9 @@ def import_products_from_csv(connection, filename):
                                 if not is_active:
                                     product_db_ops.deactivate_product(
                                         connection, new_id)
+                                if alias_barcodes:
+                                    _import_alias_barcodes(
+                                        connection, new_id, alias_barcodes, row_num)
                                 added_count += 1
                             else:
                                 rprint(
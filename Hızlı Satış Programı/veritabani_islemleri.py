@@ -3,6 +3,13 @@
 # ... (Önceki versiyon notları) ...
 # v49: finalize_sale ve process_sale_return fonksiyonlarına user_id parametresi ve loglama eklendi.
 # v52: finalize_sale fonksiyonundaki INSERT INTO sales sorgusundan user_id sütunu kaldırıldı.
+# v53: finalize_sale INSERT/UPDATE sorguları hazir_sorgular üzerinden (prepared statement) çalıştırılıyor.
+# v54: Rapor fonksiyonları report_query ile okuma kopyasına (varsa) yönlendiriliyor.
+# v55: Sadakat puanı katsayısı sabit yerine config.ini [loyalty] points_per_tl ayarından okunuyor.
+# v56: finalize_sale ve process_sale_return deadlock / kilit bekleme hatasında run_transaction ile tekrar deneniyor.
+# v57: Satış kalemlerine tahsil edilen satır tutarı (sale_items.line_total) yazılıyor; ciro raporları ve iade
+#      detayı bu tutarı kullanıyor (eski kayıtlarda miktar x fiyat).
+#      Sütun şema sürüm 9 ile eklenir; program açılışta sema_yonetimi.ensure_current ile bunu denetler.
 
 from mysql.connector import Error
 from decimal import Decimal, InvalidOperation
@@ -14,6 +21,9 @@ import urun_veritabani as product_db_ops  # Stok güncelleme için
 import musteri_veritabani as customer_db_ops  # Bakiye, puan, kupon için
 import arayuz_yardimcilari as ui  # console nesnesi için
 import loglama  # Loglama için import edildi
+import hazir_sorgular  # Sık kullanılan sorgular için prepared statement kaydı
+from db_config import report_query, run_transaction  # Rapor yönlendirme, çakışmada tekrar denenen işlemler
+import ayarlar  # config.ini ayarları
 
 # console nesnesini alalım
 try:
@@ -28,6 +38,155 @@ except AttributeError:
 # === Satış İşlemleri ===
 
 # ***** BU FONKSİYON GÜNCELLENDİ (user_id sütunu INSERT sorgusundan kaldırıldı) *****
+def _finalize_sale_tx(connection, cart, sale_subtotal, customer_id, payments,
+                      applied_coupon_id, discount_amount, applied_promotion_id, promotion_discount,
+                      final_total_amount, free_items_for_stock, shift_id):
+    """
+    finalize_sale'in veritabanı işlemi (commit dahil). Hata olursa exception fırlatır.
+    Deadlock / kilit bekleme hatasında db_config.run_transaction tarafından baştan tekrar çağrılır,
+    bu yüzden cart ve payments listelerini değiştirmez.
+    Returns:
+        tuple: (sale_id, log detayı)
+    """
+    # 1. Satış Başlığını (sales) Ekle
+    # ***** DEĞİŞİKLİK BURADA: SQL sorgusundan user_id kaldırıldı *****
+    sql_insert_sale = """
+        INSERT INTO sales (customer_id, shift_id, total_amount, discount_amount, promotion_discount, applied_customer_coupon_id, applied_promotion_id, status)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, 'completed')
+        """
+    # ***** DEĞİŞİKLİK BURADA: Parametrelerden user_id (3. sıradaki) kaldırıldı *****
+    sale_params = (customer_id, shift_id, final_total_amount,
+                   discount_amount, promotion_discount, applied_coupon_id, applied_promotion_id)
+    _, sale_id = hazir_sorgular.execute(
+        connection, 'satis.ekle', sql_insert_sale, sale_params)
+    if not sale_id:
+        raise DatabaseError("Yeni satış ID'si alınamadı!")
+
+    # 2. Satış Kalemlerini (sale_items) Ekle ve Stokları Düşür (Satılan Ürünler)
+    # line_total sütunu şema sürüm 9 gerektirir (açılıştaki şema kontrolü eksikse programı başlatmaz)
+    sql_insert_item = """
+        INSERT INTO sale_items (sale_id, product_id, quantity, price_at_sale, line_total)
+        VALUES (%s, %s, %s, %s, %s)
+        """
+    sql_update_stock = """
+        UPDATE products SET stock = stock - %s WHERE product_id = %s
+        """
+    product_details_for_log = []  # Log için ürün detayları
+    for item in cart:
+        # Satır tutarı sepette ve fişte gösterilenle aynıdır (fiyatlı terazi barkodunda barkoddaki tutar)
+        item_params = (sale_id, item['product_id'],
+                       item['quantity'], item['price_at_sale'], ui.get_line_total(item))
+        hazir_sorgular.execute(
+            connection, 'satis.kalem_ekle', sql_insert_item, item_params)
+        stock_params = (item['quantity'], item['product_id'])
+        updated_rows, _ = hazir_sorgular.execute(
+            connection, 'urun.stok_dus', sql_update_stock, stock_params)
+        if updated_rows == 0:
+            raise SaleIntegrityError(
+                f"Stok düşürme hatası: Ürün ID {item['product_id']} bulunamadı veya stok yetersiz!")
+        product_details_for_log.append(
+            f"({item['product_id']}:{item['quantity']})")
+
+    # 2.1 Stokları Düşür (Bedava Verilen Ürünler - Promosyon)
+    free_product_details_for_log = []  # Log için bedava ürün detayları
+    if free_items_for_stock:
+        for free_item in free_items_for_stock:
+            free_product_id = free_item.get('product_id')
+            free_quantity = free_item.get('quantity')
+            if free_product_id and free_quantity and free_quantity > 0:
+                stock_params = (free_quantity, free_product_id)
+                updated_rows, _ = hazir_sorgular.execute(
+                    connection, 'urun.stok_dus', sql_update_stock, stock_params)
+                if updated_rows == 0:
+                    raise SaleIntegrityError(
+                        f"Promosyonlu bedava ürün stok düşürme hatası: Ürün ID {free_product_id} bulunamadı veya stok yetersiz!")
+                else:
+                    rprint(
+                        f"[dim]Promosyon: {free_quantity} adet (ID: {free_product_id}) stoğu düşüldü.[/]")
+                    free_product_details_for_log.append(
+                        f"({free_product_id}:{free_quantity} Bedava)")
+
+    # 3. Ödemeleri (payments) Ekle
+    # Bu sütun adı payments tablosunda doğru varsayılıyor
+    payment_amount_column_name = 'amount_paid'
+    sql_insert_payment = f"""
+        INSERT INTO payments (sale_id, payment_method, {payment_amount_column_name})
+        VALUES (%s, %s, %s)
+        """
+    total_paid_amount = Decimal('0.00')
+    is_veresiye = False
+    veresiye_amount = Decimal('0.00')
+    payment_details_for_log = []  # Log için ödeme detayları
+    for i, payment in enumerate(payments):
+        try:
+            if not isinstance(payment, dict):
+                raise TypeError(
+                    f"Ödeme listesindeki {i+1}. öğe bir sözlük değil: {payment}")
+            payment_value = payment.get('amount')
+            payment_method = payment.get('method')
+            if payment_value is None:
+                raise ValueError(
+                    f"Ödeme listesindeki {i+1}. öğede ({payment_method}) 'amount' anahtarı bulunamadı.")
+            if payment_method is None:
+                raise ValueError(
+                    f"Ödeme listesindeki {i+1}. öğede 'method' anahtarı bulunamadı.")
+
+            pay_params = (sale_id, payment_method, payment_value)
+            hazir_sorgular.execute(
+                connection, 'satis.odeme_ekle', sql_insert_payment, pay_params)
+            total_paid_amount += payment_value
+            payment_details_for_log.append(
+                f"{payment_method}:{payment_value:.2f}")
+            if payment_method == 'Veresiye':
+                is_veresiye = True
+                veresiye_amount = payment_value
+        except (TypeError, ValueError, KeyError) as payment_err:
+            raise ValueError(
+                f"Ödeme işlenirken hata (Öğe {i+1}: {payment}): {payment_err}") from payment_err
+        except Error as db_payment_err:
+            # Ödeme eklerken DB hatası olursa yakala (örn: amount_paid sütunu yoksa)
+            if 'amount_paid' in str(db_payment_err).lower() and 'unknown column' in str(db_payment_err).lower():
+                 raise DatabaseError(
+                     f"'payments' tablosunda 'amount_paid' sütunu bulunamadı veya adı farklı.") from db_payment_err
+            else:
+                 raise DatabaseError(f"Ödeme kaydı sırasında veritabanı hatası: {db_payment_err}") from db_payment_err
+
+    # 4. Müşteri İşlemleri (varsa)
+    if customer_id:
+        if is_veresiye:
+            if not customer_db_ops.update_customer_balance(connection, customer_id, veresiye_amount):
+                raise SaleIntegrityError(
+                    f"Müşteri (ID: {customer_id}) veresiye bakiye güncelleme hatası!")
+        points_to_add = 0
+        try:
+            points_per_tl = ayarlar.get_settings().loyalty.points_per_tl
+            points_to_add = int(sale_subtotal * points_per_tl)
+        except (ValueError, InvalidOperation):
+            points_to_add = 0
+        if points_to_add > 0:
+            if not customer_db_ops.add_loyalty_points(connection, customer_id, points_to_add, f"Satış ID: {sale_id}"):
+                rprint(
+                    f"[yellow]Uyarı: Müşteri (ID: {customer_id}) için sadakat puanı eklenemedi.[/]")
+        if applied_coupon_id:
+            if not customer_db_ops.use_customer_coupon(connection, applied_coupon_id, sale_id):
+                raise SaleIntegrityError(
+                    f"Kullanılan kupon (ID: {applied_coupon_id}) durumu güncellenemedi!")
+
+    # 5. Her şey yolundaysa COMMIT
+    connection.commit()
+
+    # Log detayı (loglama commit sonrası finalize_sale'de yapılır)
+    log_details = (
+        f"Satış ID: {sale_id}, Müşteri ID: {customer_id if customer_id else 'Yok'}, "
+        f"Tutar: {final_total_amount:.2f}, Ödemeler: [{', '.join(payment_details_for_log)}], "
+        f"İndirim: {discount_amount:.2f}, Kupon ID: {applied_coupon_id if applied_coupon_id else 'Yok'}, "
+        f"Promo İnd: {promotion_discount:.2f}, Promo ID: {applied_promotion_id if applied_promotion_id else 'Yok'}, "
+        f"Ürünler: [{', '.join(product_details_for_log)}]"
+        f"{', Bedava: [' + ', '.join(free_product_details_for_log) + ']' if free_product_details_for_log else ''}"
+    )
+    return sale_id, log_details
+
+
 def finalize_sale(connection, cart: list, sale_subtotal: Decimal, customer_id: int | None, payments: list,
                   applied_coupon_id: int | None, discount_amount: Decimal,
                   applied_promotion_id: int | None, promotion_discount: Decimal,
@@ -53,147 +212,19 @@ def finalize_sale(connection, cart: list, sale_subtotal: Decimal, customer_id: i
         # Loglama için user_id hala gerekli, bu yüzden kontrol kalsın.
         raise ValueError("Loglama için kullanıcı ID'si gereklidir.")
 
-    cursor = None
-    sale_id = None
     final_total_amount = sale_subtotal - discount_amount - promotion_discount
     if final_total_amount < Decimal('0.00'):
         final_total_amount = Decimal('0.00')
 
     try:
-        cursor = connection.cursor()
-
-        # 1. Satış Başlığını (sales) Ekle
-        # ***** DEĞİŞİKLİK BURADA: SQL sorgusundan user_id kaldırıldı *****
-        sql_insert_sale = """
-            INSERT INTO sales (customer_id, shift_id, total_amount, discount_amount, promotion_discount, applied_customer_coupon_id, applied_promotion_id, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, 'completed')
-            """
-        # ***** DEĞİŞİKLİK BURADA: Parametrelerden user_id (3. sıradaki) kaldırıldı *****
-        sale_params = (customer_id, shift_id, final_total_amount,
-                       discount_amount, promotion_discount, applied_coupon_id, applied_promotion_id)
-        cursor.execute(sql_insert_sale, sale_params)
-        sale_id = cursor.lastrowid
-        if not sale_id:
-            raise DatabaseError("Yeni satış ID'si alınamadı!")
-
-        # 2. Satış Kalemlerini (sale_items) Ekle ve Stokları Düşür (Satılan Ürünler)
-        sql_insert_item = """
-            INSERT INTO sale_items (sale_id, product_id, quantity, price_at_sale)
-            VALUES (%s, %s, %s, %s)
-            """
-        sql_update_stock = """
-            UPDATE products SET stock = stock - %s WHERE product_id = %s
-            """
-        product_details_for_log = []  # Log için ürün detayları
-        for item in cart:
-            item_params = (sale_id, item['product_id'],
-                           item['quantity'], item['price_at_sale'])
-            cursor.execute(sql_insert_item, item_params)
-            stock_params = (item['quantity'], item['product_id'])
-            cursor.execute(sql_update_stock, stock_params)
-            if cursor.rowcount == 0:
-                raise SaleIntegrityError(
-                    f"Stok düşürme hatası: Ürün ID {item['product_id']} bulunamadı veya stok yetersiz!")
-            product_details_for_log.append(
-                f"({item['product_id']}:{item['quantity']})")
-
-        # 2.1 Stokları Düşür (Bedava Verilen Ürünler - Promosyon)
-        free_product_details_for_log = []  # Log için bedava ürün detayları
-        if free_items_for_stock:
-            for free_item in free_items_for_stock:
-                free_product_id = free_item.get('product_id')
-                free_quantity = free_item.get('quantity')
-                if free_product_id and free_quantity and free_quantity > 0:
-                    stock_params = (free_quantity, free_product_id)
-                    cursor.execute(sql_update_stock, stock_params)
-                    if cursor.rowcount == 0:
-                        raise SaleIntegrityError(
-                            f"Promosyonlu bedava ürün stok düşürme hatası: Ürün ID {free_product_id} bulunamadı veya stok yetersiz!")
-                    else:
-                        rprint(
-                            f"[dim]Promosyon: {free_quantity} adet (ID: {free_product_id}) stoğu düşüldü.[/]")
-                        free_product_details_for_log.append(
-                            f"({free_product_id}:{free_quantity} Bedava)")
-
-        # 3. Ödemeleri (payments) Ekle
-        # Bu sütun adı payments tablosunda doğru varsayılıyor
-        payment_amount_column_name = 'amount_paid'
-        sql_insert_payment = f"""
-            INSERT INTO payments (sale_id, payment_method, {payment_amount_column_name})
-            VALUES (%s, %s, %s)
-            """
-        total_paid_amount = Decimal('0.00')
-        is_veresiye = False
-        veresiye_amount = Decimal('0.00')
-        payment_details_for_log = []  # Log için ödeme detayları
-        for i, payment in enumerate(payments):
-            try:
-                if not isinstance(payment, dict):
-                    raise TypeError(
-                        f"Ödeme listesindeki {i+1}. öğe bir sözlük değil: {payment}")
-                payment_value = payment.get('amount')
-                payment_method = payment.get('method')
-                if payment_value is None:
-                    raise ValueError(
-                        f"Ödeme listesindeki {i+1}. öğede ({payment_method}) 'amount' anahtarı bulunamadı.")
-                if payment_method is None:
-                    raise ValueError(
-                        f"Ödeme listesindeki {i+1}. öğede 'method' anahtarı bulunamadı.")
-
-                pay_params = (sale_id, payment_method, payment_value)
-                cursor.execute(sql_insert_payment, pay_params)
-                total_paid_amount += payment_value
-                payment_details_for_log.append(
-                    f"{payment_method}:{payment_value:.2f}")
-                if payment_method == 'Veresiye':
-                    is_veresiye = True
-                    veresiye_amount = payment_value
-            except (TypeError, ValueError, KeyError) as payment_err:
-                raise ValueError(
-                    f"Ödeme işlenirken hata (Öğe {i+1}: {payment}): {payment_err}") from payment_err
-            except Error as db_payment_err:
-                # Ödeme eklerken DB hatası olursa yakala (örn: amount_paid sütunu yoksa)
-                if 'amount_paid' in str(db_payment_err).lower() and 'unknown column' in str(db_payment_err).lower():
-                     raise DatabaseError(
-                         f"'payments' tablosunda 'amount_paid' sütunu bulunamadı veya adı farklı.") from db_payment_err
-                else:
-                     raise DatabaseError(f"Ödeme kaydı sırasında veritabanı hatası: {db_payment_err}") from db_payment_err
-
-        # 4. Müşteri İşlemleri (varsa)
-        if customer_id:
-            if is_veresiye:
-                if not customer_db_ops.update_customer_balance(connection, customer_id, veresiye_amount):
-                    raise SaleIntegrityError(
-                        f"Müşteri (ID: {customer_id}) veresiye bakiye güncelleme hatası!")
-            points_to_add = 0
-            try:
-                # TODO: config.ini'den puan katsayısını okuyacak mekanizma eklenebilir.
-                # Şimdilik sabit bırakalım.
-                config_points_per_tl = Decimal('0.1')  # Örnek değer
-                points_to_add = int(sale_subtotal * config_points_per_tl)
-            except (ValueError, InvalidOperation):
-                points_to_add = 0
-            if points_to_add > 0:
-                if not customer_db_ops.add_loyalty_points(connection, customer_id, points_to_add, f"Satış ID: {sale_id}"):
-                    rprint(
-                        f"[yellow]Uyarı: Müşteri (ID: {customer_id}) için sadakat puanı eklenemedi.[/]")
-            if applied_coupon_id:
-                if not customer_db_ops.use_customer_coupon(connection, applied_coupon_id, sale_id):
-                    raise SaleIntegrityError(
-                        f"Kullanılan kupon (ID: {applied_coupon_id}) durumu güncellenemedi!")
-
-        # 5. Her şey yolundaysa COMMIT
-        connection.commit()
+        # 1-5. Satış başlığı, kalemler, stok, ödemeler, müşteri işlemleri ve COMMIT
+        # (kilit çakışmasında sepet korunarak otomatik tekrar denenir)
+        sale_id, log_details = run_transaction(
+            connection, _finalize_sale_tx, cart, sale_subtotal, customer_id, payments,
+            applied_coupon_id, discount_amount, applied_promotion_id, promotion_discount,
+            final_total_amount, free_items_for_stock, shift_id)
 
         # 6. Loglama (Commit sonrası)
-        log_details = (
-            f"Satış ID: {sale_id}, Müşteri ID: {customer_id if customer_id else 'Yok'}, "
-            f"Tutar: {final_total_amount:.2f}, Ödemeler: [{', '.join(payment_details_for_log)}], "
-            f"İndirim: {discount_amount:.2f}, Kupon ID: {applied_coupon_id if applied_coupon_id else 'Yok'}, "
-            f"Promo İnd: {promotion_discount:.2f}, Promo ID: {applied_promotion_id if applied_promotion_id else 'Yok'}, "
-            f"Ürünler: [{', '.join(product_details_for_log)}]"
-            f"{', Bedava: [' + ', '.join(free_product_details_for_log) + ']' if free_product_details_for_log else ''}"
-        )
         loglama.log_activity(connection, user_id,  # Loglama için user_id hala kullanılıyor
                              loglama.LOG_ACTION_SALE_COMPLETE, log_details)
 
@@ -218,9 +249,6 @@ def finalize_sale(connection, cart: list, sale_subtotal: Decimal, customer_id: i
         # Hata durumunda loglama (isteğe bağlı)
         # loglama.log_activity(connection, user_id, "SATIS_BEKLENMEDIK_HATA", f"Hata: {genel_hata}")
         return None
-    finally:
-        if cursor:
-            cursor.close()
 
 # === Satış İade İşlemleri ===
 # ... (get_sale_details_for_return, process_sale_return fonksiyonları aynı) ...
@@ -253,16 +281,17 @@ def get_sale_details_for_return(connection, sale_id):
                 f">>> HATA: Sadece 'tamamlanmış' satışlar iade edilebilir (Durum: {sale_header['status']}).", style="red")
             return None
 
-        sql_items = """SELECT si.product_id, p.name, si.quantity, si.price_at_sale
+        sql_items = """SELECT si.product_id, p.name, si.quantity, si.price_at_sale,
+                              COALESCE(si.line_total, ROUND(si.quantity * si.price_at_sale, 2)) AS line_total
                        FROM sale_items si
                        JOIN products p ON si.product_id = p.product_id
                        WHERE si.sale_id = %s"""
         cursor.execute(sql_items, (sale_id,))
         sale_items = cursor.fetchall()
-        # Eğer sale_items tuple yerine dict dönüyorsa bu satır çalışır
-        # sale_items_tuples = [(item['product_id'], item['name'], item['quantity'], item['price_at_sale']) for item in sale_items]
-        # Eğer tuple dönüyorsa:
-        sale_items_tuples = sale_items  # Doğrudan ata
+        # İmleç dictionary=True olduğu için satırlar sözlük döner; iade ekranı ve _process_sale_return_tx
+        # (product_id, name, quantity, price_at_sale, line_total) demetlerini bekler
+        sale_items_tuples = [(item['product_id'], item['name'], item['quantity'], item['price_at_sale'],
+                              item['line_total']) for item in sale_items]
 
         # Müşteri bilgisini de ekleyelim (loglama vb. için lazım olabilir)
         sale_header['user_id'] = None  # user_id artık okunmadığı için None atıyoruz
@@ -293,31 +322,15 @@ def get_sale_details_for_return(connection, sale_id):
             cursor.close()
 
 
-def process_sale_return(connection, sale_id, sale_details, reason=None, notes=None, user_id: int | None = None):  # user_id loglama için
+def _process_sale_return_tx(connection, sale_id, customer_id, items, return_amount, used_coupon_id,
+                            reason, notes):
     """
-    Satış iade işlemini gerçekleştirir ve loglar: Stokları geri alır, bakiyeyi günceller,
-    satış ve ödeme durumlarını günceller, iade kaydı oluşturur.
-    Tek bir transaction içinde yapar.
-    Args:
-        user_id (int | None): İşlemi yapan kullanıcı ID'si (loglama için).
-        ... (diğer parametreler) ...
+    process_sale_return'ün veritabanı işlemi (commit dahil). Hata olursa exception fırlatır.
+    Kilit çakışmasında db_config.run_transaction tarafından baştan tekrar çağrılabilir.
+    Returns:
+        tuple: (return_id, log için ürün detayları listesi)
     """
-    if not connection or not connection.is_connected():
-        raise DatabaseError("Satış iadesi için aktif bağlantı gerekli.")
-    if not sale_details or 'header' not in sale_details or 'items' not in sale_details:
-        raise ValueError("İade için geçerli satış detayı gerekli.")
-    if user_id is None:
-        raise ValueError("Loglama için kullanıcı ID'si gereklidir.")
-
-    header = sale_details['header']
-    items = sale_details['items']
-    customer_id = header.get('customer_id')
-    return_amount = header.get('total_amount', Decimal('0.00'))
-    used_coupon_id = header.get('applied_customer_coupon_id')
-    # original_user_id = header.get('user_id') # Bu bilgi artık header'da olmayabilir, loglama için user_id kullanılıyor
-
     cursor = None
-    return_id = None
     try:
         cursor = connection.cursor()
 
@@ -344,7 +357,7 @@ def process_sale_return(connection, sale_id, sale_details, reason=None, notes=No
         sql_update_stock = "UPDATE products SET stock = stock + %s WHERE product_id = %s"
         product_details_for_log = []
         for item_tuple in items:
-            # item_tuple'ın (product_id, name, quantity, price_at_sale) formatında olduğunu varsayıyoruz
+            # item_tuple'ın (product_id, name, quantity, price_at_sale, line_total) formatında olduğunu varsayıyoruz
             if len(item_tuple) >= 3: # En az 3 eleman varsa
                 product_id, _, quantity = item_tuple[:3]  # Sadece ilk 3 elemanı al
                 stock_params = (quantity, product_id)
@@ -380,13 +393,48 @@ def process_sale_return(connection, sale_id, sale_details, reason=None, notes=No
         except Error as payment_err:
             if 'status' in str(payment_err).lower() and 'unknown column' in str(payment_err).lower():
                 rprint(
-                    f"[yellow]Uyarı: Ödeme durumu güncellenemedi ('payments' tablosunda 'status' sütunu olmayabilir).[/]")
+                    f"[yellow]Uyarı: Ödeme durumu güncellenemedi ('payments' tablosunda 'status' sütunu olmayabilir, sema_yonetimi.py çalıştırın).[/]")
             else:
                 raise DatabaseError(
                     f"Ödeme durumu güncelleme hatası: {payment_err}") from payment_err
 
         # 7. Her şey yolundaysa COMMIT
         connection.commit()
+        return return_id, product_details_for_log
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def process_sale_return(connection, sale_id, sale_details, reason=None, notes=None, user_id: int | None = None):  # user_id loglama için
+    """
+    Satış iade işlemini gerçekleştirir ve loglar: Stokları geri alır, bakiyeyi günceller,
+    satış ve ödeme durumlarını günceller, iade kaydı oluşturur.
+    Tek bir transaction içinde yapar.
+    Args:
+        user_id (int | None): İşlemi yapan kullanıcı ID'si (loglama için).
+        ... (diğer parametreler) ...
+    """
+    if not connection or not connection.is_connected():
+        raise DatabaseError("Satış iadesi için aktif bağlantı gerekli.")
+    if not sale_details or 'header' not in sale_details or 'items' not in sale_details:
+        raise ValueError("İade için geçerli satış detayı gerekli.")
+    if user_id is None:
+        raise ValueError("Loglama için kullanıcı ID'si gereklidir.")
+
+    header = sale_details['header']
+    items = sale_details['items']
+    customer_id = header.get('customer_id')
+    return_amount = header.get('total_amount', Decimal('0.00'))
+    used_coupon_id = header.get('applied_customer_coupon_id')
+    # original_user_id = header.get('user_id') # Bu bilgi artık header'da olmayabilir, loglama için user_id kullanılıyor
+
+    try:
+        # 1-7. İade kaydı, stok, bakiye, kupon, satış/ödeme durumları ve COMMIT
+        # (kilit çakışmasında otomatik tekrar denenir)
+        return_id, product_details_for_log = run_transaction(
+            connection, _process_sale_return_tx, sale_id, customer_id, items, return_amount,
+            used_coupon_id, reason, notes)
         rprint(
             f"[bold green]>>> Satış (ID: {sale_id}) başarıyla iade edildi (İade ID: {return_id}). Stoklar ve bakiye güncellendi.[/]")
 
@@ -420,13 +468,11 @@ def process_sale_return(connection, sale_id, sale_details, reason=None, notes=No
         # Hata loglaması eklenebilir
         # loglama.log_activity(connection, user_id, "SATIS_IADE_BEKLENMEDIK_HATA", f"Satış ID: {sale_id}, Hata: {genel_hata}")
         return None
-    finally:
-        if cursor:
-            cursor.close()
 
 # === Raporlama Fonksiyonları ===
 # ... (get_daily_sales_summary, get_top_selling_products_by_quantity, get_top_selling_products_by_value, get_profit_loss_report_data, get_expiry_report_data fonksiyonları aynı) ...
 
+@report_query
 def get_daily_sales_summary(connection, start_date=None, end_date=None):
     """Günlük satış özetini (işlem sayısı, toplam tutar) getirir."""
     if not connection or not connection.is_connected():
@@ -456,6 +502,7 @@ def get_daily_sales_summary(connection, start_date=None, end_date=None):
             cursor.close()
 
 
+@report_query
 def get_top_selling_products_by_quantity(connection, limit=10, start_date=None, end_date=None):
     """Belirtilen tarih aralığında en çok satan ürünleri (adet bazında) getirir."""
     if not connection or not connection.is_connected():
@@ -490,6 +537,7 @@ def get_top_selling_products_by_quantity(connection, limit=10, start_date=None,
             cursor.close()
 
 
+@report_query
 def get_top_selling_products_by_value(connection, limit=10, start_date=None, end_date=None):
     """Belirtilen tarih aralığında en çok ciro yapan ürünleri getirir."""
     if not connection or not connection.is_connected():
@@ -499,7 +547,7 @@ def get_top_selling_products_by_value(connection, limit=10, start_date=None, end
         cursor = connection.cursor()
         sql = """SELECT
                     p.product_id, p.barcode, p.name,
-                    SUM(si.quantity * si.price_at_sale) as total_value
+                    SUM(COALESCE(si.line_total, si.quantity * si.price_at_sale)) as total_value
                  FROM sale_items si
                  JOIN products p ON si.product_id = p.product_id
                  JOIN sales s ON si.sale_id = s.sale_id
@@ -525,6 +573,7 @@ def get_top_selling_products_by_value(connection, limit=10, start_date=None, end
             cursor.close()
 
 
+@report_query
 def get_profit_loss_report_data(connection, start_date=None, end_date=None):
     """
     Belirtilen tarih aralığı için ürün bazlı tahmini kâr/zarar verilerini hesaplar.
@@ -541,7 +590,7 @@ def get_profit_loss_report_data(connection, start_date=None, end_date=None):
                 p.barcode,
                 p.name,
                 SUM(si.quantity) AS total_quantity,
-                SUM(si.quantity * si.price_at_sale) AS total_revenue,
+                SUM(COALESCE(si.line_total, si.quantity * si.price_at_sale)) AS total_revenue,
                 (SELECT cost_price
                  FROM purchase_items pi
                  JOIN purchases pu ON pi.purchase_id = pu.purchase_id
@@ -591,6 +640,7 @@ def get_profit_loss_report_data(connection, start_date=None, end_date=None):
             cursor.close()
 
 
+@report_query
 def get_expiry_report_data(connection, days_threshold):
     """
     SKT'si bugün veya belirtilen gün sayısı içinde dolacak olan
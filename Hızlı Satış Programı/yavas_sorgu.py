@@ -0,0 +1,185 @@
+# yavas_sorgu.py
+# Yavaş sorgu kaydı.
+# sorgu_olcum'un ölçtüğü sorgulardan [performance] slow_query_ms eşiğini aşanlar; SQL, parametreler,
+# süre ve çalışma planı (MySQL: EXPLAIN FORMAT=JSON, SQLite: EXPLAIN QUERY PLAN) ile birlikte
+# dönen (rotating) bir yerel dosyaya yazılır.
+# Plan, kasadaki işlemi bekletmemek için arka planda, havuzdan ödünç alınan ayrı bir bağlantıyla alınır.
+# Eşik ve dosya ayarları config.ini değişince programı yeniden başlatmadan uygulanır.
+# Kayıt, program başlarken install() çağrılınca başlar (modülü içe aktarmak yetmez).
+
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from mysql.connector import Error
+from hatalar import DatabaseError
+import ayarlar
+import sorgu_olcum
+
+# Aynı SQL için plan en fazla bu aralıkla (saniye) yeniden alınır
+EXPLAIN_INTERVAL = 300
+# Kayıtta her parametre için gösterilecek en fazla karakter
+MAX_PARAM_LENGTH = 100
+# Yazılmayı bekleyen en fazla kayıt; kuyruk doluysa yeni kayıtlar atılır
+QUEUE_SIZE = 100
+
+# EXPLAIN desteklenen ifadeler (yorum ve boşluklar atlandıktan sonra)
+_EXPLAINABLE = re.compile(r'^\s*(?:/\*.*?\*/\s*)*(SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH)\b',
+                          re.IGNORECASE | re.DOTALL)
+
+_logger = logging.getLogger('hsp.yavas_sorgu')
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+_handler = None
+_handler_settings = None  # (dosya yolu, en fazla bayt, yedek sayısı)
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+_explained_at = {}  # {sql: son plan alma zamanı}
+_dropped = 0  # Kuyruk dolu olduğu için yazılamayan kayıt sayısı
+
+
+def _log_path(settings):
+    path = settings.slow_query_log
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    return path
+
+
+def _ensure_handler(settings):
+    """Dosya ayarları değiştiyse log dosyası işleyicisini yeniden kurar."""
+    global _handler, _handler_settings
+    wanted = (_log_path(settings), settings.slow_query_log_max_kb * 1024, settings.slow_query_log_backups)
+    if wanted == _handler_settings:
+        return
+    if _handler is not None:
+        _logger.removeHandler(_handler)
+        _handler.close()
+    path, max_bytes, backups = wanted
+    _handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+    _logger.addHandler(_handler)
+    _handler_settings = wanted
+
+
+def _format_params(params):
+    if params is None:
+        return '-'
+    if isinstance(params, dict):
+        items = [f"{k}={v!r}" for k, v in params.items()]
+    else:
+        items = [repr(v) for v in params]
+    shortened = [item if len(item) <= MAX_PARAM_LENGTH else item[:MAX_PARAM_LENGTH] + '...' for item in items]
+    return '(' + ', '.join(shortened) + ')'
+
+
+def _explain(sql, params):
+    """
+    Sorgunun çalışma planını ayrı bir bağlantıda alır.
+    Returns:
+        str: Plan metni veya planın neden alınamadığını anlatan açıklama.
+    """
+    import db_config  # db_config bu modülü (sorgu_olcum üzerinden) dolaylı kullandığı için geç import
+    try:
+        with db_config.db_session() as connection:
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                if getattr(connection, 'backend', 'mysql') == 'sqlite':
+                    cursor.execute("EXPLAIN QUERY PLAN " + sql, params or ())
+                    return '\n'.join(f"  {row[0]}|{row[1]}|{row[3]}" for row in cursor.fetchall())
+                cursor.execute("EXPLAIN FORMAT=JSON " + sql, params or ())
+                row = cursor.fetchone()
+                cursor.fetchall()  # Okunmamış sonuç kalmasın
+                return row[0] if row else '(plan boş)'
+            finally:
+                if cursor:
+                    cursor.close()
+    except (DatabaseError, Error) as e:
+        return f"(plan alınamadı: {e})"
+
+
+def _write(entry):
+    key, sql, params, elapsed, want_plan = entry
+    settings = ayarlar.get_settings().performance
+    _ensure_handler(settings)
+    lines = [f"| {elapsed * 1000:.1f} ms | {key}",
+             f"SQL: {' '.join(sql.split())}",
+             f"Parametreler: {_format_params(params)}"]
+    if want_plan:
+        lines.append("Plan:\n" + _explain(sql, params))
+    _logger.info('\n'.join(lines) + '\n')
+
+
+def _run_worker():
+    while True:
+        entry = _queue.get()
+        try:
+            _write(entry)
+        except Exception:
+            pass  # Kayıt yazılamadıysa uygulamayı etkilemesin
+        finally:
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name='yavas_sorgu', daemon=True)
+            _worker.start()
+
+
+def _should_explain(sql, params):
+    if not _EXPLAINABLE.match(sql):
+        return False
+    if isinstance(params, (list, tuple)) and params and isinstance(params[0], (list, tuple, dict)):
+        return False  # executemany: parametre listesi
+    now = time.monotonic()
+    last = _explained_at.get(sql)
+    if last is not None and now - last < EXPLAIN_INTERVAL:
+        return False
+    if len(_explained_at) > 500:
+        _explained_at.clear()
+    _explained_at[sql] = now
+    return True
+
+
+def _on_query(key, sql, params, elapsed):
+    """sorgu_olcum dinleyicisi: eşiği aşan sorguyu yazılmak üzere kuyruğa ekler."""
+    global _dropped
+    if threading.current_thread() is _worker:
+        return  # Planı alınan (EXPLAIN) sorgular tekrar kaydedilmesin
+    settings = ayarlar.get_settings().performance
+    if not settings.slow_query_ms or elapsed * 1000 < settings.slow_query_ms or not sql:
+        return
+    want_plan = settings.explain and _should_explain(sql, params)
+    try:
+        _queue.put_nowait((key, sql, params, elapsed, want_plan))
+    except queue.Full:
+        _dropped += 1
+        return
+    _ensure_worker()
+
+
+def flush(timeout=5.0):
+    """Kuyruktaki kayıtların yazılmasını en fazla timeout saniye bekler (program kapanırken)."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def get_dropped_count():
+    """Kuyruk dolu olduğu için yazılamayan yavaş sorgu kaydı sayısını döndürür."""
+    return _dropped
+
+
+def install():
+    """Yavaş sorgu kaydını sorgu_olcum dinleyicisi olarak ekler (birden fazla çağrılması zarar vermez)."""
+    sorgu_olcum.add_listener(_on_query)
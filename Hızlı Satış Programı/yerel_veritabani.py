@@ -0,0 +1,524 @@
+# yerel_veritabani.py
+# MySQL sunucusu olmadan çalışmak için gömülü SQLite arka ucu.
+# Tek kasalı küçük mağazalar ve sunucusuz performans ölçümleri (benchmark) için kullanılır.
+# Bağlantı nesnesi, *_veritabani modüllerinin kullandığı mysql.connector API'sinin
+# ihtiyaç duyulan kısmını taklit eder:
+#   - connection.cursor(dictionary=..., buffered=..., prepared=...), commit, rollback, close, is_connected
+#   - SQL içindeki %s yer tutucuları ? olarak çevrilir
+#   - sqlite3 hataları, kodun kontrol ettiği errno değerleriyle mysql.connector hatalarına çevrilir
+# Not: satis_veritabani.py içindeki eski sqlite3 kodu (satislar/satis_detaylari tabloları)
+# bu şemayı kullanmaz; uygulamanın geri kalanı gibi yeni tablolar (sales, sale_items...) esas alınmıştır.
+
+import sqlite3
+import datetime
+import re
+import threading
+from decimal import Decimal
+from mysql.connector import errors as mysql_errors
+from mysql.connector import errorcode
+import sorgu_olcum  # İmleç ve commit süre ölçümü
+
+# === Tür Dönüştürücüler ===
+# DECIMAL sütunları NUMERIC yakınlığıyla saklanır, okunurken Decimal'e çevrilir.
+# DATE/DATETIME sütunları ISO formatında metin olarak saklanır.
+
+
+def _adapt_decimal(value):
+    return str(value)
+
+
+def _adapt_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _adapt_date(value):
+    return value.isoformat()
+
+
+def _convert_decimal(raw):
+    return Decimal(raw.decode())
+
+
+def _convert_datetime(raw):
+    text = raw.decode()
+    try:
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return datetime.datetime.combine(datetime.date.fromisoformat(text[:10]), datetime.time())
+
+
+def _convert_date(raw):
+    return datetime.date.fromisoformat(raw.decode()[:10])
+
+
+sqlite3.register_adapter(Decimal, _adapt_decimal)
+sqlite3.register_adapter(datetime.datetime, _adapt_datetime)
+sqlite3.register_adapter(datetime.date, _adapt_date)
+sqlite3.register_converter("DECIMAL", _convert_decimal)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def _normalize_value(value):
+    """
+    Tanımlı türü olmayan ifade sütunlarını (SUM(...), DATE(...)) MySQL'in döndürdüğü türe yaklaştırır.
+    Şemada FLOAT sütun olmadığı için ondalıklı sonuçlar DECIMAL hesaplarından gelir ve Decimal'e çevrilir.
+    """
+    if isinstance(value, float):
+        return Decimal(str(round(value, 4)))
+    if isinstance(value, str) and _ISO_DATE_RE.match(value):
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+# === Şema ===
+# MySQL şemasının SQLite karşılığı. Sütun adları *_veritabani modüllerindeki sorgularla aynıdır.
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    password_hash BLOB NOT NULL,
+    full_name VARCHAR(100),
+    role VARCHAR(20) NOT NULL DEFAULT 'kasiyer',
+    is_active BOOLEAN NOT NULL DEFAULT 1,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS brands (
+    brand_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    category_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    description TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS suppliers (
+    supplier_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(150) NOT NULL UNIQUE,
+    contact_person VARCHAR(100),
+    phone VARCHAR(20) UNIQUE,
+    email VARCHAR(100) UNIQUE,
+    address TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    barcode VARCHAR(50) NOT NULL UNIQUE,
+    name VARCHAR(200) NOT NULL,
+    brand_id INTEGER REFERENCES brands(brand_id),
+    category_id INTEGER REFERENCES categories(category_id),
+    price_before_kdv DECIMAL(10,2) NOT NULL DEFAULT 0,
+    kdv_rate DECIMAL(5,2) NOT NULL DEFAULT 0,
+    selling_price DECIMAL(10,2) NOT NULL DEFAULT 0,
+    previous_selling_price DECIMAL(10,2),
+    stock DECIMAL(12,3) NOT NULL DEFAULT 0,
+    min_stock_level INTEGER DEFAULT 2,
+    is_active BOOLEAN NOT NULL DEFAULT 1,
+    last_updated TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- MySQL'deki ON UPDATE CURRENT_TIMESTAMP karşılığı
+CREATE TRIGGER IF NOT EXISTS trg_products_last_updated
+AFTER UPDATE ON products
+FOR EACH ROW WHEN NEW.last_updated IS OLD.last_updated
+BEGIN
+    UPDATE products SET last_updated = datetime('now', 'localtime')
+    WHERE product_id = NEW.product_id;
+END;
+
+-- Ürünün ana barkodu dışındaki barkodları (tedarikçi etiketi, koli barkodu vb.)
+CREATE TABLE IF NOT EXISTS product_barcodes (
+    barcode_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL REFERENCES products(product_id) ON DELETE CASCADE,
+    barcode VARCHAR(50) NOT NULL UNIQUE,
+    description VARCHAR(100),
+    created_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_product_barcodes_product ON product_barcodes (product_id);
+
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(150) NOT NULL,
+    phone VARCHAR(20) UNIQUE,
+    email VARCHAR(100) UNIQUE,
+    address TEXT,
+    balance DECIMAL(10,2) NOT NULL DEFAULT 0,
+    loyalty_points INTEGER NOT NULL DEFAULT 0,
+    is_active BOOLEAN NOT NULL DEFAULT 1,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS shifts (
+    shift_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(user_id),
+    start_time DATETIME NOT NULL,
+    end_time DATETIME,
+    starting_cash DECIMAL(10,2) NOT NULL DEFAULT 0,
+    ending_cash DECIMAL(10,2),
+    total_sales DECIMAL(10,2),
+    cash_sales DECIMAL(10,2),
+    card_sales DECIMAL(10,2),
+    veresiye_sales DECIMAL(10,2),
+    cash_payments_received DECIMAL(10,2),
+    card_payments_received DECIMAL(10,2),
+    calculated_difference DECIMAL(10,2),
+    notes TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS promotions (
+    promotion_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(150) NOT NULL UNIQUE,
+    description TEXT,
+    promotion_type VARCHAR(30) NOT NULL,
+    product_id INTEGER REFERENCES products(product_id),
+    required_quantity INTEGER NOT NULL DEFAULT 0,
+    discount_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+    required_bogo_quantity INTEGER NOT NULL DEFAULT 0,
+    free_quantity INTEGER NOT NULL DEFAULT 0,
+    free_product_id INTEGER REFERENCES products(product_id),
+    start_date DATE,
+    end_date DATE,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS coupons (
+    coupon_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    coupon_code VARCHAR(50) NOT NULL UNIQUE,
+    description TEXT,
+    discount_type VARCHAR(20) NOT NULL,
+    discount_value DECIMAL(10,2) NOT NULL,
+    min_purchase_amount DECIMAL(10,2) DEFAULT 0,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS customer_coupons (
+    customer_coupon_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER NOT NULL REFERENCES customers(customer_id),
+    coupon_id INTEGER NOT NULL REFERENCES coupons(coupon_id),
+    status VARCHAR(20) NOT NULL DEFAULT 'available',
+    assigned_date DATETIME DEFAULT (datetime('now', 'localtime')),
+    expiry_date DATE,
+    used_sale_id INTEGER,
+    used_date DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS loyalty_rules (
+    rule_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rule_name VARCHAR(100) NOT NULL UNIQUE,
+    points_per_tl DECIMAL(10,4) NOT NULL DEFAULT 0,
+    is_active BOOLEAN NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS sales (
+    sale_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER REFERENCES customers(customer_id),
+    shift_id INTEGER REFERENCES shifts(shift_id),
+    sale_date DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    total_amount DECIMAL(10,2) NOT NULL,
+    discount_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+    promotion_discount DECIMAL(10,2) NOT NULL DEFAULT 0,
+    applied_customer_coupon_id INTEGER REFERENCES customer_coupons(customer_coupon_id),
+    applied_promotion_id INTEGER REFERENCES promotions(promotion_id),
+    status VARCHAR(20) NOT NULL DEFAULT 'completed'
+);
+
+CREATE TABLE IF NOT EXISTS sale_items (
+    sale_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sale_id INTEGER NOT NULL REFERENCES sales(sale_id),
+    product_id INTEGER NOT NULL REFERENCES products(product_id),
+    quantity DECIMAL(10,3) NOT NULL,
+    price_at_sale DECIMAL(10,2) NOT NULL,
+    line_total DECIMAL(10,2)
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sale_id INTEGER NOT NULL REFERENCES sales(sale_id),
+    payment_method VARCHAR(30) NOT NULL,
+    amount_paid DECIMAL(10,2) NOT NULL,
+    payment_date DATETIME DEFAULT (datetime('now', 'localtime')),
+    status VARCHAR(20) NOT NULL DEFAULT 'completed'
+);
+
+CREATE TABLE IF NOT EXISTS returns (
+    return_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_sale_id INTEGER NOT NULL REFERENCES sales(sale_id),
+    customer_id INTEGER REFERENCES customers(customer_id),
+    return_date DATETIME DEFAULT (datetime('now', 'localtime')),
+    return_amount DECIMAL(10,2) NOT NULL,
+    reason TEXT,
+    notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS customer_payments (
+    cust_payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER NOT NULL REFERENCES customers(customer_id),
+    shift_id INTEGER REFERENCES shifts(shift_id),
+    payment_date DATETIME DEFAULT (datetime('now', 'localtime')),
+    amount DECIMAL(10,2) NOT NULL,
+    payment_method VARCHAR(30) NOT NULL,
+    notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS purchases (
+    purchase_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    supplier_id INTEGER REFERENCES suppliers(supplier_id),
+    purchase_date DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    invoice_number VARCHAR(50),
+    notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS purchase_items (
+    purchase_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    purchase_id INTEGER NOT NULL REFERENCES purchases(purchase_id),
+    product_id INTEGER NOT NULL REFERENCES products(product_id),
+    quantity INTEGER NOT NULL,
+    cost_price DECIMAL(10,2),
+    expiry_date DATE
+);
+
+CREATE TABLE IF NOT EXISTS activity_logs (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users(user_id),
+    action_type VARCHAR(50) NOT NULL,
+    details TEXT,
+    timestamp DATETIME NOT NULL
+);
+"""
+
+# Bellek içi veritabanı, aynı süreçteki bütün bağlantılar tarafından paylaşılsın diye
+# paylaşımlı önbellek URI'si ile açılır.
+MEMORY_PATH = ":memory:"
+_MEMORY_URI = "file:hsp_bellek?mode=memory&cache=shared"
+
+_initialized_paths = set()
+_init_lock = threading.Lock()
+_memory_anchor = None  # Bellek içi veritabanı son bağlantı kapanınca silinmesin diye
+
+
+# === Hata Çevirisi ===
+
+def _translate_error(error):
+    """sqlite3 hatasını, çağıran kodun beklediği errno ile mysql.connector hatasına çevirir."""
+    message = str(error)
+    lowered = message.lower()
+    if isinstance(error, sqlite3.IntegrityError):
+        if 'unique' in lowered:
+            return mysql_errors.IntegrityError(msg=f"Duplicate entry: {message}", errno=errorcode.ER_DUP_ENTRY)
+        if 'foreign key' in lowered:
+            return mysql_errors.IntegrityError(msg=message, errno=errorcode.ER_NO_REFERENCED_ROW_2)
+        if 'not null' in lowered:
+            return mysql_errors.IntegrityError(msg=message, errno=errorcode.ER_BAD_NULL_ERROR)
+        return mysql_errors.IntegrityError(msg=message)
+    if isinstance(error, sqlite3.OperationalError):
+        if lowered.startswith('no such column'):
+            column = message.split(':', 1)[-1].strip()
+            return mysql_errors.ProgrammingError(msg=f"Unknown column '{column}'", errno=errorcode.ER_BAD_FIELD_ERROR)
+        if lowered.startswith('no such table'):
+            return mysql_errors.ProgrammingError(msg=message, errno=errorcode.ER_NO_SUCH_TABLE)
+        if 'locked' in lowered or 'busy' in lowered:
+            return mysql_errors.DatabaseError(msg=message, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        return mysql_errors.OperationalError(msg=message)
+    if isinstance(error, sqlite3.ProgrammingError):
+        return mysql_errors.ProgrammingError(msg=message)
+    return mysql_errors.DatabaseError(msg=message)
+
+
+# === İmleç ===
+
+class SQLiteCursor:
+    """mysql.connector imlecinin kullanılan kısmını sqlite3 üzerinde sağlar."""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection._raw.cursor()
+        self._dictionary = dictionary
+        self.column_names = ()
+
+    @staticmethod
+    def _translate_sql(sql):
+        return sql.replace('%s', '?')
+
+    def _convert_row(self, row):
+        if row is None:
+            return None
+        values = tuple(_normalize_value(v) for v in row)
+        if self._dictionary:
+            return dict(zip(self.column_names, values))
+        return values
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(self._translate_sql(sql), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        description = self._cursor.description
+        self.column_names = tuple(d[0] for d in description) if description else ()
+
+    def executemany(self, sql, seq_params):
+        try:
+            self._cursor.executemany(self._translate_sql(sql), [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        self.column_names = ()
+
+    def fetchone(self):
+        return self._convert_row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._convert_row(r) for r in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._convert_row(r) for r in self._cursor.fetchall()]
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def with_rows(self):
+        return bool(self._cursor.description)
+
+    def close(self):
+        self._cursor.close()
+
+
+# === Bağlantı ===
+
+class SQLiteConnection:
+    """
+    sqlite3 bağlantısını mysql.connector bağlantısı gibi kullanılabilir hale getirir.
+    Otomatik commit kapalıdır (MySQL varsayılanı gibi); değişiklikler commit() ile kalıcı olur.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, raw_connection, path):
+        self._raw = raw_connection
+        self.path = path
+        self.generation = 0  # ReconnectingConnection ile aynı arayüz (yeniden bağlanma olmaz)
+        self._closed = False
+
+    def cursor(self, dictionary=False, buffered=False, prepared=False, **kwargs):
+        # buffered: sqlite3 zaten yerel çalıştığı için anlamsız.
+        # prepared: sqlite3 derlenmiş ifadeleri kendi önbelleğinde tuttuğu için normal imleç yeterli.
+        if self._closed:
+            raise mysql_errors.OperationalError(msg="SQLite bağlantısı kapalı.")
+        return sorgu_olcum.instrument(SQLiteCursor(self, dictionary=dictionary))
+
+    def commit(self):
+        sorgu_olcum.timed_commit(self._raw.commit)
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def is_connected(self):
+        return not self._closed
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        if self._closed:
+            raise mysql_errors.InterfaceError(msg="SQLite bağlantısı kapalı.")
+
+    def reconnect(self, attempts=1, delay=0):
+        return None
+
+    def add_close_callback(self, callback):
+        # Hazır ifade kaydı için; sqlite3 imleçleri bağlantıyla birlikte kapanır.
+        pass
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def close(self):
+        if not self._closed:
+            try:
+                self._raw.rollback()  # Commit edilmemiş işlem kalmasın (havuza iade gibi)
+            finally:
+                self._raw.close()
+                self._closed = True
+
+
+# str.lower() 'İ' harfini 'i̇' (i + birleşik nokta), 'I' harfini 'i' yapar; Türkçede İ -> i, I -> ı
+# (urun_arama.turkish_casefold ile aynı kural).
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+
+
+def _turkish_lower(s):
+    return s.translate(_TURKISH_UPPER).lower() if isinstance(s, str) else s
+
+
+def _register_functions(raw):
+    """MySQL'de olup SQLite'ta olmayan (veya farklı çalışan) fonksiyonları tanımlar."""
+    raw.create_function(
+        "CONCAT", -1, lambda *args: None if any(a is None for a in args) else ''.join(str(a) for a in args),
+        deterministic=True)
+    # SQLite'ın LOWER fonksiyonu sadece ASCII harfleri küçültür; Türkçe karakterler Türkçe kurallarla küçültülür
+    # (LOWER(name) LIKE LOWER(%s) aramalarında 'ismail' -> 'İsmail', 'ışık' -> 'IŞIK' bulunsun).
+    raw.create_function("LOWER", 1, _turkish_lower, deterministic=True)
+
+
+def _open_raw(path):
+    if path == MEMORY_PATH:
+        raw = sqlite3.connect(_MEMORY_URI, uri=True, timeout=5,
+                              detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+    else:
+        raw = sqlite3.connect(path, timeout=5,
+                              detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        raw.execute("PRAGMA journal_mode = WAL")  # Okuyucular yazıcıyı beklemesin
+    raw.execute("PRAGMA foreign_keys = ON")
+    _register_functions(raw)
+    return raw
+
+
+def init_schema(raw):
+    """Şemadaki tabloları (yoksa) oluşturur."""
+    raw.executescript(SCHEMA_SQL)
+    raw.commit()
+
+
+def connect(path):
+    """
+    Verilen dosya yolundaki SQLite veritabanına bağlanır, şema yoksa oluşturur.
+    path ':memory:' ise süreç boyunca paylaşılan bellek içi veritabanı kullanılır.
+    Returns:
+        SQLiteConnection
+    Raises:
+        mysql.connector.errors.Error: Bağlantı kurulamazsa.
+    """
+    global _memory_anchor
+    try:
+        raw = _open_raw(path)
+        with _init_lock:
+            if path not in _initialized_paths:
+                init_schema(raw)
+                _initialized_paths.add(path)
+                if path == MEMORY_PATH and _memory_anchor is None:
+                    _memory_anchor = _open_raw(path)
+    except sqlite3.Error as e:
+        raise _translate_error(e) from e
+    return SQLiteConnection(raw, path)